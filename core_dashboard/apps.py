@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreDashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core_dashboard'
+
+    def ready(self):
+        # Connect the cross-module cache invalidation receivers
+        from core_dashboard.modules import hooks  # noqa: F401
+
+        # WAL and the other SQLite pragmas on every new connection
+        from django.db.backends.signals import connection_created
+        from core_dashboard.modules.db_tuning import configure_connection
+        connection_created.connect(configure_connection, dispatch_uid='core_dashboard.sqlite_pragmas')
@@ -0,0 +1,104 @@
+"""
+Conditional GET decorators.
+
+`conditional_page` answers ``If-None-Match`` with 304 Not Modified before the
+view runs, using an ETag built only from cheap inputs:
+
+- the data generations of the scopes the page reads (one indexed query)
+- the query-string parameters (filters)
+- the mtime of the template(s) (template version) and any extra source files
+- the current date, for pages that fall back to "today"
+
+Responses carry ``Cache-Control: private, no-cache`` by default, so browsers
+keep the page but revalidate on every refresh, which costs one 304.
+"""
+import datetime
+import hashlib
+import logging
+import os
+from functools import wraps
+
+from django.template.loader import get_template
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+logger = logging.getLogger(__name__)
+
+
+def template_version(template_name):
+    """mtime of the template file (None when it cannot be resolved)."""
+    try:
+        return os.path.getmtime(get_template(template_name).origin.name)
+    except Exception:
+        return None
+
+
+def files_version(paths):
+    """(mtime, size) per file; missing files contribute None."""
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            version.append((stat.st_mtime, stat.st_size))
+        except OSError:
+            version.append(None)
+    return version
+
+
+def compute_page_etag(request, scopes=(), template=None, files=(), daily=True):
+    """Strong ETag value (without quotes) for a GET of request.path."""
+    from core_dashboard.modules.data_cache import get_generations
+
+    scopes = tuple(scopes() if callable(scopes) else scopes)
+    files = tuple(files() if callable(files) else files)
+    templates = [template] if isinstance(template, str) else list(template or ())
+    generations = get_generations(scopes) if scopes else {}
+    parts = (
+        request.path,
+        sorted(request.GET.lists()),
+        [generations[s] for s in scopes],
+        [template_version(name) for name in templates],
+        files_version(files),
+        datetime.date.today().isoformat() if daily else None,
+    )
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:32]
+
+
+def conditional_page(scopes=(), template=None, files=(), daily=True, max_age=0, before=None):
+    """Serve 304 Not Modified while nothing the page depends on has changed.
+
+    `scopes` and `files` may be callables, evaluated per request (e.g. to read
+    settings lazily); `template` is a template name or a list of them. Non-GET/HEAD requests and errors in computing the ETag
+    fall through to the view unchanged.
+
+    `before(request, *args, **kwargs)` runs ahead of the ETag on GET/HEAD, for
+    pages whose view would otherwise be the one refreshing a file in `files`.
+    """
+    def etag_func(request, *args, **kwargs):
+        try:
+            return compute_page_etag(request, scopes=scopes, template=template, files=files, daily=daily)
+        except Exception as e:
+            logger.warning(f"Could not compute ETag for {request.path}: {e}")
+            return None
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if before is not None and request.method in ('GET', 'HEAD'):
+                try:
+                    before(request, *args, **kwargs)
+                except Exception as e:
+                    logger.warning(f"Pre-ETag refresh failed for {request.path}: {e}")
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+                if max_age:
+                    patch_cache_control(response, private=True, max_age=max_age)
+                else:
+                    patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
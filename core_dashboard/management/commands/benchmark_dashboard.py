@@ -0,0 +1,109 @@
+"""
+Query-budget and latency report for the hot views.
+
+Builds a synthetic multi-year dataset (RevenueEntry history plus Cobranzas,
+Facturacion and Revenue Days workbooks) in a throwaway test database and
+media folder, then measures every benchmark scenario cold and warm. Usage:
+
+    python manage.py benchmark_dashboard [--weeks 104] [--engagements 200] [--repeat 3]
+        [--json report.json] [--compare previous.json] [--check]
+
+The JSON report has a stable layout, so reports of two commits diff cleanly;
+--compare prints the deltas against an earlier report and --check fails when
+a scenario goes over its budget.
+"""
+import datetime
+import json
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client as TestClient, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core_dashboard.modules.benchmarks import build_dataset, over_budget, run_suite
+
+
+class Command(BaseCommand):
+    help = 'Measure DB queries, workbook reads and wall time of the hot views against their budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=104, help='Number of report weeks (default: two fiscal years)')
+        parser.add_argument('--engagements', type=int, default=200, help='Engagements per week')
+        parser.add_argument('--repeat', type=int, default=3, help='Warm requests per scenario')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', dest='json_path', help='Write the report to this JSON file')
+        parser.add_argument('--compare', help='Earlier JSON report to print deltas against')
+        parser.add_argument('--check', action='store_true', help='Exit with an error when a scenario is over budget')
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp(prefix='benchmark_media_')
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(
+                MEDIA_ROOT=media_root,
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            ):
+                dataset = build_dataset(
+                    f'{media_root}/source', weeks=options['weeks'], engagements=options['engagements'], seed=options['seed']
+                )
+                report = run_suite(TestClient(), dataset, repeat=options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        report = {'commit': self._commit(), 'generated_at': datetime.datetime.now().isoformat(timespec='seconds'), **report}
+        previous = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as fh:
+                previous = {r['name']: r for r in json.load(fh)['scenarios']}
+        self._print(report, previous)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Report written to {options['json_path']}")
+
+        failures = over_budget(report)
+        for name, metric, value, limit in failures:
+            self.stdout.write(self.style.ERROR(f"{name}: {metric} {value} over budget {limit}"))
+        if failures and options['check']:
+            raise CommandError(f'{len(failures)} measurement(s) over budget')
+
+    @staticmethod
+    def _commit():
+        try:
+            result = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            )
+            return result.stdout.strip()
+        except Exception:
+            return None
+
+    def _print(self, report, previous=None):
+        dataset = report['dataset']
+        self.stdout.write(self.style.SUCCESS(
+            f"{dataset['weeks']} weeks x {dataset['engagements']} engagements "
+            f"({dataset['first_week']} .. {dataset['last_week']}), commit {report['commit'] or 'unknown'}"
+        ))
+        self.stdout.write(
+            f"  {'scenario':<22}{'cold q':>8}{'warm q':>8}{'xlsx':>6}{'cold ms':>10}{'warm ms':>10}"
+        )
+        for result in report['scenarios']:
+            line = (
+                f"  {result['name']:<22}{result['cold']['queries']:>8}{result['warm']['queries']:>8}"
+                f"{result['warm']['excel_reads']:>6}{result['cold']['wall_ms']:>10.1f}{result['warm']['wall_ms']['median']:>10.1f}"
+            )
+            before = (previous or {}).get(result['name'])
+            if before:
+                line += (
+                    f"   (q {result['warm']['queries'] - before['warm']['queries']:+d}, "
+                    f"ms {result['warm']['wall_ms']['median'] - before['warm']['wall_ms']['median']:+.1f})"
+                )
+            self.stdout.write(line)
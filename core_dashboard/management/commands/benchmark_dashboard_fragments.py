@@ -0,0 +1,104 @@
+"""
+Benchmark dashboard.html rendering per cached fragment.
+
+Builds a synthetic dataset in a throwaway test database and requests the
+dashboard (every card group rendered inline, ``?inline=1``) through the Django
+test client with fragment caching disabled
+(every section rendered, derived-data caches cleared) and enabled (cold, then
+warm). Usage:
+
+    python manage.py benchmark_dashboard_fragments [--engagements 500] [--weeks 4] [--repeat 3] [--json out.json]
+"""
+import json
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client as TestClient, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core_dashboard.templatetags.fragment_cache import record_fragment_timings
+from core_dashboard.utils import generate_mock_revenue_entries
+
+SCENARIOS = [
+    ('latest week', {}),
+    ('service line', {'service_line': 'Assurance'}),
+    ('client', {'client': 'Client 0001'}),
+]
+SECTIONS = ('dashboard_filters', 'dashboard_macro', 'dashboard_cobranzas', 'dashboard_rankings')
+
+
+class Command(BaseCommand):
+    help = 'Measure dashboard render time per template fragment with and without fragment caching'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engagements', type=int, default=500, help='Engagements per week')
+        parser.add_argument('--weeks', type=int, default=4, help='Number of report weeks')
+        parser.add_argument('--repeat', type=int, default=3, help='Requests per measurement')
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+                weeks = self._populate(options['engagements'], options['weeks'], options['seed'])
+                results = self._run(weeks, options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self._print(results)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['json_path']}")
+
+    def _populate(self, engagements, weeks, seed):
+        dates = generate_mock_revenue_entries(weeks=weeks, engagements=engagements, seed=seed)
+        self.stdout.write(f"Synthetic dataset: {weeks * engagements} rows over {len(dates)} weeks")
+        return dates
+
+    def _measure(self, client, params, repeat, clear_each=False):
+        sections = {name: 0.0 for name in SECTIONS}
+        total = 0.0
+        for _ in range(repeat):
+            if clear_each:
+                cache.clear()
+            with record_fragment_timings() as timings:
+                start = time.perf_counter()
+                response = client.get('/', {**params, 'inline': '1'})
+                total += time.perf_counter() - start
+            if response.status_code != 200:
+                raise RuntimeError(f'Dashboard returned {response.status_code} for {params}')
+            for name in SECTIONS:
+                sections[name] += timings.get(name, 0.0)
+        return {
+            'request_ms': round(total / repeat * 1000, 2),
+            'sections_ms': {name: round(value / repeat * 1000, 2) for name, value in sections.items()},
+        }
+
+    def _run(self, weeks, repeat):
+        client = TestClient()
+        results = []
+        for label, params in SCENARIOS:
+            with override_settings(DASHBOARD_FRAGMENT_CACHE=False):
+                uncached = self._measure(client, params, repeat, clear_each=True)
+            cache.clear()
+            cold = self._measure(client, params, 1)
+            warm = self._measure(client, params, repeat)
+            results.append({'scenario': label, 'params': params, 'uncached': uncached, 'cold': cold, 'warm': warm})
+        return results
+
+    def _print(self, results):
+        for result in results:
+            self.stdout.write(self.style.SUCCESS(f"\n{result['scenario']} {result['params'] or ''}"))
+            self.stdout.write(f"  {'section':<26}{'uncached':>12}{'cold':>12}{'warm':>12}")
+            for name in SECTIONS:
+                row = [result[k]['sections_ms'][name] for k in ('uncached', 'cold', 'warm')]
+                self.stdout.write(f"  {name:<26}" + ''.join(f'{v:>10.2f}ms' for v in row))
+            row = [result[k]['request_ms'] for k in ('uncached', 'cold', 'warm')]
+            self.stdout.write(f"  {'whole request':<26}" + ''.join(f'{v:>10.2f}ms' for v in row))
@@ -0,0 +1,127 @@
+"""
+Latency of the dashboard aggregations per OLAP engine.
+
+Fills a throwaway test database with a synthetic RevenueEntry history
+(default: 10,000 engagements x 104 weeks, about 1M rows), then times the
+snapshot load and every operation the dashboard routes through
+`core_dashboard.modules.olap` on each available engine. Usage:
+
+    python manage.py benchmark_olap [--engagements 10000] [--weeks 104] [--repeat 5]
+        [--engines orm frame duckdb] [--json report.json]
+"""
+import datetime
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core_dashboard.modules.olap import ENGINES, FrameEngine, Selection, get_engine
+from core_dashboard.modules.olap.services import duckdb
+from core_dashboard.modules.synthetic_data import SyntheticDataset
+
+KPI_MEASURES = ('revenue', 'fytd_ansr_sintetico', 'fytd_charged_hours', 'fytd_diferencial_final')
+
+
+def operations(dataset):
+    """(name, callable(engine)) pairs mirroring the dashboard's queries."""
+    last = dataset.report_dates[-1]
+    week = Selection({'date': last})
+    fytd = Selection({'date__range': (dataset.report_dates[max(0, len(dataset.report_dates) - 52)], last)})
+    revenue = {'total_revenue': 'fytd_ansr_sintetico'}
+    return [
+        ('kpi_totals', lambda e: e.totals(week, KPI_MEASURES, distinct=('client',))),
+        ('kpi_totals_by_area', lambda e: e.totals(week.narrow(area__name='Assurance'), KPI_MEASURES, distinct=('client',))),
+        ('rank_partners', lambda e: e.grouped(week, 'engagement_partner', revenue, order_by='-total_revenue', exclude_blank=True)),
+        ('rank_managers', lambda e: e.grouped(week, 'engagement_manager', revenue, order_by='-total_revenue')),
+        ('rank_clients', lambda e: e.grouped(week, 'client__name', revenue, order_by='-total_revenue')),
+        ('rank_engagements', lambda e: e.grouped(week, 'engagement_id', revenue, order_by='-total_revenue')),
+        ('sub_service_lines_fytd', lambda e: e.grouped(fytd, 'sub_area__name', revenue)),
+        ('daily_trend', lambda e: e.daily_trend(Selection())),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Time the dashboard aggregations on the ORM and the columnar OLAP engines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engagements', type=int, default=10000, help='Engagements per week')
+        parser.add_argument('--weeks', type=int, default=104, help='Number of report weeks')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per operation')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), help='Engines to time (default: all available)')
+        parser.add_argument('--json', dest='json_path', help='Write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        engines = options['engines'] or [name for name in ENGINES if name != 'duckdb' or duckdb is not None]
+        if 'duckdb' in engines and duckdb is None:
+            self.stdout.write(self.style.WARNING('duckdb is not installed; skipping it'))
+            engines.remove('duckdb')
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+                report = self._run(engines, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self._print(report)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Report written to {options['json_path']}")
+
+    def _run(self, engines, options):
+        dataset = SyntheticDataset(
+            partners=max(12, options['engagements'] // 100), managers=max(40, options['engagements'] // 25),
+            engagements=options['engagements'], weeks=options['weeks'], seed=options['seed'],
+        )
+        self.stdout.write(f"Writing {dataset.rows:,} synthetic rows...")
+        started = time.perf_counter()
+        dataset.write_database(batch_size=5000)
+        report = {
+            'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'rows': dataset.rows,
+            'write_s': round(time.perf_counter() - started, 2),
+            'engines': {},
+        }
+
+        for name in engines:
+            engine = get_engine(name)
+            result = {'operations': {}}
+            if isinstance(engine, FrameEngine):
+                FrameEngine.reset()
+                started = time.perf_counter()
+                engine.frame()
+                result['snapshot_load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            for op_name, op in operations(dataset):
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    op(engine)
+                    timings.append((time.perf_counter() - started) * 1000)
+                result['operations'][op_name] = {
+                    'median_ms': round(statistics.median(timings), 2),
+                    'max_ms': round(max(timings), 2),
+                }
+            report['engines'][name] = result
+        return report
+
+    def _print(self, report):
+        self.stdout.write(f"{report['rows']:,} rows (written in {report['write_s']}s)")
+        names = list(report['engines'])
+        for name in names:
+            load = report['engines'][name].get('snapshot_load_ms')
+            if load is not None:
+                self.stdout.write(f"{name} snapshot load: {load} ms")
+        self.stdout.write(f"{'operation':<26}" + ''.join(f'{name:>14}' for name in names))
+        ops = next(iter(report['engines'].values()), {}).get('operations', {})
+        for op_name in ops:
+            cells = ''.join(f"{report['engines'][name]['operations'][op_name]['median_ms']:>12}ms" for name in names)
+            self.stdout.write(f'{op_name:<26}{cells}')
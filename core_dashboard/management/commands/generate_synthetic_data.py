@@ -0,0 +1,83 @@
+"""
+Generate a deterministic synthetic dataset for load testing.
+
+Writes the RevenueEntry history into the configured database with bulk
+inserts and the matching upload workbooks (Engagement List, Diferencial,
+Revenue Days, Cobranzas, Facturacion) into a folder. Usage:
+
+    python manage.py generate_synthetic_data [--partners 12] [--managers 40] [--clients 50]
+        [--engagements 200] [--weeks 104 | --fiscal-years 2] [--end-date 2025-09-26]
+        [--seed 42] [--output DIR] [--workbooks last|all|none] [--no-db]
+
+The same arguments always produce the same rows and files. Existing rows of
+the generated report dates are replaced.
+"""
+import datetime
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core_dashboard.modules.synthetic_data import SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = 'Generate a seeded synthetic RevenueEntry history and matching upload workbooks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partners', type=int, default=12)
+        parser.add_argument('--managers', type=int, default=40)
+        parser.add_argument('--clients', type=int, help='Default: one client per four engagements')
+        parser.add_argument('--engagements', type=int, default=200, help='Engagements per week')
+        parser.add_argument('--weeks', type=int, help='Number of report weeks (default: 52 per fiscal year)')
+        parser.add_argument('--fiscal-years', type=int, default=2)
+        parser.add_argument('--end-date', help='Last report date, YYYY-MM-DD (moved back to a Friday)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Workbook folder (default: MEDIA_ROOT/synthetic)')
+        parser.add_argument('--workbooks', choices=('last', 'all', 'none'), default='last',
+                            help='Write the workbooks of the last week, of every week, or none')
+        parser.add_argument('--no-db', action='store_true', help='Only write the workbooks')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        end_date = None
+        if options['end_date']:
+            try:
+                end_date = datetime.datetime.strptime(options['end_date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError(f"Invalid --end-date: {options['end_date']}")
+        weeks = options['weeks'] or options['fiscal_years'] * 52
+        dataset = SyntheticDataset(
+            partners=options['partners'],
+            managers=options['managers'],
+            clients=options['clients'],
+            engagements=options['engagements'],
+            weeks=weeks,
+            end_date=end_date,
+            seed=options['seed'],
+        )
+        self.stdout.write(
+            f"{len(dataset.report_dates)} weeks ({dataset.report_dates[0]} to {dataset.report_dates[-1]}), "
+            f"{dataset.engagements} engagements, {len(dataset.partners)} partners, "
+            f"{len(dataset.managers)} managers, {len(dataset.clients)} clients"
+        )
+
+        if not options['no_db']:
+            start = time.perf_counter()
+            rows = dataset.write_database(batch_size=options['batch_size'], progress=self._progress)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'{rows} rows written in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)'
+            ))
+
+        if options['workbooks'] != 'none':
+            output = options['output'] or os.path.join(settings.MEDIA_ROOT, 'synthetic')
+            dates = dataset.report_dates if options['workbooks'] == 'all' else dataset.report_dates[-1:]
+            for report_date in dates:
+                paths = dataset.write_workbooks(output, report_date)
+            self.stdout.write(self.style.SUCCESS(f'{len(dates) * len(paths)} workbooks written to {output}'))
+
+    def _progress(self, done, total, report_date):
+        if done == total or done % 10 == 0:
+            self.stdout.write(f'  {done}/{total} weeks ({report_date})')
@@ -104,4 +104,10 @@ class Command(BaseCommand):
                     diferencial_mtd=get_float_or_none(row.get('diferencial_mtd')),
                     fytd_ansr_sintetico=get_float_or_none(row.get('FYTD_ANSR_Sintetico')),
                 )
+        # Keep the report-week registry in step with the imported dates
+        from core_dashboard.modules.report_weeks import sync_from_entries
+        sync_from_entries()
+        # Cached dashboard results were built from the previous rows
+        from core_dashboard.modules.data_cache import bump_all
+        bump_all()
         self.stdout.write(self.style.SUCCESS('Successfully imported data from Final_Database.csv'))
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Re-import every stored upload set after a change of the import rules.
+
+Upload sets (Engagement List, Dif, Revenue Days of one report date) are found
+under MEDIA_ROOT/historico_de_final_database, parsed in a process pool and
+written to the database week by week in fiscal order. Usage:
+
+    python manage.py reprocess_history [--since 2025-07-01] [--until 2025-09-30]
+        [--workers 4] [--force] [--dry-run] [--root DIR] [--verbose]
+
+Weeks already imported from the same files by the current code are skipped,
+so running the command again after an interruption or a failed week resumes
+from there; --force re-imports every week.
+"""
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core_dashboard.modules.reprocess import reprocess_history
+
+
+class Command(BaseCommand):
+    help = 'Re-import every stored upload set in fiscal order, parsing them in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First report date to reprocess (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Last report date to reprocess (YYYY-MM-DD)')
+        parser.add_argument('--workers', type=int, help='Parsing processes (default: one per CPU; 1 parses inline)')
+        parser.add_argument('--force', action='store_true', help='Re-import weeks that are already up to date')
+        parser.add_argument('--dry-run', action='store_true', help='Only list what would be re-imported')
+        parser.add_argument('--root', help='Upload history folder (default: MEDIA_ROOT/historico_de_final_database)')
+        parser.add_argument('--verbose', action='store_true', help="Show the import script's own output")
+
+    def handle(self, *args, **options):
+        try:
+            since = self._parse(options['since'])
+            until = self._parse(options['until'])
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        summary = reprocess_history(
+            root=options['root'], since=since, until=until, workers=options['workers'],
+            force=options['force'], dry_run=options['dry_run'], quiet=not options['verbose'],
+            progress=self._progress,
+        )
+        for week in summary['incomplete']:
+            self.stdout.write(self.style.WARNING(f'  {week}: incomplete upload set, skipped'))
+        if options['dry_run']:
+            self.stdout.write(
+                f"{summary['weeks']} weeks found: {summary['pending']} to re-import, "
+                f"{summary['skipped']} up to date"
+            )
+            return
+        message = (
+            f"{summary['imported']} weeks re-imported ({summary['rows']} rows), {summary['skipped']} up to date, "
+            f"in {summary['elapsed_seconds']:.1f}s"
+        )
+        if summary['failed']:
+            raise CommandError(f"{message}; stopped at {summary['failed']}. Fix it and run the command again to resume.")
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def _parse(self, value):
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+    def _progress(self, done, total, upload_set):
+        week = upload_set['week']
+        if upload_set['action'] == 'skip':
+            self.stdout.write(f'  [{done}/{total}] {week}: up to date')
+        elif upload_set['action'] == 'failed':
+            self.stdout.write(self.style.ERROR(f"  [{done}/{total}] {week}: failed: {upload_set['error']}"))
+        else:
+            self.stdout.write(f"  [{done}/{total}] {week}: {upload_set['rows']} rows in {upload_set['seconds']:.1f}s")
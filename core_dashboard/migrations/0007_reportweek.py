@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:17
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_report_weeks(apps, schema_editor):
+    """Register the report dates already stored in RevenueEntry."""
+    from core_dashboard.utils import get_fiscal_month_year
+
+    RevenueEntry = apps.get_model('core_dashboard', 'RevenueEntry')
+    ReportWeek = apps.get_model('core_dashboard', 'ReportWeek')
+    rows = RevenueEntry.objects.values('date').annotate(rows=Count('id')).order_by('date')
+    ReportWeek.objects.bulk_create([
+        ReportWeek(
+            week_ending=row['date'],
+            week_start=row['date'] - datetime.timedelta(days=row['date'].weekday()),
+            fiscal_period=get_fiscal_month_year(row['date']),
+            row_count=row['rows'],
+        )
+        for row in rows if row['date']
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_dashboard', '0006_delete_managerrevenuedays'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportWeek',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_ending', models.DateField(unique=True)),
+                ('week_start', models.DateField(db_index=True)),
+                ('fiscal_period', models.CharField(db_index=True, max_length=32)),
+                ('row_count', models.IntegerField(default=0)),
+                ('source_hashes', models.JSONField(blank=True, default=dict)),
+                ('import_duration_seconds', models.FloatField(blank=True, null=True)),
+                ('imported_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['week_ending'],
+            },
+        ),
+        migrations.RunPython(backfill_report_weeks, migrations.RunPython.noop),
+    ]
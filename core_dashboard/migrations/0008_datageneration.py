@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_dashboard', '0007_reportweek'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64, unique=True)),
+                ('value', models.PositiveBigIntegerField(default=0)),
+                ('token', models.CharField(max_length=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_people(apps, schema_editor):
+    """Create a Partner/Manager per normalized name and point existing entries at it."""
+    from core_dashboard.utils import normalize_key
+
+    RevenueEntry = apps.get_model('core_dashboard', 'RevenueEntry')
+    for model_name, name_field, fk_field in (
+        ('Partner', 'engagement_partner', 'partner'),
+        ('Manager', 'engagement_manager', 'manager'),
+    ):
+        Person = apps.get_model('core_dashboard', model_name)
+        spellings = {}
+        for name in RevenueEntry.objects.values_list(name_field, flat=True).distinct().order_by(name_field):
+            key = normalize_key(name)
+            if key:
+                spellings.setdefault(key, []).append(name)
+        people = []
+        for key, names in spellings.items():
+            display = [' '.join(name.split()) for name in names]
+            aliases = [d for d in dict.fromkeys(display[1:]) if d != display[0]]
+            people.append(Person(key=key, name=display[0], aliases=aliases))
+        Person.objects.bulk_create(people)
+        for person in Person.objects.all():
+            RevenueEntry.objects.filter(**{f'{name_field}__in': spellings[person.key]}).update(**{fk_field: person.pk})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_dashboard', '0008_datageneration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Manager',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('aliases', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Partner',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('aliases', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='revenueentry',
+            name='manager',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='entries', to='core_dashboard.manager'),
+        ),
+        migrations.AddField(
+            model_name='revenueentry',
+            name='partner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='entries', to='core_dashboard.partner'),
+        ),
+        migrations.RunPython(backfill_people, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:28
+
+from django.db import migrations, models
+
+
+def backfill_keys(apps, schema_editor):
+    """Fill the match keys of existing entries, one UPDATE per distinct label pair."""
+    from core_dashboard.utils import normalize_key
+
+    RevenueEntry = apps.get_model('core_dashboard', 'RevenueEntry')
+    for key_field, text_field, fk_field in (
+        ('service_line_key', 'engagement_service_line', 'area'),
+        ('sub_service_line_key', 'engagement_sub_service_line', 'sub_area'),
+    ):
+        pairs = RevenueEntry.objects.values_list(text_field, fk_field, f'{fk_field}__name').distinct()
+        for text, fk, fk_name in pairs:
+            key = normalize_key(text or fk_name or '')
+            if key:
+                RevenueEntry.objects.filter(**{text_field: text, fk_field: fk}).update(**{key_field: key})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_dashboard', '0009_partner_manager'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='revenueentry',
+            name='service_line_key',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='revenueentry',
+            name='sub_service_line_key',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(backfill_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='revenueentry',
+            index=models.Index(fields=['service_line_key', 'date'], name='revenue_sl_key_date'),
+        ),
+        migrations.AddIndex(
+            model_name='revenueentry',
+            index=models.Index(fields=['sub_service_line_key', 'date'], name='revenue_ssl_key_date'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_dashboard', '0010_service_line_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('path', models.CharField(max_length=512)),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('upload_count', models.PositiveIntegerField(default=1)),
+                ('first_uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('last_uploaded_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StageRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=64)),
+                ('scope', models.CharField(max_length=64)),
+                ('input_key', models.CharField(max_length=64)),
+                ('code_version', models.CharField(blank=True, max_length=16)),
+                ('inputs', models.JSONField(blank=True, default=dict)),
+                ('succeeded', models.BooleanField(default=False)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('generations', models.JSONField(blank=True, default=dict)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('reuse_count', models.PositiveIntegerField(default=0)),
+                ('finished_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('stage', 'scope')},
+            },
+        ),
+    ]
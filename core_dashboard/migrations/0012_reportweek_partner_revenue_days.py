@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:04
+
+from django.db import migrations, models
+
+
+def backfill_partner_revenue_days(apps, schema_editor):
+    """Rebuild the mapping of every registered week from its entries (later rows win, like the import)."""
+    ReportWeek = apps.get_model('core_dashboard', 'ReportWeek')
+    RevenueEntry = apps.get_model('core_dashboard', 'RevenueEntry')
+    mappings = {}
+    rows = (
+        RevenueEntry.objects.exclude(engagement_partner__isnull=True).exclude(engagement_partner='')
+        .exclude(total_revenue_days_p_cp__isnull=True)
+        .order_by('id').values_list('date', 'engagement_partner', 'total_revenue_days_p_cp')
+    )
+    for date, partner, days in rows.iterator():
+        mappings.setdefault(date, {})[partner] = days
+    for week in ReportWeek.objects.filter(week_ending__in=list(mappings)):
+        week.partner_revenue_days = mappings[week.week_ending]
+        week.save(update_fields=['partner_revenue_days'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_dashboard', '0011_upload_registry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportweek',
+            name='partner_revenue_days',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(backfill_partner_revenue_days, migrations.RunPython.noop),
+    ]
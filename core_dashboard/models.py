@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from core_dashboard.utils import normalize_key
+
 class UploadHistory(models.Model):
     file_name = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -40,6 +42,38 @@ class SubArea(models.Model):
     def __str__(self):
         return self.name
 
+class Person(models.Model):
+    """A partner or manager as named in the uploads.
+
+    `key` is the normalized name (see utils.normalize_key) every spelling is
+    matched on; `name` is the first spelling seen and `aliases` the others.
+    """
+    name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, unique=True)
+    aliases = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        abstract = True
+        ordering = ['name']
+
+    @classmethod
+    def for_name(cls, name):
+        """The person called `name` (any spelling), created on first sight; None for blank names."""
+        key = normalize_key(name)
+        if not key:
+            return None
+        person, _ = cls.objects.get_or_create(key=key, defaults={'name': ' '.join(str(name).split())})
+        return person
+
+    def __str__(self):
+        return self.name
+
+class Partner(Person):
+    pass
+
+class Manager(Person):
+    pass
+
 class RevenueEntry(models.Model):
     date = models.DateField()
     client = models.ForeignKey(Client, on_delete=models.CASCADE)
@@ -49,6 +83,9 @@ class RevenueEntry(models.Model):
     revenue = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     engagement_partner = models.CharField(max_length=255, blank=True, null=True)
     engagement_manager = models.CharField(max_length=255, blank=True, null=True)
+    # Integer keys of the two names above, resolved at import; group and filter on these
+    partner = models.ForeignKey(Partner, on_delete=models.SET_NULL, null=True, blank=True, related_name='entries')
+    manager = models.ForeignKey(Manager, on_delete=models.SET_NULL, null=True, blank=True, related_name='entries')
     collections = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, null=True, blank=True)
     billing = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, null=True, blank=True)
     bcv_rate = models.DecimalField(max_digits=10, decimal_places=4, default=1.0000, null=True, blank=True)
@@ -59,6 +96,9 @@ class RevenueEntry(models.Model):
     engagement = models.CharField(max_length=255, blank=True, null=True)
     engagement_service_line = models.CharField(max_length=255, blank=True, null=True)
     engagement_sub_service_line = models.CharField(max_length=255, blank=True, null=True)
+    # normalize_key() of the two columns above (or of the area / sub area name), for indexed card lookups
+    service_line_key = models.CharField(max_length=255, blank=True, default='')
+    sub_service_line_key = models.CharField(max_length=255, blank=True, default='')
     fytd_charged_hours = models.FloatField(default=0.0, null=True, blank=True)
     fytd_direct_cost_amt = models.FloatField(default=0.0, null=True, blank=True)
     fytd_ansr_amt = models.FloatField(default=0.0, null=True, blank=True)
@@ -85,9 +125,96 @@ class RevenueEntry(models.Model):
     # Billing-related fields for Facturacion (Billed YTD) functionality  
     fytd_total_billed_amt = models.FloatField(default=0.0, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['service_line_key', 'date'], name='revenue_sl_key_date'),
+            models.Index(fields=['sub_service_line_key', 'date'], name='revenue_ssl_key_date'),
+        ]
+
+    # Source fields of the derived person FKs and match keys
+    KEY_SOURCES = {
+        'partner_id': ('engagement_partner',),
+        'manager_id': ('engagement_manager',),
+        'service_line_key': ('engagement_service_line', 'area_id'),
+        'sub_service_line_key': ('engagement_sub_service_line', 'sub_area_id'),
+    }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_sources()
+        return instance
+
+    def _remember_sources(self):
+        # Deferred fields are left out (reading them would query)
+        self._saved_sources = {
+            f: self.__dict__[f] for sources in self.KEY_SOURCES.values() for f in sources if f in self.__dict__
+        }
+
+    def _stale(self, target):
+        """True when `target` is empty or one of its source fields changed since the row was loaded."""
+        if not getattr(self, target):
+            return True
+        saved = getattr(self, '_saved_sources', {})
+        return any(f in saved and saved[f] != self.__dict__.get(f) for f in self.KEY_SOURCES[target])
+
+    def save(self, *args, **kwargs):
+        # Imports resolve the person keys in bulk; single saves resolve them here,
+        # again whenever the name or service line they come from was edited
+        if self._stale('partner_id'):
+            self.partner = Partner.for_name(self.engagement_partner)
+        if self._stale('manager_id'):
+            self.manager = Manager.for_name(self.engagement_manager)
+        if self._stale('service_line_key'):
+            self.service_line_key = normalize_key(self.engagement_service_line or (self.area.name if self.area_id else ''))
+        if self._stale('sub_service_line_key'):
+            self.sub_service_line_key = normalize_key(
+                self.engagement_sub_service_line or (self.sub_area.name if self.sub_area_id else '')
+            )
+        super().save(*args, **kwargs)
+        self._remember_sources()
+
     def __str__(self):
         return f"{self.date} - {self.client.name} - {self.revenue}"
 
+class ReportWeek(models.Model):
+    """Registry of imported report dates, written by the import pipeline.
+
+    Keeps week lookups (available weeks, latest week, previous fiscal month's
+    last report) as indexed reads on a tiny table instead of DISTINCT scans
+    over RevenueEntry.
+    """
+    week_ending = models.DateField(unique=True)  # report date as stored in RevenueEntry.date
+    week_start = models.DateField(db_index=True)  # Monday of the report's week
+    fiscal_period = models.CharField(max_length=32, db_index=True)  # e.g. 'Agosto 25'
+    row_count = models.IntegerField(default=0)
+    source_hashes = models.JSONField(default=dict, blank=True)  # {role: sha256 prefix of the uploaded file}
+    partner_revenue_days = models.JSONField(default=dict, blank=True)  # {engagement partner: Total Revenue Days P CP}
+    import_duration_seconds = models.FloatField(null=True, blank=True)
+    imported_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['week_ending']
+
+    def __str__(self):
+        return f"{self.week_ending} ({self.fiscal_period}): {self.row_count} rows"
+
+class DataGeneration(models.Model):
+    """Monotonic counter per data scope ('revenue', 'week:2025-08-15', 'cobranzas', ...).
+
+    Bumped whenever the data behind a scope changes; cache keys embed the
+    current value, so invalidating every derived result is a single UPDATE.
+    The random token changes when the row is re-created (e.g. a fresh
+    database), keeping keys from colliding with entries of an older counter.
+    """
+    scope = models.CharField(max_length=64, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+    token = models.CharField(max_length=16)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope}: {self.value}"
+
 class ExchangeRate(models.Model):
     date = models.DateField(unique=True)
     oficial_rate = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True)
@@ -102,3 +229,45 @@ class ExchangeRate(models.Model):
     def __str__(self):
         return f"Exchange Rates for {self.date}: Oficial={self.oficial_rate}, Paralelo={self.paralelo_rate}"
 
+
+class UploadBlob(models.Model):
+    """A distinct uploaded file, stored once under its SHA-256 (content-addressed).
+
+    Re-uploading the same bytes for any week points the dated name at the
+    existing blob instead of writing another copy.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField(default=0)
+    path = models.CharField(max_length=512)  # relative to MEDIA_ROOT
+    original_name = models.CharField(max_length=255, blank=True)
+    upload_count = models.PositiveIntegerField(default=1)
+    first_uploaded_at = models.DateTimeField(auto_now_add=True)
+    last_uploaded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.original_name})"
+
+class StageRun(models.Model):
+    """Latest run of one upload pipeline stage ('revenue_import', 'cobranzas', ...) for a scope.
+
+    `input_key` digests the input file hashes and the stage's code version; a
+    stage whose latest successful run has the same key, and whose guarded data
+    generation has not moved since, is skipped and its stored result reused.
+    """
+    stage = models.CharField(max_length=64)
+    scope = models.CharField(max_length=64)  # e.g. 'week:2025-08-15'
+    input_key = models.CharField(max_length=64)
+    code_version = models.CharField(max_length=16, blank=True)
+    inputs = models.JSONField(default=dict, blank=True)  # {role: sha256}
+    succeeded = models.BooleanField(default=False)
+    result = models.JSONField(default=dict, blank=True)
+    generations = models.JSONField(default=dict, blank=True)  # {scope: generation} right after the run
+    duration_seconds = models.FloatField(null=True, blank=True)
+    reuse_count = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [('stage', 'scope')]
+
+    def __str__(self):
+        return f"{self.stage} {self.scope}: {'ok' if self.succeeded else 'failed'}"
@@ -0,0 +1,25 @@
+"""
+Benchmarks Module
+=================
+
+Query-budget and latency regression suite for the hot views: the dashboard
+(shell, inline, manager, service line), the Cobranzas preview and the module
+uploads. Runs against a synthetic multi-year dataset built by
+`core_dashboard.utils.generate_mock_revenue_entries` and
+`generate_mock_workbooks`.
+
+- tests.py fails when a view goes over its query or workbook-read budget
+- `python manage.py benchmark_dashboard --json report.json` writes a report
+  that can be diffed between commits (`--compare old.json` prints the deltas)
+"""
+
+from .services import SCENARIOS, build_dataset, count_excel_reads, measure_scenario, over_budget, run_suite
+
+__all__ = [
+    'SCENARIOS',
+    'build_dataset',
+    'count_excel_reads',
+    'measure_scenario',
+    'over_budget',
+    'run_suite',
+]
@@ -0,0 +1,182 @@
+"""
+Query-budget and latency scenarios for the hot views.
+
+Each scenario is one request (dashboard, manager, service line, Cobranzas
+preview, module uploads) measured cold (derived-data caches cleared) and warm
+(right after a cold request): DB queries, workbook reads and wall time.
+`run_suite` returns a JSON-serializable report whose layout is stable, so
+reports from two commits can be diffed.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import openpyxl
+import pandas as pd
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core_dashboard.utils import generate_mock_revenue_entries, generate_mock_workbooks, mock_managers
+
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _upload(field, role):
+    def build(dataset):
+        path = dataset['workbooks'][role]
+        with open(path, 'rb') as fh:
+            return {field: SimpleUploadedFile(os.path.basename(path), fh.read(), content_type=XLSX)}
+    return build
+
+
+def _report_date(dataset):
+    return {'report_date': dataset['dates'][-1].isoformat()}
+
+
+# name, method, path, params (dict or callable(dataset)), budget
+# Budgets are upper bounds: {'cold': queries, 'warm': queries, 'excel_reads': warm workbook reads}.
+# They are the current counts (independent of the dataset size); lower them when a change saves work.
+SCENARIOS = [
+    # Uploads first: the read scenarios then see the module workbooks
+    {
+        'name': 'upload cobranzas', 'method': 'post', 'path': '/cobranzas/upload/',
+        'params': _upload('cobranzas_file', 'cobranzas'),
+        'budget': {'cold': 1, 'warm': 1, 'excel_reads': 2},
+    },
+    {
+        'name': 'upload facturacion', 'method': 'post', 'path': '/facturacion/upload/',
+        'params': _upload('facturacion_file', 'facturacion'),
+        'budget': {'cold': 1, 'warm': 1, 'excel_reads': 1},
+    },
+    {
+        'name': 'upload revenue days', 'method': 'post', 'path': '/manager-revenue-days/upload/',
+        'params': _upload('manager_revenue_days_file', 'revenue_days'),
+        'budget': {'cold': 1, 'warm': 1, 'excel_reads': 2},
+    },
+    {
+        'name': 'dashboard shell', 'method': 'get', 'path': '/', 'params': {},
+        'budget': {'cold': 14, 'warm': 5, 'excel_reads': 0},
+    },
+    {
+        'name': 'dashboard', 'method': 'get', 'path': '/', 'params': {'inline': '1'},
+        'budget': {'cold': 24, 'warm': 8, 'excel_reads': 1},
+    },
+    {
+        'name': 'manager', 'method': 'get', 'path': '/',
+        'params': {'manager': mock_managers()[0], 'inline': '1'},
+        'budget': {'cold': 29, 'warm': 20, 'excel_reads': 2},
+    },
+    {
+        'name': 'service line', 'method': 'get', 'path': '/',
+        'params': {'service_line': 'Assurance', 'inline': '1'},
+        'budget': {'cold': 18, 'warm': 8, 'excel_reads': 1},
+    },
+    {
+        'name': 'cobranzas preview', 'method': 'get', 'path': '/cobranzas/preview_data/', 'params': _report_date,
+        'budget': {'cold': 1, 'warm': 1, 'excel_reads': 2},
+    },
+]
+
+
+def build_dataset(workbook_dir, weeks=104, engagements=200, seed=42):
+    """Synthetic multi-year RevenueEntry history plus the module workbooks of its last week."""
+    dates = generate_mock_revenue_entries(weeks=weeks, engagements=engagements, seed=seed)
+    workbooks = generate_mock_workbooks(workbook_dir, dates[-1], engagements=engagements, seed=seed)
+    return {'dates': dates, 'workbooks': workbooks, 'weeks': weeks, 'engagements': engagements}
+
+
+@contextmanager
+def count_excel_reads():
+    """Count top-level workbook reads (pandas.read_excel, pandas.ExcelFile, openpyxl.load_workbook)."""
+    counter = {'reads': 0}
+    depth = [0]
+    originals = [(pd, 'read_excel'), (pd, 'ExcelFile'), (openpyxl, 'load_workbook')]
+    saved = [(owner, name, getattr(owner, name)) for owner, name in originals]
+
+    def counting(func):
+        def wrapper(*args, **kwargs):
+            if depth[0] == 0:
+                counter['reads'] += 1
+            depth[0] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+        return wrapper
+
+    for owner, name, func in saved:
+        setattr(owner, name, counting(func))
+    try:
+        yield counter
+    finally:
+        for owner, name, func in saved:
+            setattr(owner, name, func)
+
+
+def request_scenario(client, scenario, dataset):
+    params = scenario['params'](dataset) if callable(scenario['params']) else scenario['params']
+    response = getattr(client, scenario['method'])(scenario['path'], params)
+    if response.status_code != 200:
+        raise RuntimeError(f"{scenario['name']}: {scenario['path']} returned {response.status_code}")
+    return response
+
+
+def measure_scenario(client, scenario, dataset, cold=False):
+    """One request: {'queries', 'excel_reads', 'wall_ms'}; cold clears the cache first."""
+    if cold:
+        cache.clear()
+    with CaptureQueriesContext(connection) as queries, count_excel_reads() as excel:
+        start = time.perf_counter()
+        request_scenario(client, scenario, dataset)
+        wall_ms = (time.perf_counter() - start) * 1000
+    return {'queries': len(queries), 'excel_reads': excel['reads'], 'wall_ms': wall_ms, 'sql': [q['sql'] for q in queries]}
+
+
+def run_suite(client, dataset, repeat=3, scenarios=None):
+    """Report {'dataset': ..., 'scenarios': [{name, budget, cold, warm}]} for the given scenarios."""
+    results = []
+    for scenario in scenarios or SCENARIOS:
+        cold = measure_scenario(client, scenario, dataset, cold=True)
+        warm = [measure_scenario(client, scenario, dataset) for _ in range(max(1, repeat))]
+        walls = [run['wall_ms'] for run in warm]
+        results.append({
+            'name': scenario['name'],
+            'path': scenario['path'],
+            'budget': scenario['budget'],
+            'cold': {'queries': cold['queries'], 'excel_reads': cold['excel_reads'], 'wall_ms': round(cold['wall_ms'], 2)},
+            'warm': {
+                'queries': max(run['queries'] for run in warm),
+                'excel_reads': max(run['excel_reads'] for run in warm),
+                'wall_ms': {
+                    'min': round(min(walls), 2),
+                    'median': round(statistics.median(walls), 2),
+                    'max': round(max(walls), 2),
+                },
+            },
+        })
+    return {
+        'dataset': {
+            'weeks': dataset['weeks'],
+            'engagements': dataset['engagements'],
+            'first_week': dataset['dates'][0].isoformat(),
+            'last_week': dataset['dates'][-1].isoformat(),
+        },
+        'scenarios': results,
+    }
+
+
+def over_budget(report):
+    """[(scenario, metric, value, budget)] for every measurement above its budget."""
+    failures = []
+    for result in report['scenarios']:
+        budget = result['budget']
+        checks = [
+            ('cold queries', result['cold']['queries'], budget['cold']),
+            ('warm queries', result['warm']['queries'], budget['warm']),
+            ('warm excel reads', result['warm']['excel_reads'], budget['excel_reads']),
+        ]
+        failures += [(result['name'], metric, value, limit) for metric, value, limit in checks if value > limit]
+    return failures
@@ -0,0 +1,60 @@
+import json
+import shutil
+import tempfile
+
+import pandas as pd
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core_dashboard.models import RevenueEntry, ReportWeek
+from core_dashboard.utils import fiscal_year_label
+
+from .services import SCENARIOS, build_dataset, count_excel_reads, measure_scenario, over_budget, run_suite
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Two fiscal years and a bit, small enough to build quickly
+        self.dataset = build_dataset(f'{self.media_root}/source', weeks=60, engagements=12)
+
+    def test_mock_history_spans_fiscal_years(self):
+        dates = self.dataset['dates']
+        self.assertEqual(ReportWeek.objects.count(), 60)
+        self.assertEqual(RevenueEntry.objects.count(), 60 * 12)
+        self.assertGreater(len({fiscal_year_label(d) for d in dates}), 1)
+
+        # FYTD amounts restart with the fiscal year
+        first_of_fy = next(d for d in dates if fiscal_year_label(d) == fiscal_year_label(dates[-1]))
+        before = dates[dates.index(first_of_fy) - 1]
+        fytd = dict(RevenueEntry.objects.filter(engagement_id='E-00000').values_list('date', 'fytd_ansr_amt'))
+        self.assertLess(fytd[first_of_fy], fytd[before])
+
+        sheets = {role: pd.ExcelFile(path).sheet_names for role, path in self.dataset['workbooks'].items()}
+        self.assertEqual(sheets['cobranzas'], ['Cobranzas'])
+        self.assertEqual(sheets['facturacion'], [fiscal_year_label(dates[-1])])
+        self.assertEqual(sheets['revenue_days'], ['RevenueDays'])
+
+    def test_views_stay_within_budget(self):
+        report = run_suite(self.client, self.dataset, repeat=1)
+        self.assertEqual([r['name'] for r in report['scenarios']], [s['name'] for s in SCENARIOS])
+        self.assertEqual(over_budget(report), [], msg=json.dumps(report['scenarios'], indent=1))
+        json.dumps(report)
+
+    def test_cached_dashboard_query_count(self):
+        dashboard = next(s for s in SCENARIOS if s['name'] == 'dashboard')
+        measure_scenario(self.client, dashboard, self.dataset, cold=True)
+        with self.assertNumQueries(dashboard['budget']['warm']):
+            self.client.get('/', {'inline': '1'})
+
+    def test_excel_read_counter(self):
+        with count_excel_reads() as excel:
+            pd.read_excel(self.dataset['workbooks']['cobranzas'])
+            pd.ExcelFile(self.dataset['workbooks']['facturacion']).parse(0)
+        self.assertEqual(excel['reads'], 2)
+        self.assertNotEqual(pd.read_excel.__name__, 'wrapper')
@@ -372,6 +372,7 @@ class CobranzasService:
             except Exception:
                 # silently ignore cache-clearing errors
                 pass
+            self._bump_generation()
 
             return result
 
@@ -1128,8 +1129,17 @@ class CobranzasService:
                 os.remove(self._cache_file)
         except Exception:
             pass
+        self._bump_generation()
         return {'success': True, 'message': f'Cleared {len(cleared)} files', 'cleared_files': cleared}
 
+    def _bump_generation(self):
+        """Invalidate generation-keyed caches built from the Cobranzas files."""
+        try:
+            from core_dashboard.modules.data_cache import COBRANZAS_SCOPE, bump_generation
+            bump_generation(COBRANZAS_SCOPE)
+        except Exception as e:
+            logger.warning(f"Could not bump Cobranzas data generation: {e}")
+
     def get_collected_total_from_latest(self):
         info = self.get_latest_file_info()
         if not info:
@@ -8,6 +8,8 @@ import json
 from .utils import format_file_size
 from django.shortcuts import render
 import pandas as pd
+from core_dashboard.decorators import conditional_page
+from core_dashboard.modules.data_cache import COBRANZAS_SCOPE
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +72,7 @@ def clear_cobranzas(request):
 
 
 @require_http_methods(["GET"])
+@conditional_page(scopes=(COBRANZAS_SCOPE,), template='core_dashboard/cobranzas_preview.html')
 def preview_cobranzas(request):
     """Render a focused analysis window for Cobranzas with USD/VES breakdowns."""
     try:
@@ -178,6 +181,7 @@ def preview_cobranzas(request):
 
 
 @require_http_methods(["GET"])
+@conditional_page(scopes=(COBRANZAS_SCOPE,))
 def preview_cobranzas_data(request):
     """AJAX endpoint: given report_date=YYYY-MM-DD return computed aggregates for that cutoff.
 
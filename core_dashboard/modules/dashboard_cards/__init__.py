@@ -0,0 +1,53 @@
+"""
+Dashboard Cards Module
+======================
+
+Splits the dashboard into a fast shell (header and filters) plus independent
+card groups, each with its own JSON endpoint:
+
+- macro: Macro KPI cards with the metas_SL goals
+- cobranzas: Cobranzas (Collected YTD) and Facturacion (Billed YTD) cards
+- rankings: Key Performance Indicators rankings
+- trend: daily revenue trend series (data only)
+- exchange: exchange rate header and differential chart
+- sl: Service Line / Sub Service Line cards
+- manager: Manager Specification cards
+- partner: Partner Specification cards
+
+The shell page fetches the visible groups in parallel, so a slow group (the
+exchange-rate mailbox check, the Cobranzas workbook) no longer holds back the
+rest of the page. `?inline=1` renders every group into the page server-side.
+
+The async views (`/async/` and `/cards/`) compute every visible group
+concurrently (see async_cards), so their latency tracks the slowest group.
+
+The rankings group only ships the top 5 managers, clients and engagements;
+the full rankings on the back of the flip cards are fetched page by page
+(keyset cursor) from `/cards/ranking/<managers|clients|engagements|partners>/`.
+"""
+
+from .services import (
+    CARD_GROUPS,
+    CARD_TEMPLATES,
+    DashboardFilters,
+    build_card,
+    compute_cumulative_goal,
+    ranking_page_data,
+    render_card,
+    visible_groups,
+)
+from .async_cards import FILE_BOUND_GROUPS, gather_cards, load_filters
+
+__all__ = [
+    'CARD_GROUPS',
+    'CARD_TEMPLATES',
+    'DashboardFilters',
+    'FILE_BOUND_GROUPS',
+    'build_card',
+    'compute_cumulative_goal',
+    'gather_cards',
+    'load_filters',
+    'ranking_page_data',
+    'render_card',
+    'visible_groups',
+]
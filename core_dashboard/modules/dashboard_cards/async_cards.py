@@ -0,0 +1,125 @@
+"""
+Concurrent card computation for the async dashboard views.
+
+The card groups are independent, so an async view can compute all of them at
+once and answer in roughly the time of the slowest group instead of the sum:
+
+- database-bound groups run through ``sync_to_async(thread_sensitive=False)``,
+  each on its own worker thread (and database connection);
+- file-bound groups (the Cobranzas workbook, the exchange-rate mailbox and
+  workbook) run on a small bounded pool, so a burst of requests cannot pile
+  up unbounded Excel reads.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from core_dashboard.modules.data_cache import BASE_SCOPES, get_generations
+
+from .services import CARD_GROUPS, DashboardFilters, render_card
+
+logger = logging.getLogger(__name__)
+
+FILE_BOUND_GROUPS = ('cobranzas', 'exchange')
+
+_file_pool = None
+_file_pool_lock = threading.Lock()
+
+
+def file_pool():
+    """Bounded executor for file-bound card groups (``DASHBOARD_CARD_FILE_WORKERS`` threads)."""
+    global _file_pool
+    with _file_pool_lock:
+        if _file_pool is None:
+            _file_pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DASHBOARD_CARD_FILE_WORKERS', 2),
+                thread_name_prefix='dashboard-card-file',
+            )
+    return _file_pool
+
+
+def _run_card(group, filters, request=None):
+    """Render one group on a worker thread; never raises, always reports its time."""
+    start = time.perf_counter()
+    try:
+        html, data = render_card(group, filters, request=request)
+        result = {'success': True, 'html': html, 'data': data}
+    except Exception as e:
+        logger.exception(f"Dashboard card group '{group}' failed")
+        result = {'success': False, 'html': None, 'data': None, 'error': str(e)}
+    finally:
+        # Worker threads keep their own connections; close them once past CONN_MAX_AGE
+        close_old_connections()
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def _prepare(filters):
+    """Shared state the workers would otherwise race to create.
+
+    The template context is memoized on the filters, and data-generation rows
+    are created on first read; doing both once up front keeps the workers to
+    plain reads.
+    """
+    try:
+        filters.template_context()
+        get_generations(BASE_SCOPES + tuple(filters.week_scopes))
+    finally:
+        close_old_connections()
+
+
+def _load_filters(params):
+    filters = DashboardFilters(params)
+    _prepare(filters)
+    return filters
+
+
+async def load_filters(params):
+    """DashboardFilters for a query string, built on a worker thread and prepared for gather_cards."""
+    return await sync_to_async(_load_filters, thread_sensitive=False)(params)
+
+
+async def gather_cards(filters, groups, request=None):
+    """Compute the given card groups concurrently.
+
+    Returns {'cards': {group: {success, html, data, elapsed_ms[, error]}},
+    'timings': {total_ms, slowest_ms, sum_ms, slowest_group}}. Unknown groups
+    are reported as failed entries instead of raising.
+    """
+    start = time.perf_counter()
+    await sync_to_async(_prepare, thread_sensitive=False)(filters)
+
+    calls = []
+    for group in groups:
+        if group not in CARD_GROUPS:
+            calls.append(_unknown_group(group))
+        elif group in FILE_BOUND_GROUPS:
+            calls.append(sync_to_async(_run_card, thread_sensitive=False, executor=file_pool())(group, filters, request))
+        else:
+            calls.append(sync_to_async(_run_card, thread_sensitive=False)(group, filters, request))
+    results = await asyncio.gather(*calls)
+
+    cards = dict(zip(groups, results))
+    elapsed = {group: card['elapsed_ms'] for group, card in cards.items()}
+    slowest_group = max(elapsed, key=elapsed.get) if elapsed else None
+    timings = {
+        'total_ms': round((time.perf_counter() - start) * 1000, 1),
+        'slowest_ms': elapsed[slowest_group] if slowest_group else 0.0,
+        'sum_ms': round(sum(elapsed.values()), 1),
+        'slowest_group': slowest_group,
+    }
+    logger.info(
+        f"Dashboard cards {', '.join(f'{g}={ms}ms' for g, ms in elapsed.items())}; "
+        f"total {timings['total_ms']}ms (slowest {slowest_group}, sum {timings['sum_ms']}ms)"
+    )
+    return {'cards': cards, 'timings': timings}
+
+
+async def _unknown_group(group):
+    return {'success': False, 'html': None, 'data': None, 'elapsed_ms': 0.0, 'error': f"Unknown card group '{group}'"}
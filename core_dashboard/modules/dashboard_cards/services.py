@@ -0,0 +1,1029 @@
+"""
+Context builders for the dashboard card groups.
+
+Every builder takes a `DashboardFilters` and returns a plain dict that is both
+the template context of the group's partial and its JSON payload, so the
+builders must only return lists, dicts and scalars (no querysets).
+"""
+import datetime
+import logging
+import os
+import traceback
+from urllib.parse import urlencode
+
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core_dashboard.models import RevenueEntry
+from core_dashboard.modules import ranking_module
+from core_dashboard.modules.data_cache import (
+    BASE_SCOPES, COBRANZAS_SCOPE, FACTURACION_SCOPE, MANAGER_REVENUE_DAYS_SCOPE, REVENUE_SCOPE,
+    cached, get_generations, week_scope,
+)
+from core_dashboard.modules.exchange_rate_module import get_exchange_rate_data
+from core_dashboard.modules.goal_rankings import goal_rankings
+from core_dashboard.modules.manager_revenue_days import ManagerAnalyticsService
+from core_dashboard.modules.olap import Selection, engine_for
+from core_dashboard.modules.perf import span
+from core_dashboard.modules.report_weeks import get_available_weeks, get_partner_revenue_days, get_week_range
+from core_dashboard.templatetags.format_filters import format_number
+from core_dashboard.utils import get_fiscal_month_year, normalize_key
+
+# Optional Cobranzas module
+try:
+    from core_dashboard.modules.cobranzas.services import CobranzasService
+except Exception:
+    CobranzasService = None
+# Service Line cards module (provides four SL-specific KPI cards)
+try:
+    from core_dashboard.modules.service_line_cards.services import ServiceLineCardsService
+except Exception:
+    ServiceLineCardsService = None
+# Sub Service Line (SSL) cards module
+try:
+    from core_dashboard.modules.sub_service_line_cards.services import SubServiceLineCardsService
+except Exception:
+    SubServiceLineCardsService = None
+try:
+    # Import programmatic IMAP fetcher; safe import if module exists
+    from core_dashboard.management.commands.fetch_exchange_emails import fetch_and_update
+except Exception:
+    fetch_and_update = None
+
+logger = logging.getLogger(__name__)
+
+
+# Helper: compute cumulative goal from fiscal year start up to report date
+def compute_cumulative_goal(metas_df, label_col, label_value, current_report_date, goal_col, mes_col='Mes', match_contains=False, label_eq=False):
+    """
+    Sum monthly goals from fiscal year start (July) up to the fiscal month that contains current_report_date.
+
+    metas_df: pandas DataFrame with a column 'Mes' containing strings like 'Julio 25', 'Agosto 25', ... or 'Total'
+    label_col: column name to match (e.g., 'Partner', 'Manager', 'SL')
+    label_value: value to match for label_col (string)
+    current_report_date: datetime.date indicating the reporting date
+    goal_col: column name containing the numeric monthly goal (e.g., 'ANSR Goal')
+    match_contains: if True, match label_col using case-insensitive contains; else equality (after strip/lower)
+    label_eq: if True, match label_col with exact equality (case-sensitive strip), used for SL rows like 'Total general'
+    """
+    try:
+        import calendar
+        if current_report_date is None:
+            return 0
+
+        # Determine fiscal year start (July of fiscal year)
+        if current_report_date.month >= 7:
+            fy_start_year = current_report_date.year
+        else:
+            fy_start_year = current_report_date.year - 1
+
+        # Build months from July (7) of fy_start_year up to the fiscal month for current_report_date
+        months = []
+        # fiscal target month and year
+        target_month = None
+        target_year = None
+        # compute fiscal month name/year string for target using existing helper
+        target_label = get_fiscal_month_year(current_report_date)
+
+        # iterate months starting July
+        m = 7
+        y = fy_start_year
+        while True:
+            month_name = calendar.month_name[m]
+            # Spanish month names mapping in get_fiscal_month_year uses Spanish names; try to map English->Spanish
+            # Create a simple map to Spanish short names used in metas files
+            es_map = {
+                'January': 'Enero', 'February': 'Febrero', 'March': 'Marzo', 'April': 'Abril', 'May': 'Mayo', 'June': 'Junio',
+                'July': 'Julio', 'August': 'Agosto', 'September': 'Septiembre', 'October': 'Octubre', 'November': 'Noviembre', 'December': 'Diciembre'
+            }
+            es_month = es_map.get(month_name, month_name)
+            mes_label = f"{es_month} {y % 100}"
+            months.append(mes_label)
+            if mes_label == target_label:
+                break
+            # advance month
+            m += 1
+            if m > 12:
+                m = 1
+                y += 1
+            # safety: avoid infinite loop
+            if len(months) > 12:
+                break
+
+        # Sum goal_col for all matching rows across the months list
+        total = 0
+        for mes in months:
+            try:
+                if label_col and not label_eq:
+                    if match_contains:
+                        rows = metas_df[metas_df[label_col].astype(str).str.strip().str.lower().str.contains(str(label_value).strip().lower(), na=False) & (metas_df[mes_col] == mes)]
+                    else:
+                        rows = metas_df[(metas_df[label_col].astype(str).str.strip().str.lower() == str(label_value).strip().lower()) & (metas_df[mes_col] == mes)]
+                elif label_col and label_eq:
+                    rows = metas_df[(metas_df[label_col].astype(str).str.strip() == str(label_value).strip()) & (metas_df[mes_col] == mes)]
+                else:
+                    rows = metas_df[metas_df[mes_col] == mes]
+                if not rows.empty and goal_col in rows.columns:
+                    s = rows[goal_col].astype(float).sum()
+                    total += float(s or 0)
+            except Exception:
+                continue
+        return float(total)
+    except Exception:
+        return 0
+
+
+# Sums read by the Macro KPI cards, fetched with a single aggregate query
+MACRO_SUM_FIELDS = (
+    'fytd_ansr_sintetico', 'fytd_direct_cost_amt', 'fytd_charged_hours', 'mtd_charged_hours',
+    'fytd_diferencial_final', 'diferencial_mtd', 'mtd_direct_cost_amt',
+)
+METAS_FILES = ('metas_PPED.csv', 'metas_MANAGERS.csv', 'metas_SL.csv')
+
+# Full rankings served page by page to the flip cards (see ranking_page_data)
+RANKING_DIMENSIONS = {
+    'partners': 'partner__name',
+    'managers': 'manager__name',
+    'clients': 'client__name',
+    # contract__name (existing field) for engagement/contract labels
+    'engagements': 'contract__name',
+}
+MAX_RANKING_PAGE_SIZE = 200
+
+# Rendered dashboard fragments are keyed by data generation, so they can live long
+FRAGMENT_CACHE_TIMEOUT = 24 * 3600
+
+
+def aggregate_kpis(selection, fields=MACRO_SUM_FIELDS):
+    """Sum() of every field plus the distinct client count; missing sums are 0."""
+    sums = engine_for(selection).totals(selection, fields, distinct=('client',))
+    result = {field: sums[field] or 0 for field in fields}
+    result['clients'] = sums['client__distinct']
+    return result
+
+
+def metas_signature():
+    """mtimes of the goal CSVs, so cached rankings follow edits to the metas files."""
+    signature = []
+    for name in METAS_FILES:
+        try:
+            signature.append(os.path.getmtime(os.path.join(settings.BASE_DIR, name)))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def exchange_workbook_path():
+    return os.path.join(settings.BASE_DIR, 'dolar excel', 'Historial_TCBinance.xlsx')
+
+
+def dashboard_source_files():
+    """Non-database inputs of the dashboard: goal CSVs and the exchange workbook."""
+    return [os.path.join(settings.BASE_DIR, name) for name in METAS_FILES] + [exchange_workbook_path()]
+
+
+def dashboard_scopes():
+    return BASE_SCOPES
+
+
+def latest_report_date():
+    """Newest weekly folder of historico_de_final_database, so the cards can link to previews."""
+    try:
+        data_dir = os.path.join(settings.MEDIA_ROOT, 'historico_de_final_database')
+        if os.path.exists(data_dir):
+            weekly_dirs = [d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d))]
+            if weekly_dirs:
+                return sorted(weekly_dirs, reverse=True)[0]
+    except Exception as e:
+        logger.warning(f"Error computing latest_report_date: {e}")
+    return None
+
+
+def fragment_keys(filters, report_week, report_date, exchange_path):
+    """Vary-on strings for the {% fragment_cache %} sections of the dashboard.
+
+    Each key combines the selected filters with the generations of the data the
+    section shows, so uploads and clears re-render only what they affect.
+    """
+    week = week_scope(report_week) if report_week else REVENUE_SCOPE
+    gens = get_generations([REVENUE_SCOPE, MANAGER_REVENUE_DAYS_SCOPE, COBRANZAS_SCOPE, FACTURACION_SCOPE, week])
+    filter_key = '|'.join('' if f is None else str(f) for f in filters)
+    metas = metas_signature()
+    try:
+        exchange_version = (os.path.getmtime(exchange_path), os.path.getsize(exchange_path))
+    except OSError:
+        exchange_version = None
+    return {
+        'filters': f"{gens[REVENUE_SCOPE]}:{gens[MANAGER_REVENUE_DAYS_SCOPE]}:{filter_key}",
+        'macro': f"{gens[week]}:{filter_key}:{metas}:{report_date}",
+        'cobranzas': f"{gens[COBRANZAS_SCOPE]}:{gens[FACTURACION_SCOPE]}:{filter_key}:{report_date}",
+        'rankings': f"{gens[week]}:{filter_key}:{metas}",
+        'exchange': f"{exchange_version}",
+    }
+
+
+def clamp_percent(value):
+    """Completion percentage as a 0-100 integer, safe for a progress bar width."""
+    try:
+        v = float(value)
+    except Exception:
+        return 0
+    if v < 0:
+        return 0
+    if v > 100:
+        return 100
+    return int(round(v))
+
+
+class DashboardFilters:
+    """Filter state shared by the dashboard shell and every card group.
+
+    Parsed from the query string (partner, manager, service_line,
+    sub_service_line, client, week); resolves the selected report week and
+    builds the querysets the card groups aggregate over.
+    """
+
+    @span('filters')
+    def __init__(self, params):
+        self.partner = params.get('partner')
+        self.manager = params.get('manager')
+        self.area = params.get('service_line')
+        self.sub_area = params.get('sub_service_line')
+        self.client = params.get('client')
+        self.week = params.get('week')
+
+        # Distinct weeks for filtering (formatted to Friday's date) come from the
+        # report-week registry written at import time.
+        self.available_weeks = get_available_weeks()
+        self.friday_date = None
+        if self.week:
+            self.friday_date = datetime.datetime.strptime(self.week, '%Y-%m-%d').date()
+            self.start_of_week, self.end_of_week = get_week_range(self.friday_date)
+        elif self.available_weeks:
+            # Default to the most recent week if no week is selected
+            self.start_of_week, self.end_of_week = get_week_range()
+        else:
+            self.start_of_week, self.end_of_week = None, None
+
+        # Derived results are cached under keys embedding the data generation
+        # of the selected report week, so a re-import or a clear invalidates them
+        # for every process at once.
+        self.report_week = self.week or (self.available_weeks[-1] if self.available_weeks else None)
+        self.report_date = (
+            datetime.datetime.strptime(self.report_week, '%Y-%m-%d').date() if self.report_week else None
+        )
+        self.week_scopes = (week_scope(self.report_week),) if self.report_week else (REVENUE_SCOPE,)
+        self.filter_parts = (
+            self.start_of_week, self.end_of_week, self.partner, self.manager,
+            self.area, self.sub_area, self.client,
+        )
+        self._template_context = None
+
+    def base_selection(self):
+        """Rows of the selected week, for the aggregation engine."""
+        if self.start_of_week is None:
+            return Selection.none()
+        return Selection({'date__range': (self.start_of_week, self.end_of_week)})
+
+    def macro_selection(self):
+        """Rows of the selected week narrowed by service line, sub service line and client."""
+        return self.base_selection().narrow(
+            area__name=self.area or None, sub_area__name=self.sub_area or None, client__name=self.client or None,
+        )
+
+    def kpi_selection(self):
+        """Rows of the selected week narrowed by every selected filter."""
+        return self.macro_selection().narrow(
+            partner__key=normalize_key(self.partner) or None, manager__key=normalize_key(self.manager) or None,
+        )
+
+    def base_entries(self):
+        return self.base_selection().queryset()
+
+    def macro_entries(self):
+        return self.macro_selection().queryset()
+
+    def kpi_entries(self):
+        return self.kpi_selection().queryset()
+
+    def query_string(self):
+        """The selected filters as a query string, for links to the card endpoints."""
+        params = {
+            'partner': self.partner, 'manager': self.manager, 'service_line': self.area,
+            'sub_service_line': self.sub_area, 'client': self.client, 'week': self.week,
+        }
+        return urlencode({name: value for name, value in params.items() if value})
+
+    def template_context(self):
+        """Values every card partial may read (selected filters, fragment cache keys)."""
+        if self._template_context is None:
+            report_date = latest_report_date()
+            self._template_context = {
+                'filter_query': self.query_string(),
+                'selected_partner': self.partner,
+                'selected_manager': self.manager,
+                'selected_area': self.area,
+                'selected_sub_area': self.sub_area,
+                'selected_client': self.client,
+                'selected_week': self.week,
+                'latest_report_date': report_date,
+                'fragment_cache_timeout': FRAGMENT_CACHE_TIMEOUT,
+                'fragment_keys': fragment_keys(
+                    self.filter_parts + (self.week,), self.report_week, report_date, exchange_workbook_path()
+                ),
+            }
+        return self._template_context
+
+
+def _metas_frame(name):
+    path = os.path.join(settings.BASE_DIR, name)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path)
+
+
+def _macro_goals(filters, ansr_fytd_value, ansr_mtd_value, fytd_hours, mtd_hours):
+    """Firm-wide goals from metas_SL.csv ('Total general' rows) and their completion."""
+    goals = {
+        'ansr_fytd_goal': 0,
+        'ansr_mtd_goal': 0,
+        'ansr_fytd_completion_percentage': 0,
+        'ansr_mtd_completion_percentage': 0,
+        'hours_fytd_goal': 0,
+        'hours_mtd_goal': 0,
+        'hours_fytd_completion_percentage': 0,
+        'hours_mtd_completion_percentage': 0,
+    }
+    try:
+        metas_sl_df = _metas_frame('metas_SL.csv')
+        current_report_date = filters.report_date
+        if metas_sl_df is not None:
+            if current_report_date:
+                fiscal_month_name_for_goal = get_fiscal_month_year(current_report_date)
+
+                # Get monthly goal (ANSR MTD Goal) based on fiscal month (kept for MTD display)
+                monthly_goal_row = metas_sl_df[(metas_sl_df['SL'] == 'Total general') & (metas_sl_df['Mes'] == fiscal_month_name_for_goal)]
+                if not monthly_goal_row.empty:
+                    goals['ansr_mtd_goal'] = float(monthly_goal_row['ANSR Goal'].iloc[0])
+                    goals['hours_mtd_goal'] = float(monthly_goal_row['Horas Goal'].iloc[0])
+
+                # Compute FYTD goal as cumulative sum of monthly goals from fiscal year start up to report month
+                try:
+                    goals['ansr_fytd_goal'] = compute_cumulative_goal(metas_sl_df, 'SL', 'Total general', current_report_date, 'ANSR Goal', mes_col='Mes', match_contains=False, label_eq=True)
+                    goals['hours_fytd_goal'] = compute_cumulative_goal(metas_sl_df, 'SL', 'Total general', current_report_date, 'Horas Goal', mes_col='Mes', match_contains=False, label_eq=True)
+                except Exception as e:
+                    logger.debug(f"Error computing cumulative SL goals: {e}")
+
+            if goals['ansr_fytd_goal'] > 0:
+                goals['ansr_fytd_completion_percentage'] = (ansr_fytd_value / goals['ansr_fytd_goal']) * 100
+            if goals['ansr_mtd_goal'] > 0:
+                goals['ansr_mtd_completion_percentage'] = (ansr_mtd_value / goals['ansr_mtd_goal']) * 100
+            if goals['hours_fytd_goal'] > 0:
+                goals['hours_fytd_completion_percentage'] = (fytd_hours / goals['hours_fytd_goal']) * 100
+            if goals['hours_mtd_goal'] > 0:
+                goals['hours_mtd_completion_percentage'] = (mtd_hours / goals['hours_mtd_goal']) * 100
+    except Exception as e:
+        print(f"Error processing goals: {e}")
+        traceback.print_exc() # Print full traceback for debugging
+
+    for key in ('ansr_fytd_completion_percentage', 'ansr_mtd_completion_percentage',
+                'hours_fytd_completion_percentage', 'hours_mtd_completion_percentage'):
+        goals[f"{key}_style"] = clamp_percent(goals[key])
+    return goals
+
+
+def build_macro(filters):
+    """Macro KPI cards.
+
+    Hours, Diferencial and the MTD cost/RPH/margin cards cover the selected
+    week narrowed by service line, sub service line and client; ANSR, RPH YTD
+    and Margin YTD also follow the partner and manager filters.
+    """
+    macro_kpis = cached(
+        'dashboard:macro_kpis',
+        (filters.start_of_week, filters.end_of_week, filters.area, filters.sub_area, filters.client),
+        lambda: aggregate_kpis(filters.macro_selection()),
+        scopes=filters.week_scopes,
+    )
+    filtered_kpis = cached(
+        'dashboard:filtered_kpis', filters.filter_parts, lambda: aggregate_kpis(filters.kpi_selection()),
+        scopes=filters.week_scopes,
+    )
+
+    total_fytd_charged_hours = macro_kpis['fytd_charged_hours']
+    total_mtd_charged_hours = macro_kpis['mtd_charged_hours']
+    macro_scope_rph = (macro_kpis['fytd_ansr_sintetico'] / total_fytd_charged_hours) if total_fytd_charged_hours else 0
+    macro_scope_tracker = total_mtd_charged_hours * macro_scope_rph
+    # Sum for new Diferencial Final MTD column and convert to absolute value
+    # Use abs() for display since we want to show the magnitude of the difference
+    macro_diferencial_mtd = abs(macro_kpis['diferencial_mtd'])
+    # Sum of MTD direct cost (per row field mtd_direct_cost_amt)
+    macro_mtd_direct_cost = macro_kpis['mtd_direct_cost_amt']
+    # RPH MTD: ANSR MTD / total MTD charged hours
+    macro_rph_mtd = (macro_scope_tracker / total_mtd_charged_hours) if total_mtd_charged_hours else 0
+    # Margin MTD: ANSR MTD minus sum(MTD_DirectCostAmt)
+    macro_mtd_margin_value = macro_scope_tracker - macro_mtd_direct_cost
+    macro_mtd_margin_percentage = (macro_mtd_margin_value / macro_scope_tracker * 100) if macro_scope_tracker else 0
+
+    # Use the synthetic ANSR field for the Macro ANSR YTD metric
+    macro_total_ansr_sintetico = filtered_kpis['fytd_ansr_sintetico']
+    macro_margin = macro_total_ansr_sintetico - filtered_kpis['fytd_direct_cost_amt']
+    macro_margin_percentage = (macro_margin / macro_total_ansr_sintetico * 100) if macro_total_ansr_sintetico else 0
+    filtered_hours = filtered_kpis['fytd_charged_hours']
+    macro_rph = (macro_total_ansr_sintetico / filtered_hours) if filtered_hours else 0
+    macro_monthly_tracker = filtered_kpis['mtd_charged_hours'] * macro_rph
+
+    context = {
+        'macro_total_clients': "{:,.0f}".format(filtered_kpis['clients']),
+        'macro_total_ansr_sintetico': macro_total_ansr_sintetico,
+        # Keep existing formatted strings for backward compatibility
+        'macro_margin': "${:,.2f}".format(macro_margin),
+        'macro_margin_percentage': "{:.2f}%".format(macro_margin_percentage),
+        # Provide numeric values for templates that need numeric formatting
+        'macro_margin_value': macro_margin,
+        'macro_margin_percentage_value': macro_margin_percentage,
+        'macro_rph_value': macro_rph,
+        'macro_rph': "${:,.2f}".format(macro_rph),
+        'macro_monthly_tracker': macro_monthly_tracker,
+        'total_fytd_charged_hours': "{:,.0f}".format(total_fytd_charged_hours),
+        'total_mtd_charged_hours': "{:,.0f}".format(total_mtd_charged_hours),
+        'macro_diferencial_final': macro_kpis['fytd_diferencial_final'],
+        'macro_diferencial_mtd': macro_diferencial_mtd,
+        # MTD-specific metrics exposed to templates
+        'macro_mtd_direct_cost': macro_mtd_direct_cost,
+        'macro_rph_mtd': macro_rph_mtd,
+        'macro_mtd_margin_value': macro_mtd_margin_value,
+        'macro_mtd_margin_percentage': macro_mtd_margin_percentage,
+        # Default pill values (previous year and promedio) - kept None so template shows placeholders
+        'ansr_fytd_prev_year': None,
+        'ansr_fytd_promedio': None,
+        'hours_fytd_prev_year': None,
+        'hours_fytd_promedio': None,
+        'rph_prev_year': None,
+        'rph_promedio': None,
+        'margin_prev_year': None,
+        'margin_promedio': None,
+        'ansr_fytd_value': macro_total_ansr_sintetico,
+        'ansr_mtd_value': macro_monthly_tracker,
+    }
+    context.update(_macro_goals(
+        filters, macro_total_ansr_sintetico, macro_monthly_tracker, total_fytd_charged_hours, total_mtd_charged_hours
+    ))
+    return context
+
+
+def build_cobranzas(filters):
+    """Cobranzas (Collected YTD) and Facturacion (Billed YTD) cards, read from the processed module files."""
+    # Prefer processed Cobranzas module totals exclusively when available; otherwise default to 0
+    macro_collected_total = 0.0
+    macro_billed_total = 0.0
+    try:
+        if CobranzasService is not None:
+            cobr_service = CobranzasService()
+            # If a week filter is selected, compute cumulative collected up to that date
+            try:
+                if filters.week:
+                    try:
+                        macro_collected_total = float(cobr_service.get_cumulative_collected_up_to(filters.week) or 0.0)
+                    except Exception:
+                        macro_collected_total = float(cobr_service.get_cumulative_collected_total() or 0.0)
+                else:
+                    # Use cumulative collected total across all processed reports for the Macro card
+                    macro_collected_total = float(cobr_service.get_cumulative_collected_total() or 0.0)
+            except Exception:
+                # fallback to latest file collected
+                latest_info = cobr_service.get_latest_file_info()
+                if latest_info:
+                    try:
+                        macro_collected_total, _ = cobr_service.get_totals_from_file(latest_info['path'])
+                    except Exception:
+                        macro_collected_total = cobr_service.get_collected_total_from_latest()
+            # Try to get billed total from Facturacion module if available
+            try:
+                from core_dashboard.modules.facturacion.services import FacturacionService
+                fact_service = FacturacionService()
+                latest_info = fact_service.get_latest_file_info()
+                if latest_info:
+                    if filters.friday_date:
+                        # Sum up to the selected report date
+                        try:
+                            macro_billed_total = float(fact_service.get_totals_from_file(latest_info['path'], up_to_date=filters.friday_date) or 0.0)
+                        except Exception:
+                            macro_billed_total = float(fact_service.get_totals_from_file(latest_info['path']) or 0.0)
+                    else:
+                        macro_billed_total = float(fact_service.get_totals_from_file(latest_info['path']) or 0.0)
+            except Exception as e:
+                logger.warning(f"Error getting Facturacion totals: {e}")
+                macro_billed_total = 0.0
+    except Exception as e:
+        logger.warning(f"Error getting Cobranzas totals: {e}")
+
+    return {
+        'macro_collected_total': macro_collected_total,
+        'macro_collected_total_formatted': "${:,.2f}".format(macro_collected_total),
+        'macro_billed_total': macro_billed_total,
+        'macro_billed_total_formatted': "${:,.2f}".format(macro_billed_total),
+        # Collected and Billed pill defaults for Macro Cobranzas/Facturacion cards
+        'collected_fytd_prev_year': None,
+        'collected_fytd_promedio': None,
+        'billed_fytd_prev_year': None,
+        'billed_fytd_promedio': None,
+    }
+
+
+def _revenue_by_partner(selection):
+    """Partners ordered by synthetic ANSR, revenue pre-formatted for the flip cards."""
+    ranked = engine_for(selection).grouped(
+        selection, 'partner__name', {'total_revenue': 'fytd_ansr_sintetico'},
+        order_by='-total_revenue', exclude_blank=True,
+    )
+    return [
+        {'engagement_partner': p['partner__name'], 'total_revenue': "${:,.2f}".format(p['total_revenue'] or 0)}
+        for p in ranked
+    ]
+
+
+def build_rankings(filters):
+    """Key Performance Indicators: top lists, flip-card rankings and the goal rankings."""
+    entries = filters.kpi_selection()
+
+    def build():
+        week = filters.base_selection()
+        # The four goal rankings come from one grouped pass
+        goals = goal_rankings(entries, filters.report_date)
+        return {
+            # Top Partners by Revenue
+            'top_partners': _revenue_by_partner(entries)[:5],
+            # All Partners Ranked (for flip card), over the whole week
+            'all_partners_ranked': _revenue_by_partner(week),
+            # FYTD charged hours by partner to merge with the ranked list
+            'all_fytd_charged_hours_by_partner': [
+                {'engagement_partner': row['partner__name'], 'total_fytd_charged_hours': row['total_fytd_charged_hours']}
+                for row in engine_for(week).grouped(
+                    week, 'partner__name', {'total_fytd_charged_hours': 'fytd_charged_hours'}, order_by='partner__name',
+                )
+            ],
+            # Top 5 managers, clients and engagements; the flip cards page through
+            # the full rankings with ranking_page_data()
+            'top_managers': ranking_module.top_ranking(entries, RANKING_DIMENSIONS['managers']),
+            'top_clients_rank': ranking_module.top_ranking(entries, RANKING_DIMENSIONS['clients']),
+            'top_engagements': ranking_module.top_ranking(entries, RANKING_DIMENSIONS['engagements']),
+            # Goal rankings per partner, manager, service line (area) and sub service line
+            'partners_ranking': goals['partner__name'],
+            'managers_ranking': goals['manager__name'],
+            'service_lines_ranking': goals['area__name'],
+            'sub_service_lines_ranking': goals['sub_area__name'],
+        }
+
+    # Goals come from the metas CSVs, so their mtimes are part of the key
+    return cached(
+        'dashboard:rankings:v3',
+        filters.filter_parts + (filters.report_week, metas_signature()),
+        build,
+        scopes=filters.week_scopes,
+    )
+
+
+def ranking_page_data(filters, dimension, after=None, limit=ranking_module.PAGE_SIZE):
+    """One keyset page of a full revenue ranking ('managers', 'clients', 'engagements' or
+    'partners') over the KPI selection: {'results': [{label, total_revenue}], 'next'}."""
+    return cached(
+        'dashboard:ranking_page',
+        filters.filter_parts + (filters.report_week, dimension, after, limit),
+        lambda: ranking_module.ranking_page(filters.kpi_selection(), RANKING_DIMENSIONS[dimension], after, limit),
+        scopes=filters.week_scopes,
+    )
+
+
+def daily_revenue_trend(entries):
+    """Daily revenue series: per engagement, the difference between consecutive cumulative reports."""
+    return engine_for(entries).daily_trend(entries)
+
+
+def build_trend(filters):
+    """Daily revenue series across every week; follows the global revenue generation."""
+    trend_labels, trend_data = cached(
+        'dashboard:trend', (), lambda: daily_revenue_trend(Selection()), scopes=(REVENUE_SCOPE,)
+    )
+    return {'trend_labels': trend_labels, 'trend_data': trend_data}
+
+
+EXCHANGE_POLL_KEY = 'dashboard:exchange_poll'
+
+
+def refresh_exchange_workbook():
+    """Poll the exchange-rate mailbox, which appends new rates to the workbook.
+
+    The dashboard ETag reads the workbook's (mtime, size), so conditional views
+    call this before computing it, and the exchange card again before reading
+    the workbook. Polls at most once per EXCHANGE_POLL_SECONDS for every
+    request and process sharing the cache.
+    """
+    if not fetch_and_update:
+        return None
+    if not cache.add(EXCHANGE_POLL_KEY, True, getattr(settings, 'EXCHANGE_POLL_SECONDS', 60)):
+        return None
+    try:
+        with span('exchange.mailbox'):
+            summary = fetch_and_update(dry_run=False)
+        logger.debug(f"fetch_and_update summary: {summary}")
+        return summary
+    except Exception as e:
+        logger.warning(f"fetch_and_update failed: {e}")
+        return None
+
+
+def build_exchange(filters):
+    """Latest official/Binance rates for the header and the history for the differential chart."""
+    # Pick up new exchange rate emails before reading the workbook
+    refresh_exchange_workbook()
+
+    with span('exchange.workbook'):
+        exchange_rate_data = get_exchange_rate_data(exchange_workbook_path())
+    last_oficial = exchange_rate_data['last_oficial']
+    last_paralelo = exchange_rate_data['last_paralelo']
+    return {
+        'exchange_dates': list(exchange_rate_data['dates']),
+        'oficial_rates_history': [float(v) for v in exchange_rate_data['tasa_oficial']],
+        'paralelo_rates_history': [float(v) for v in exchange_rate_data['tasa_paralelo']],
+        'differential_history': [float(v) for v in exchange_rate_data['differential_percentage']],
+        # Latest Exchange Rate Values for Overview Bar
+        'latest_tasa_oficial': float(last_oficial or 0),
+        'latest_tasa_binance': float(last_paralelo or 0),
+        'latest_exchange_date': str(exchange_rate_data.get('last_date', '') or ''),
+        'exchange_header': f"Oficial: ${format_number(last_oficial)} | Binance: ${format_number(last_paralelo)}",
+        'show_chart': not (filters.partner or filters.manager or filters.area),
+    }
+
+
+def _cards_from_orm(queryset, prefix):
+    agg = queryset.aggregate(**{
+        f'{prefix}_fytd_ansr': Sum('fytd_ansr_sintetico'),
+        f'{prefix}_fytd_hours': Sum('fytd_charged_hours'),
+        f'{prefix}_mtd_ansr': Sum('mtd_ansr_amt'),
+        f'{prefix}_mtd_hours': Sum('mtd_charged_hours'),
+    })
+    return [
+        {'key': 'ANSR_YTD', 'label': 'ANSR YTD', 'value': agg.get(f'{prefix}_fytd_ansr') or 0},
+        {'key': 'Horas_YTD', 'label': 'Horas Cargadas YTD', 'value': agg.get(f'{prefix}_fytd_hours') or 0},
+        {'key': 'ANSR_MTD', 'label': 'ANSR MTD', 'value': agg.get(f'{prefix}_mtd_ansr') or 0},
+        {'key': 'Horas_MTD', 'label': 'Horas Cargadas MTD', 'value': agg.get(f'{prefix}_mtd_hours') or 0},
+    ]
+
+
+def build_sl(filters):
+    """The four Service Line cards (service_line filter) or Sub Service Line cards (sub_service_line filter)."""
+    sl_cards_context = None
+    if filters.area:
+        try:
+            if ServiceLineCardsService:
+                # Pass current week date range so SL cards reflect the same reporting window
+                sl_result = ServiceLineCardsService().get_cards_for_sl(
+                    filters.area, start_date=filters.start_of_week, end_date=filters.end_of_week
+                )
+                # Expecting {'sl_name': str, 'cards': [ { 'key','label','value' } ] }
+                sl_cards_context = sl_result.get('cards') if isinstance(sl_result, dict) else sl_result
+            else:
+                # Fallback: compute directly from ORM on the normalized match key
+                sl_qs = RevenueEntry.objects.filter(service_line_key=normalize_key(filters.area))
+                sl_cards_context = _cards_from_orm(sl_qs, 'sl')
+        except Exception as e:
+            logger.error(f"ServiceLineCardsService failed: {e}")
+            sl_cards_context = None
+
+    ssl_cards_context = None
+    if filters.sub_area:
+        try:
+            if SubServiceLineCardsService:
+                ssl_result = SubServiceLineCardsService().get_cards_for_ssl(
+                    filters.sub_area, start_date=filters.start_of_week, end_date=filters.end_of_week
+                )
+                ssl_cards_context = ssl_result.get('cards') if isinstance(ssl_result, dict) else ssl_result
+            else:
+                ssl_qs = RevenueEntry.objects.filter(sub_service_line_key=normalize_key(filters.sub_area))
+                if filters.start_of_week and filters.end_of_week:
+                    ssl_qs = ssl_qs.filter(date__range=[filters.start_of_week, filters.end_of_week])
+                ssl_cards_context = _cards_from_orm(ssl_qs, 'ssl')
+        except Exception as e:
+            logger.error(f"SubServiceLineCardsService failed: {e}")
+            ssl_cards_context = None
+
+    logger.debug(f"SL cards for service_line={filters.area!r}: {sl_cards_context}")
+    return {'sl_cards': sl_cards_context, 'ssl_cards': ssl_cards_context}
+
+
+def build_manager(filters):
+    """Manager Specification cards (KPIs from ManagerAnalyticsService plus metas_MANAGERS goals)."""
+    manager_spec_data = None
+    selected_manager = filters.manager
+    if not selected_manager:
+        return {'manager_spec_data': None}
+
+    # Selected date for MTD calculations
+    selected_date = filters.report_date
+
+    # Get manager specification data using the analytics service
+    try:
+        manager_spec_data = ManagerAnalyticsService().get_manager_kpis(selected_manager, selected_date)
+        if not manager_spec_data:
+            logger.debug(f"Failed to generate manager specification data for {selected_manager}")
+    except Exception as e:
+        logger.error(f"Exception in manager analytics: {str(e)}")
+        manager_spec_data = None
+
+    # Add Manager Goals functionality
+    if manager_spec_data:
+        manager_fytd_ansr_goal = 0
+        manager_mtd_ansr_goal = 0
+        manager_fytd_hours_goal = 0
+        manager_mtd_hours_goal = 0
+        manager_fytd_ansr_completion_percentage = 0
+        manager_mtd_ansr_completion_percentage = 0
+        manager_fytd_hours_completion_percentage = 0
+        manager_mtd_hours_completion_percentage = 0
+
+        try:
+            metas_managers_df = _metas_frame('metas_MANAGERS.csv')
+            if metas_managers_df is not None:
+                # Normalize manager names in DataFrame
+                metas_managers_df['Manager'] = metas_managers_df['Manager'].str.strip().str.lower()
+
+                # Normalize selected_manager for comparison
+                normalized_selected_manager = selected_manager.strip().lower() if selected_manager else ''
+
+                # Compute cumulative FYTD goal for the selected manager by summing monthly goals
+                try:
+                    manager_fytd_ansr_goal = compute_cumulative_goal(metas_managers_df, 'Manager', normalized_selected_manager, selected_date, 'ANSR Goal', mes_col='Mes', match_contains=True)
+                    manager_fytd_hours_goal = compute_cumulative_goal(metas_managers_df, 'Manager', normalized_selected_manager, selected_date, 'Horas Goal', mes_col='Mes', match_contains=True)
+                    # fallback to yearly Total if cumulative returns 0
+                    if manager_fytd_ansr_goal == 0:
+                        manager_yearly_goal_rows = metas_managers_df[(metas_managers_df['Manager'].str.contains(normalized_selected_manager, case=False, na=False)) & (metas_managers_df['Mes'] == 'Total')]
+                        if not manager_yearly_goal_rows.empty:
+                            manager_fytd_ansr_goal = float(manager_yearly_goal_rows['ANSR Goal'].sum())
+                            manager_fytd_hours_goal = float(manager_yearly_goal_rows['Horas Goal'].sum())
+                except Exception as e:
+                    logger.debug(f"Error computing cumulative manager goals: {e}")
+
+                # Get monthly goal for the selected manager based on fiscal month (kept for MTD display)
+                if selected_date:
+                    fiscal_month_name_for_goal = get_fiscal_month_year(selected_date)
+                    manager_monthly_goal_rows = metas_managers_df[(metas_managers_df['Manager'].str.contains(normalized_selected_manager, case=False, na=False)) & (metas_managers_df['Mes'] == fiscal_month_name_for_goal)]
+                    if not manager_monthly_goal_rows.empty:
+                        manager_mtd_ansr_goal = float(manager_monthly_goal_rows['ANSR Goal'].sum())
+                        manager_mtd_hours_goal = float(manager_monthly_goal_rows['Horas Goal'].sum())
+
+            # Calculate completion percentages for manager
+            if manager_fytd_ansr_goal > 0:
+                manager_fytd_ansr_completion_percentage = (manager_spec_data['manager_fytd_ansr_value'] / manager_fytd_ansr_goal) * 100
+            if manager_mtd_ansr_goal > 0:
+                manager_mtd_ansr_completion_percentage = (manager_spec_data['manager_mtd_ansr_value'] / manager_mtd_ansr_goal) * 100
+            if manager_fytd_hours_goal > 0:
+                manager_fytd_hours_completion_percentage = (manager_spec_data['manager_fytd_charged_hours'] / manager_fytd_hours_goal) * 100
+            if manager_mtd_hours_goal > 0:
+                manager_mtd_hours_completion_percentage = (manager_spec_data['manager_mtd_charged_hours'] / manager_mtd_hours_goal) * 100
+
+            # Add goals to manager_spec_data
+            manager_spec_data.update({
+                'manager_fytd_ansr_goal': manager_fytd_ansr_goal,
+                'manager_mtd_ansr_goal': manager_mtd_ansr_goal,
+                'manager_fytd_hours_goal': manager_fytd_hours_goal,
+                'manager_mtd_hours_goal': manager_mtd_hours_goal,
+                'manager_fytd_ansr_completion_percentage': manager_fytd_ansr_completion_percentage,
+                'manager_mtd_ansr_completion_percentage': manager_mtd_ansr_completion_percentage,
+                'manager_fytd_hours_completion_percentage': manager_fytd_hours_completion_percentage,
+                'manager_mtd_hours_completion_percentage': manager_mtd_hours_completion_percentage,
+            })
+        except Exception as e:
+            logger.error(f"Exception loading manager goals: {str(e)}")
+
+        # Style-safe percentage values for the progress bars
+        for key in ('manager_fytd_ansr_completion_percentage', 'manager_mtd_ansr_completion_percentage',
+                    'manager_fytd_hours_completion_percentage', 'manager_mtd_hours_completion_percentage'):
+            manager_spec_data[f"{key}_style"] = clamp_percent(manager_spec_data.get(key, 0))
+
+    return {'manager_spec_data': manager_spec_data}
+
+
+def build_partner(filters):
+    """Partner Specification cards, the partner's manager ranking and its Perdida Diferencial breakdown."""
+    selected_partner = filters.partner
+    if not selected_partner:
+        return {'partner_spec_data': None}
+
+    partner_revenue_entries = filters.kpi_entries()
+    # Initialize variables to avoid UnboundLocalError
+    partner_fytd_charged_hours = 0
+    partner_mtd_charged_hours = 0
+    partner_fytd_hours_goal = 0
+    partner_mtd_hours_goal = 0
+    partner_fytd_hours_completion_percentage = 0
+    partner_mtd_hours_completion_percentage = 0
+
+    partner_spec_num_engagements = partner_revenue_entries.values('contract').distinct().count()
+    partner_spec_num_clients = partner_revenue_entries.values('client').distinct().count()
+
+    # Get client list with their revenue for the selected partner
+    client_list_with_revenue = partner_revenue_entries.values('client__name').annotate(
+        total_revenue=Sum('fytd_ansr_sintetico')
+    ).order_by('-total_revenue')
+
+    # Format revenue for the client list
+    formatted_client_list = [
+        {
+            'name': item['client__name'],
+            'revenue': "${:,.2f}".format(item['total_revenue'] or 0)
+        }
+        for item in client_list_with_revenue
+    ]
+
+    # Recorded per partner at import time with the week
+    revenue_days_val = get_partner_revenue_days(filters.start_of_week).get(normalize_key(selected_partner)) or 0
+
+    # Partner-level ANSR YTD uses the synthetic ANSR field
+    partner_fytd_ansr_value = partner_revenue_entries.aggregate(Sum('fytd_ansr_sintetico'))['fytd_ansr_sintetico__sum'] or 0
+    partner_mtd_ansr_value = partner_revenue_entries.aggregate(Sum('mtd_ansr_amt'))['mtd_ansr_amt__sum'] or 0
+
+    # Goals for partner-specific ANSR
+    partner_fytd_ansr_goal = 0
+    partner_mtd_ansr_goal = 0
+    partner_fytd_ansr_completion_percentage = 0
+    partner_mtd_ansr_completion_percentage = 0
+
+    try:
+        metas_pped_df = _metas_frame('metas_PPED.csv')
+        if metas_pped_df is not None:
+            # Normalize partner names in DataFrame
+            metas_pped_df['Partner'] = metas_pped_df['Partner'].str.strip().str.lower()
+
+            # Normalize selected_partner for comparison
+            normalized_selected_partner = selected_partner.strip().lower() if selected_partner else ''
+            current_report_date = filters.report_date
+
+            # Use compute_cumulative_goal to sum monthly goals for the partner; fallback to 'Total' yearly if not found
+            try:
+                partner_fytd_ansr_goal = compute_cumulative_goal(metas_pped_df, 'Partner', normalized_selected_partner, current_report_date, 'ANSR Goal PPED', mes_col='Mes', match_contains=True)
+                partner_fytd_hours_goal = compute_cumulative_goal(metas_pped_df, 'Partner', normalized_selected_partner, current_report_date, 'Horas Goal PPED', mes_col='Mes', match_contains=True)
+                # If cumulative returned 0, fallback to any 'Total' yearly row
+                if partner_fytd_ansr_goal == 0:
+                    partner_yearly_goal_rows = metas_pped_df[
+                        (metas_pped_df['Partner'].str.contains(normalized_selected_partner, case=False, na=False)) & (metas_pped_df['Mes'] == 'Total')
+                    ]
+                    if not partner_yearly_goal_rows.empty:
+                        partner_fytd_ansr_goal = float(partner_yearly_goal_rows['ANSR Goal PPED'].sum())
+                        partner_fytd_hours_goal = float(partner_yearly_goal_rows['Horas Goal PPED'].sum())
+            except Exception as e:
+                logger.debug(f"Error computing cumulative partner goals: {e}")
+
+            # Get monthly goal for the selected partner based on fiscal month (kept for MTD display)
+            if current_report_date:
+                fiscal_month_name_for_goal = get_fiscal_month_year(current_report_date)
+                partner_monthly_goal_rows = metas_pped_df[
+                    (metas_pped_df['Partner'].str.contains(normalized_selected_partner, case=False, na=False)) & (metas_pped_df['Mes'] == fiscal_month_name_for_goal)
+                ]
+                if not partner_monthly_goal_rows.empty:
+                    partner_mtd_ansr_goal = float(partner_monthly_goal_rows['ANSR Goal PPED'].sum())
+                    partner_mtd_hours_goal = float(partner_monthly_goal_rows['Horas Goal PPED'].sum())
+                else:
+                    partner_mtd_hours_goal = 0
+
+        # Calculate completion percentages for partner
+        if partner_fytd_ansr_goal > 0:
+            partner_fytd_ansr_completion_percentage = (partner_fytd_ansr_value / partner_fytd_ansr_goal) * 100
+        if partner_mtd_ansr_goal > 0:
+            partner_mtd_ansr_completion_percentage = (partner_mtd_ansr_value / partner_mtd_ansr_goal) * 100
+
+        # Calculate charged hours completion percentages
+        partner_fytd_charged_hours = partner_revenue_entries.aggregate(Sum('fytd_charged_hours'))['fytd_charged_hours__sum'] or 0
+        partner_mtd_charged_hours = partner_revenue_entries.aggregate(Sum('mtd_charged_hours'))['mtd_charged_hours__sum'] or 0
+
+        if partner_fytd_hours_goal > 0:
+            partner_fytd_hours_completion_percentage = (partner_fytd_charged_hours / partner_fytd_hours_goal) * 100
+        if partner_mtd_hours_goal > 0:
+            partner_mtd_hours_completion_percentage = (partner_mtd_charged_hours / partner_mtd_hours_goal) * 100
+
+    except Exception as e:
+        print(f"Error processing partner goals: {e}")
+        traceback.print_exc()
+
+    partner_spec_data = {
+        'num_engagements': partner_spec_num_engagements,
+        'num_clients': partner_spec_num_clients,
+        'client_list': formatted_client_list,
+        'revenue_days': f"{revenue_days_val:,.2f}",
+        'partner_fytd_ansr_value': partner_fytd_ansr_value,
+        'partner_fytd_ansr_goal': partner_fytd_ansr_goal,
+        'partner_fytd_ansr_completion_percentage': partner_fytd_ansr_completion_percentage,
+        'partner_mtd_ansr_value': partner_mtd_ansr_value,
+        'partner_mtd_ansr_goal': partner_mtd_ansr_goal,
+        'partner_mtd_ansr_completion_percentage': partner_mtd_ansr_completion_percentage,
+        'partner_fytd_charged_hours': partner_fytd_charged_hours,
+        'partner_fytd_hours_goal': partner_fytd_hours_goal,
+        'partner_fytd_hours_completion_percentage': partner_fytd_hours_completion_percentage,
+        'partner_mtd_charged_hours': partner_mtd_charged_hours,
+        'partner_mtd_hours_goal': partner_mtd_hours_goal,
+        'partner_mtd_hours_completion_percentage': partner_mtd_hours_completion_percentage,
+    }
+    # Style-safe percentage values for the progress bars
+    for key in ('partner_fytd_ansr_completion_percentage', 'partner_mtd_ansr_completion_percentage',
+                'partner_fytd_hours_completion_percentage', 'partner_mtd_hours_completion_percentage'):
+        partner_spec_data[f"{key}_style"] = clamp_percent(partner_spec_data[key])
+
+    if filters.client:
+        client_revenue_entries = partner_revenue_entries.filter(client__name=filters.client)
+        current_month_start = timezone.now().date().replace(day=1)
+        mtd_ansr_amt = client_revenue_entries.filter(date__gte=current_month_start).aggregate(
+            Sum('mtd_ansr_amt')
+        )['mtd_ansr_amt__sum'] or 0
+        partner_spec_data['mtd_ansr_amt'] = "${:,.2f}".format(mtd_ansr_amt)
+
+    # --- Perdida Diferencial for the partner ---
+    # 1. Total Perdida Diferencial (numeric, so templates can format consistently)
+    partner_spec_data['total_perdida_diferencial'] = partner_revenue_entries.aggregate(
+        total_perdida=Sum('fytd_diferencial_final')
+    )['total_perdida'] or 0
+
+    # 2. Perdida Diferencial per Client
+    perdida_per_client = partner_revenue_entries.values('client__name').annotate(
+        perdida=Sum('fytd_diferencial_final')
+    ).order_by('-perdida')
+    partner_spec_data['perdida_per_client'] = [
+        {'client_name': item['client__name'], 'perdida': item['perdida'] or 0}
+        for item in perdida_per_client
+    ]
+
+    # 3. Top 5 Engagements by Perdida Diferencial
+    top_engagements_perdida = partner_revenue_entries.values('contract__name').annotate(
+        perdida=Sum('fytd_diferencial_final')
+    ).order_by('-perdida')[:5]
+    partner_spec_data['top_engagements_perdida'] = [
+        {'engagement_name': item['contract__name'], 'perdida': item['perdida'] or 0}
+        for item in top_engagements_perdida
+    ]
+
+    # Managers working for the partner (flip card) with their charged hours
+    top_managers, all_managers_ranked = ranking_module.compute_ranking(
+        partner_revenue_entries, 'manager__name', revenue_field='fytd_ansr_sintetico'
+    )
+    return {
+        'partner_spec_data': partner_spec_data,
+        'top_managers': top_managers,
+        'all_managers_ranked': all_managers_ranked,
+        'fytd_charged_hours_by_manager': list(partner_revenue_entries.values('manager').annotate(
+            engagement_manager=F('manager__name'), total_fytd_charged_hours=Sum('fytd_charged_hours')
+        ).values('engagement_manager', 'total_fytd_charged_hours').order_by('-total_fytd_charged_hours')),
+        'mtd_charged_hours_by_manager': list(partner_revenue_entries.values('manager').annotate(
+            engagement_manager=F('manager__name'), total_mtd_charged_hours=Sum('mtd_charged_hours')
+        ).values('engagement_manager', 'total_mtd_charged_hours').order_by('-total_mtd_charged_hours')),
+    }
+
+
+# Card groups in page order: (builder, partial template). Trend ships data only.
+CARD_GROUPS = {
+    'partner': (build_partner, 'core_dashboard/dashboard_cards/partner.html'),
+    'sl': (build_sl, 'core_dashboard/dashboard_cards/sl.html'),
+    'manager': (build_manager, 'core_dashboard/dashboard_cards/manager.html'),
+    'macro': (build_macro, 'core_dashboard/dashboard_cards/macro.html'),
+    'cobranzas': (build_cobranzas, 'core_dashboard/dashboard_cards/cobranzas.html'),
+    'rankings': (build_rankings, 'core_dashboard/dashboard_cards/rankings.html'),
+    'exchange': (build_exchange, 'core_dashboard/dashboard_cards/exchange.html'),
+    'trend': (build_trend, None),
+}
+CARD_TEMPLATES = [template for _, template in CARD_GROUPS.values() if template]
+
+
+def visible_groups(filters):
+    """Groups the shell page shows for the selected filters, in page order."""
+    groups = []
+    if filters.partner and not filters.area:
+        groups.append('partner')
+    if filters.area or filters.sub_area:
+        groups.append('sl')
+    elif filters.manager:
+        groups.append('manager')
+    groups += ['macro', 'cobranzas']
+    if not (filters.partner or filters.manager or filters.area):
+        groups.append('rankings')
+    groups.append('exchange')
+    return groups
+
+
+def build_card(group, filters):
+    """Context/payload dict of one card group. Raises KeyError for an unknown group."""
+    builder, _ = CARD_GROUPS[group]
+    return builder(filters)
+
+
+def render_card(group, filters, request=None):
+    """(html, data) for one card group; html is '' for data-only groups."""
+    _, template = CARD_GROUPS[group]
+    with span(f'card.{group}'):
+        data = build_card(group, filters)
+    if not template:
+        return '', data
+    with span(f'template.{group}'):
+        html = render_to_string(template, {**filters.template_context(), **data}, request=request)
+    return html, data
@@ -0,0 +1,121 @@
+import datetime
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from core_dashboard.models import Area, Client, RevenueEntry, SubArea
+from core_dashboard.modules.report_weeks import sync_from_entries
+
+from .services import CARD_GROUPS, DashboardFilters, visible_groups
+
+
+def create_entries():
+    client = Client.objects.create(name='ACME')
+    area = Area.objects.create(name='Assurance')
+    sub_area = SubArea.objects.create(area=area, name='Audit')
+    week = datetime.date(2025, 8, 15)
+    for i in range(3):
+        RevenueEntry.objects.create(
+            date=week, client=client, area=area, sub_area=sub_area, engagement_id=f'E{i}',
+            engagement_partner='Partner Alpha', engagement_manager='Manager One',
+            fytd_ansr_sintetico=10.0 * (i + 1), fytd_charged_hours=5, mtd_charged_hours=2,
+            total_revenue_days_p_cp=1.0,
+        )
+    sync_from_entries()
+    return week
+
+
+class DashboardCardsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.week = create_entries()
+
+    def card(self, group, **params):
+        return self.client.get(reverse('dashboard_cards:card', args=[group]), params)
+
+    def test_shell_only_carries_placeholders(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        for group in ('macro', 'cobranzas', 'rankings', 'exchange'):
+            self.assertContains(response, f'data-card-group="{group}"')
+        self.assertContains(response, reverse('dashboard_cards:card', args=['macro']))
+        self.assertNotContains(response, 'Key Performance Indicators')
+
+        response = self.client.get('/', {'partner': 'Partner Alpha', 'inline': '1'})
+        self.assertContains(response, 'Partner Specification: Partner Alpha')
+        self.assertNotContains(response, 'data-card-group="rankings"')
+        # Card URLs keep the filters but not the inline switch
+        self.assertContains(response, 'cards/macro/?partner=Partner+Alpha"')
+
+    def test_every_group_renders_as_json(self):
+        for group in CARD_GROUPS:
+            payload = self.card(group).json()
+            self.assertTrue(payload['success'], msg=payload.get('error'))
+            self.assertEqual(payload['group'], group)
+
+        payload = self.card('rankings').json()
+        self.assertIn('Key Performance Indicators', payload['html'])
+        self.assertEqual(payload['data']['partners_ranking'][0]['label'], 'Partner Alpha')
+        self.assertEqual(self.card('macro').json()['data']['ansr_fytd_value'], 60.0)
+        self.assertEqual(self.card('trend').json()['html'], '')
+        self.assertEqual(self.card('unknown').status_code, 404)
+
+    def test_filtered_groups(self):
+        payload = self.card('partner', partner='Partner Alpha').json()
+        self.assertEqual(payload['data']['partner_spec_data']['num_clients'], 1)
+        self.assertEqual(payload['data']['all_managers_ranked'][0]['label'], 'Manager One')
+
+        payload = self.card('sl', service_line='Assurance').json()
+        self.assertIn('Service Line: Assurance', payload['html'])
+
+        self.assertEqual(
+            visible_groups(DashboardFilters({'service_line': 'Assurance', 'manager': 'Manager One'})),
+            ['sl', 'macro', 'cobranzas', 'exchange'],
+        )
+
+    def test_card_answers_304_while_unchanged(self):
+        etag = self.card('macro')['ETag']
+        response = self.client.get(reverse('dashboard_cards:card', args=['macro']), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+def slow(builder, seconds=0.2):
+    def wrapped(filters):
+        time.sleep(seconds)
+        return builder(filters)
+    return wrapped
+
+
+class AsyncDashboardTests(TransactionTestCase):
+    """The async views compute groups on worker threads, which need committed data."""
+
+    def setUp(self):
+        cache.clear()
+        create_entries()
+
+    def test_total_latency_tracks_the_slowest_card(self):
+        slowed = {name: (slow(builder), template) for name, (builder, template) in CARD_GROUPS.items()}
+        with patch.dict(CARD_GROUPS, slowed):
+            payload = self.client.get(reverse('dashboard_cards:all')).json()
+        self.assertTrue(payload['success'], msg=payload)
+        self.assertEqual(list(payload['cards']), ['macro', 'cobranzas', 'rankings', 'exchange'])
+        timings = payload['timings']
+        self.assertGreaterEqual(timings['total_ms'], timings['slowest_ms'])
+        self.assertGreaterEqual(timings['sum_ms'], 4 * 200)
+        self.assertLess(timings['total_ms'], 0.75 * timings['sum_ms'])
+        self.assertIn('Key Performance Indicators', payload['cards']['rankings']['html'])
+
+        payload = self.client.get(reverse('dashboard_cards:all'), {'groups': 'macro,unknown'}).json()
+        self.assertFalse(payload['success'])
+        self.assertEqual(payload['cards']['macro']['data']['ansr_fytd_value'], 60.0)
+        self.assertIn('Unknown card group', payload['cards']['unknown']['error'])
+
+    def test_async_page_renders_every_group_inline(self):
+        response = self.client.get(reverse('dashboard_async'), {'partner': 'Partner Alpha'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Partner Specification: Partner Alpha')
+        self.assertContains(response, 'data-card-loaded="1"', count=4)
+        self.assertIn(response.context['card_timings']['slowest_group'], CARD_GROUPS)
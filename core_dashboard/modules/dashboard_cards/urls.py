@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'dashboard_cards'
+
+urlpatterns = [
+    path('', views.all_cards_view, name='all'),
+    path('ranking/<str:dimension>/', views.ranking_view, name='ranking'),
+    path('<str:group>/', views.card_view, name='card'),
+]
@@ -0,0 +1,110 @@
+import logging
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from core_dashboard.decorators import conditional_page
+from core_dashboard.modules.ranking_module import PAGE_SIZE
+
+from .async_cards import gather_cards, load_filters
+from .services import (
+    CARD_GROUPS, CARD_TEMPLATES, MAX_RANKING_PAGE_SIZE, RANKING_DIMENSIONS, DashboardFilters, dashboard_scopes,
+    dashboard_source_files, ranking_page_data, refresh_exchange_workbook, render_card, visible_groups,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CardJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder that also accepts numpy scalars coming from pandas-based services."""
+
+    def default(self, o):
+        if hasattr(o, 'item') and callable(o.item):
+            return o.item()
+        return super().default(o)
+
+
+def poll_exchange(request, group):
+    # The exchange card's only input outside the ETag's generations is the
+    # workbook the mailbox poll writes, so poll before the ETag reads it
+    if group == 'exchange':
+        refresh_exchange_workbook()
+
+
+@require_GET
+@conditional_page(scopes=dashboard_scopes, template=CARD_TEMPLATES, files=dashboard_source_files, before=poll_exchange)
+def card_view(request, group):
+    """Render one dashboard card group for the dashboard's filter query string.
+
+    Returns {success, group, html, data, elapsed_ms}; `html` is the rendered
+    partial (empty for data-only groups) and `data` its context values.
+    """
+    if group not in CARD_GROUPS:
+        return JsonResponse(
+            {'success': False, 'error': f"Unknown card group '{group}'. Use one of: {', '.join(CARD_GROUPS)}"},
+            status=404,
+        )
+    start = time.perf_counter()
+    try:
+        html, data = render_card(group, DashboardFilters(request.GET), request=request)
+    except Exception as e:
+        logger.exception(f"Dashboard card group '{group}' failed")
+        return JsonResponse({'success': False, 'group': group, 'error': str(e)}, status=500)
+    return JsonResponse(
+        {
+            'success': True,
+            'group': group,
+            'html': html,
+            'data': data,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        },
+        encoder=CardJSONEncoder,
+    )
+
+
+@require_GET
+@conditional_page(scopes=dashboard_scopes)
+def ranking_view(request, dimension):
+    """One page of a full revenue ranking, for the "see all" side of the flip cards.
+
+    Takes the dashboard's filter query string plus ``after`` (the ``next`` cursor
+    of the previous page) and ``limit``; returns {success, dimension, results:
+    [{label, total_revenue}], next}, with ``next`` null on the last page.
+    """
+    if dimension not in RANKING_DIMENSIONS:
+        return JsonResponse(
+            {'success': False, 'error': f"Unknown ranking '{dimension}'. Use one of: {', '.join(RANKING_DIMENSIONS)}"},
+            status=404,
+        )
+    try:
+        limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), MAX_RANKING_PAGE_SIZE)
+        page = ranking_page_data(DashboardFilters(request.GET), dimension, request.GET.get('after') or None, limit)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'dimension': dimension, 'error': str(e)}, status=400)
+    except Exception as e:
+        logger.exception(f"Ranking '{dimension}' failed")
+        return JsonResponse({'success': False, 'dimension': dimension, 'error': str(e)}, status=500)
+    return JsonResponse({'success': True, 'dimension': dimension, **page}, encoder=CardJSONEncoder)
+
+
+@require_GET
+async def all_cards_view(request):
+    """Compute every visible card group (or ``?groups=a,b``) concurrently.
+
+    Returns {success, cards: {group: {success, html, data, elapsed_ms}}, timings}
+    where timings holds total_ms, slowest_ms, sum_ms and slowest_group.
+    """
+    try:
+        filters = await load_filters(request.GET)
+        requested = request.GET.get('groups')
+        groups = [g for g in requested.split(',') if g] if requested else visible_groups(filters)
+        result = await gather_cards(filters, groups, request=request)
+    except Exception as e:
+        logger.exception("Dashboard cards failed")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse(
+        {'success': all(card['success'] for card in result['cards'].values()), **result},
+        encoder=CardJSONEncoder,
+    )
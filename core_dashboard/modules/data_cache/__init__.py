@@ -0,0 +1,48 @@
+"""
+Data Cache Module
+=================
+
+Project-wide cache tier for derived data (KPIs, rankings, chart series,
+dropdown catalogues). Every scope of source data has a monotonically
+increasing generation counter stored in the database (`DataGeneration`):
+
+- ``revenue``: any RevenueEntry change
+- ``week:<YYYY-MM-DD>``: the rows of one report date
+- ``cobranzas`` / ``facturacion`` / ``manager_revenue_days``: module uploads
+
+Writers bump the scopes they touch; readers build cache keys that embed the
+current generations, so invalidation is a single UPDATE and every process
+(web workers, the import subprocess, management commands) agrees on it.
+"""
+
+from .services import (
+    REVENUE_SCOPE,
+    COBRANZAS_SCOPE,
+    FACTURACION_SCOPE,
+    MANAGER_REVENUE_DAYS_SCOPE,
+    BASE_SCOPES,
+    week_scope,
+    get_generation,
+    get_generations,
+    bump_generation,
+    bump_weeks,
+    bump_all,
+    make_key,
+    cached,
+)
+
+__all__ = [
+    'REVENUE_SCOPE',
+    'COBRANZAS_SCOPE',
+    'FACTURACION_SCOPE',
+    'MANAGER_REVENUE_DAYS_SCOPE',
+    'BASE_SCOPES',
+    'week_scope',
+    'get_generation',
+    'get_generations',
+    'bump_generation',
+    'bump_weeks',
+    'bump_all',
+    'make_key',
+    'cached',
+]
@@ -0,0 +1,131 @@
+import datetime
+import hashlib
+import logging
+import secrets
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core_dashboard.models import DataGeneration
+
+logger = logging.getLogger(__name__)
+
+REVENUE_SCOPE = 'revenue'
+COBRANZAS_SCOPE = 'cobranzas'
+FACTURACION_SCOPE = 'facturacion'
+MANAGER_REVENUE_DAYS_SCOPE = 'manager_revenue_days'
+BASE_SCOPES = (REVENUE_SCOPE, COBRANZAS_SCOPE, FACTURACION_SCOPE, MANAGER_REVENUE_DAYS_SCOPE)
+
+KEY_PREFIX = 'dg'
+_MISSING = object()
+
+
+def week_scope(report_date):
+    """Scope name for the report week containing report_date (date or YYYY-MM-DD string).
+
+    Weeks are labelled by their Friday, like the dashboard week filter, so the
+    importer (which knows the exact report date) and readers (which know the
+    selected Friday) agree on the scope.
+    """
+    if isinstance(report_date, datetime.datetime):
+        report_date = report_date.date()
+    elif not isinstance(report_date, datetime.date):
+        report_date = datetime.date.fromisoformat(str(report_date).strip()[:10])
+    friday = report_date - datetime.timedelta(days=report_date.weekday()) + datetime.timedelta(days=4)
+    return f'week:{friday.isoformat()}'
+
+
+def _new_token():
+    return secrets.token_hex(4)
+
+
+def _create(scope, value):
+    """Insert the counter row for scope; returns False when another process won the race."""
+    try:
+        with transaction.atomic():
+            DataGeneration.objects.create(scope=scope, value=value, token=_new_token())
+        return True
+    except IntegrityError:
+        return False
+
+
+def get_generations(scopes):
+    """Return {scope: 'token.value'} for the given scopes with a single query.
+
+    Scopes that were never bumped get their row (value 0) created here so the
+    token is fixed from the first read on.
+    """
+    scopes = list(dict.fromkeys(scopes))
+    rows = dict(
+        (scope, f'{token}.{value}')
+        for scope, token, value in DataGeneration.objects.filter(scope__in=scopes).values_list('scope', 'token', 'value')
+    )
+    missing = [s for s in scopes if s not in rows]
+    for scope in missing:
+        _create(scope, 0)
+    if missing:
+        for scope, token, value in DataGeneration.objects.filter(scope__in=missing).values_list('scope', 'token', 'value'):
+            rows[scope] = f'{token}.{value}'
+    return rows
+
+
+def get_generation(scope=REVENUE_SCOPE):
+    return get_generations([scope])[scope]
+
+
+def bump_generation(*scopes):
+    """Increment the counter of every given scope (atomically, in the database)."""
+    for scope in dict.fromkeys(scopes):
+        updated = DataGeneration.objects.filter(scope=scope).update(value=F('value') + 1)
+        if not updated and not _create(scope, 1):
+            DataGeneration.objects.filter(scope=scope).update(value=F('value') + 1)
+
+
+def bump_weeks(weeks):
+    """Rows of the given report dates changed: bump their week scopes and the revenue scope."""
+    bump_generation(REVENUE_SCOPE, *[week_scope(w) for w in weeks or []])
+
+
+def bump_all():
+    """Everything changed (full purge): bump every known scope in one statement."""
+    DataGeneration.objects.update(value=F('value') + 1)
+    for scope in BASE_SCOPES:
+        if not DataGeneration.objects.filter(scope=scope).exists():
+            _create(scope, 1)
+
+
+def make_key(namespace, *parts, scopes=(REVENUE_SCOPE,)):
+    """Cache key for `namespace` + `parts` at the current generation of `scopes`."""
+    generations = get_generations(scopes)
+    raw = repr((parts, [generations[s] for s in dict.fromkeys(scopes)]))
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+    return f'{KEY_PREFIX}:{namespace}:{digest}'
+
+
+def cached(namespace, parts, builder, scopes=(REVENUE_SCOPE,), timeout=None):
+    """Return the cached value for (namespace, parts) or build and store it.
+
+    `builder` is a zero-argument callable whose result must be picklable.
+    Cache backend failures never fail the caller; the value is simply rebuilt.
+    `timeout=None` uses the backend default (entries of old generations are
+    never read again and just expire).
+    """
+    key = make_key(namespace, *parts, scopes=scopes)
+    try:
+        value = cache.get(key, _MISSING)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {namespace}: {e}")
+        value = _MISSING
+    if value is not _MISSING:
+        return value
+
+    value = builder()
+    try:
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {namespace}: {e}")
+    return value
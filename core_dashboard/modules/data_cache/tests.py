@@ -0,0 +1,71 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core_dashboard.models import DataGeneration
+from core_dashboard.modules.hooks import notify_data_invalidated
+from .services import (
+    COBRANZAS_SCOPE,
+    REVENUE_SCOPE,
+    bump_all,
+    bump_generation,
+    bump_weeks,
+    cached,
+    get_generation,
+    make_key,
+    week_scope,
+)
+
+
+class DataGenerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_week_scope_is_labelled_by_friday(self):
+        self.assertEqual(week_scope(datetime.date(2025, 8, 15)), 'week:2025-08-15')
+        self.assertEqual(week_scope('2025-08-11'), 'week:2025-08-15')
+        self.assertEqual(week_scope(datetime.datetime(2025, 8, 17, 10, 0)), 'week:2025-08-15')
+
+    def test_bump_is_monotonic_and_scoped(self):
+        before = get_generation(REVENUE_SCOPE)
+        cobranzas_before = get_generation(COBRANZAS_SCOPE)
+        bump_generation(REVENUE_SCOPE)
+        bump_generation(REVENUE_SCOPE)
+        self.assertEqual(DataGeneration.objects.get(scope=REVENUE_SCOPE).value, 2)
+        self.assertNotEqual(get_generation(REVENUE_SCOPE), before)
+        self.assertEqual(get_generation(COBRANZAS_SCOPE), cobranzas_before)
+
+    def test_cached_rebuilds_only_after_bump(self):
+        calls = []
+
+        def builder():
+            calls.append(1)
+            return {'total': len(calls)}
+
+        self.assertEqual(cached('test', ('a',), builder), {'total': 1})
+        self.assertEqual(cached('test', ('a',), builder), {'total': 1})
+        self.assertEqual(cached('test', ('b',), builder), {'total': 2})
+
+        bump_weeks([datetime.date(2025, 8, 15)])
+        self.assertEqual(cached('test', ('a',), builder), {'total': 3})
+        self.assertEqual(get_generation(week_scope('2025-08-15')).split('.')[1], '1')
+
+    def test_week_keys_survive_other_weeks(self):
+        scopes = (week_scope('2025-08-15'),)
+        key = make_key('test', 1, scopes=scopes)
+        bump_weeks([datetime.date(2025, 8, 22)])
+        self.assertEqual(make_key('test', 1, scopes=scopes), key)
+        bump_weeks([datetime.date(2025, 8, 14)])
+        self.assertNotEqual(make_key('test', 1, scopes=scopes), key)
+
+    def test_purge_event_bumps_every_scope(self):
+        week = week_scope('2025-08-15')
+        keys = [make_key('test', scopes=(scope,)) for scope in (REVENUE_SCOPE, COBRANZAS_SCOPE, week)]
+        notify_data_invalidated(scope='all')
+        self.assertTrue(all(
+            make_key('test', scopes=(scope,)) != key
+            for scope, key in zip((REVENUE_SCOPE, COBRANZAS_SCOPE, week), keys)
+        ))
+        bump_all()
+        self.assertEqual(DataGeneration.objects.get(scope=REVENUE_SCOPE).value, 2)
@@ -0,0 +1,16 @@
+"""
+Data Purge Module
+=================
+
+Fast removal of imported data. Full purges truncate every dashboard table in
+dependency order with raw DELETE statements inside a single transaction (no
+Django delete collector, no per-object cascades in Python). Scoped purges
+remove only the RevenueEntry rows of the given report dates.
+
+Both paths fire a single `data_invalidated` event (see `modules.hooks`) so
+module caches are cleared in one place.
+"""
+
+from .services import DataPurgeService
+
+__all__ = ['DataPurgeService']
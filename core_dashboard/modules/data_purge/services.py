@@ -0,0 +1,77 @@
+import logging
+import time
+
+from django.db import connection, transaction
+
+from core_dashboard.models import (
+    Area, Client, Contract, ExchangeRate, Manager, Partner, ReportWeek, RevenueEntry, StageRun, SubArea, UploadBlob,
+    UploadHistory,
+)
+from core_dashboard.modules.hooks import notify_data_invalidated
+
+logger = logging.getLogger(__name__)
+
+
+class DataPurgeService:
+    # Children before parents so foreign keys never point at removed rows,
+    # even mid-transaction on backends that check constraints immediately.
+    # The upload registry goes too: its blobs are in the wiped media folder and
+    # its stage runs describe imports of the purged data.
+    PURGE_ORDER = [
+        RevenueEntry, ReportWeek, UploadHistory, ExchangeRate, StageRun, UploadBlob,
+        Contract, SubArea, Area, Client, Partner, Manager,
+    ]
+
+    def purge_all(self):
+        """Remove every row of the dashboard tables.
+
+        Returns dict with success, rows_removed (per model), total_rows and elapsed_seconds.
+        """
+        start = time.perf_counter()
+        rows_removed = {}
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for model in self.PURGE_ORDER:
+                        table = connection.ops.quote_name(model._meta.db_table)
+                        cursor.execute(f'DELETE FROM {table}')
+                        rows_removed[model.__name__] = max(cursor.rowcount, 0)
+        except Exception as e:
+            logger.exception('Full purge failed')
+            return {'success': False, 'error': str(e)}
+
+        notify_data_invalidated(sender=self.__class__, scope='all')
+        return self._result(rows_removed, start)
+
+    def purge_weeks(self, report_dates):
+        """Remove the RevenueEntry rows of the given report dates only."""
+        start = time.perf_counter()
+        report_dates = sorted(set(report_dates or []))
+        if not report_dates:
+            return {'success': False, 'error': 'No report dates given'}
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    table = connection.ops.quote_name(RevenueEntry._meta.db_table)
+                    placeholders = ', '.join(['%s'] * len(report_dates))
+                    cursor.execute(f'DELETE FROM {table} WHERE date IN ({placeholders})', report_dates)
+                    rows_removed = {'RevenueEntry': max(cursor.rowcount, 0)}
+                    table = connection.ops.quote_name(ReportWeek._meta.db_table)
+                    cursor.execute(f'DELETE FROM {table} WHERE week_ending IN ({placeholders})', report_dates)
+        except Exception as e:
+            logger.exception('Scoped purge failed for %s', report_dates)
+            return {'success': False, 'error': str(e)}
+
+        notify_data_invalidated(sender=self.__class__, scope='weeks', weeks=report_dates)
+        result = self._result(rows_removed, start)
+        result['weeks'] = [d.isoformat() for d in report_dates]
+        return result
+
+    @staticmethod
+    def _result(rows_removed, start):
+        return {
+            'success': True,
+            'rows_removed': rows_removed,
+            'total_rows': sum(rows_removed.values()),
+            'elapsed_seconds': round(time.perf_counter() - start, 3),
+        }
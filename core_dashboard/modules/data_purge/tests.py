@@ -0,0 +1,80 @@
+import datetime
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from core_dashboard.models import Area, Client, Contract, Manager, Partner, RevenueEntry, StageRun, SubArea, UploadBlob
+from core_dashboard.modules.exports.services import RevenueExportService
+from .services import DataPurgeService
+
+
+class DataPurgeServiceTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+        client = Client.objects.create(name='ACME')
+        area = Area.objects.create(name='Assurance')
+        sub_area = SubArea.objects.create(area=area, name='Audit')
+        contract = Contract.objects.create(
+            client=client, name='C-1', start_date=datetime.date(2025, 7, 1), end_date=datetime.date(2026, 6, 30)
+        )
+        self.weeks = [datetime.date(2025, 8, 8), datetime.date(2025, 8, 15)]
+        for week in self.weeks:
+            for i in range(3):
+                RevenueEntry.objects.create(
+                    date=week, client=client, area=area, sub_area=sub_area, contract=contract, engagement_id=f'E-{i}'
+                )
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_purge_all_truncates_in_dependency_order(self):
+        result = DataPurgeService().purge_all()
+        self.assertTrue(result['success'], msg=result.get('error'))
+        self.assertEqual(result['rows_removed']['RevenueEntry'], 6)
+        self.assertEqual(result['rows_removed']['Client'], 1)
+        self.assertEqual(result['total_rows'], 6 + 1 + 1 + 1 + 1)
+        self.assertIn('elapsed_seconds', result)
+        for model in DataPurgeService.PURGE_ORDER:
+            self.assertFalse(model.objects.exists(), model.__name__)
+
+    def test_purge_all_clears_people_and_the_upload_registry(self):
+        RevenueEntry.objects.filter(engagement_id='E-0').update(partner=Partner.objects.create(name='P', key='p'))
+        Manager.objects.create(name='M', key='m')
+        UploadBlob.objects.create(sha256='a' * 64, size=1, path='upload_blobs/aa/a.xlsx')
+        StageRun.objects.create(stage='revenue_import', scope='week:2025-08-15', input_key='k', succeeded=True)
+
+        result = DataPurgeService().purge_all()
+        self.assertTrue(result['success'], msg=result.get('error'))
+        for model in (Partner, Manager, UploadBlob, StageRun):
+            self.assertEqual(result['rows_removed'][model.__name__], 1)
+            self.assertFalse(model.objects.exists(), model.__name__)
+
+    def test_purge_weeks_only_removes_those_weeks_and_their_exports(self):
+        exports = RevenueExportService()
+        kept = exports.export(self.weeks[1])
+        dropped = exports.export(self.weeks[0])
+
+        result = DataPurgeService().purge_weeks([self.weeks[0]])
+        self.assertTrue(result['success'], msg=result.get('error'))
+        self.assertEqual(result['rows_removed'], {'RevenueEntry': 3})
+        self.assertEqual(RevenueEntry.objects.filter(date=self.weeks[1]).count(), 3)
+        self.assertEqual(Client.objects.count(), 1)
+        self.assertFalse(os.path.exists(dropped['path']))
+        self.assertTrue(os.path.exists(kept['path']))
+
+    def test_view_reports_rows_and_elapsed_time(self):
+        response = self.client.post('/delete-data-cache/', {'password': '69420', 'weeks': '2025-08-15'})
+        payload = response.json()
+        self.assertTrue(payload['success'])
+        self.assertEqual(payload['rows_removed'], {'RevenueEntry': 3})
+        self.assertIn('elapsed_seconds', payload)
+
+        response = self.client.post('/delete-data-cache/', {'password': 'wrong'})
+        self.assertFalse(response.json()['success'])
+        self.assertEqual(RevenueEntry.objects.count(), 3)
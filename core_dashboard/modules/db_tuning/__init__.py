@@ -0,0 +1,27 @@
+"""
+DB Tuning Module
+================
+
+Keeps dashboard readers and imports out of each other's way on SQLite:
+
+- `configure_connection` (connected to `connection_created`) applies the
+  `SQLITE_PRAGMAS` to every new connection: WAL, synchronous=NORMAL, page
+  cache, mmap and in-memory temp tables
+- `WeekStaging` writes an import into a temp stage table and swaps the week
+  in (or merges only its difference) with one short transaction, so readers
+  never wait on an import
+- `resolve_dimensions` finds or bulk-creates the clients, service lines and
+  contracts of a batch of rows in a few queries
+"""
+
+from .services import DEFAULT_PRAGMAS, configure_connection, current_pragmas, sqlite_pragmas
+from .staging import WeekStaging, resolve_dimensions
+
+__all__ = [
+    'DEFAULT_PRAGMAS',
+    'WeekStaging',
+    'configure_connection',
+    'current_pragmas',
+    'resolve_dimensions',
+    'sqlite_pragmas',
+]
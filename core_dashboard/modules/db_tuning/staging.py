@@ -0,0 +1,233 @@
+"""
+Write-staged week imports.
+
+An import used to delete and re-create a whole week row by row inside one
+long transaction, holding SQLite's write lock for the entire run. Now the
+rows are first written to a connection-private temp table (no lock on the
+main database) and then swapped in with one short transaction:
+
+    DELETE the week; INSERT ... SELECT from the stage; record + bump
+
+Under WAL, readers keep seeing the previous week until that commit and never
+wait on it.
+
+A corrected re-upload usually changes a handful of rows, so `merge()` keys
+both sides on (date, engagement id, n-th row of that id) and writes only the
+difference:
+
+    DELETE stored rows with no staged match; UPDATE matched rows whose values
+    differ; INSERT staged rows with no stored match; record (+ bump if changed)
+
+Unchanged rows keep their ids, and a re-upload that changes nothing leaves the
+week's cache generation alone.
+"""
+import logging
+
+import pandas as pd
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+STAGE_TABLE = 'revenueentry_stage'
+MATCH_TABLE = 'revenueentry_match'
+
+
+def resolve_dimensions(rows, start_date, batch_size=2000):
+    """Find or bulk-create the dimension rows a batch of entries points to.
+
+    rows: iterable of (client, service_line, sub_service_line, engagement).
+    Returns {'clients': {name: Client}, 'areas': {name: Area},
+    'sub_areas': {(service_line, sub_service_line): SubArea},
+    'contracts': {(client, engagement): Contract}}, with a handful of set-based
+    queries instead of four get_or_create calls per row.
+    """
+    from core_dashboard.models import Area, Client, Contract, SubArea
+
+    rows = [tuple(None if pd.isna(value) else value for value in row) for row in rows]
+    client_names = {r[0] for r in rows}
+    area_names = {r[1] for r in rows}
+    line_pairs = {(r[1], r[2]) for r in rows}
+    contract_pairs = {(r[0], r[3]) for r in rows if r[3]}
+
+    def find_or_create(load, keys, build):
+        # Reload only when something was missing
+        found = load()
+        missing = [build(key) for key in keys if key not in found]
+        if missing:
+            missing[0].__class__.objects.bulk_create(missing, batch_size=batch_size)
+            found = load()
+        return found
+
+    with transaction.atomic():
+        clients = find_or_create(
+            lambda: {c.name: c for c in Client.objects.filter(name__in=client_names)},
+            client_names, lambda name: Client(name=name),
+        )
+        areas = find_or_create(
+            lambda: {a.name: a for a in Area.objects.filter(name__in=area_names)},
+            area_names, lambda name: Area(name=name),
+        )
+        sub_areas = find_or_create(
+            lambda: {(s.area.name, s.name): s for s in SubArea.objects.filter(area__in=areas.values()).select_related('area')},
+            line_pairs, lambda pair: SubArea(area=areas[pair[0]], name=pair[1]),
+        )
+        contracts = find_or_create(
+            lambda: {(c.client.name, c.name): c for c in Contract.objects.filter(client__in=clients.values()).select_related('client')},
+            contract_pairs,
+            lambda pair: Contract(client=clients[pair[0]], name=pair[1], value=0, start_date=start_date, end_date=start_date),
+        )
+    return {'clients': clients, 'areas': areas, 'sub_areas': sub_areas, 'contracts': contracts}
+
+
+class WeekStaging:
+    """Stage the RevenueEntry rows of one report week, then swap them in at once."""
+
+    def __init__(self, week, using='default'):
+        from core_dashboard.models import RevenueEntry
+
+        self.week = week
+        self.using = using
+        self.model = RevenueEntry
+        self.fields = [f for f in RevenueEntry._meta.concrete_fields if not f.primary_key]
+        self.staged = 0
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def _columns(self):
+        qn = self.connection.ops.quote_name
+        return ', '.join(qn(f.column) for f in self.fields)
+
+    def load(self, entries, batch_size=2000):
+        """Write unsaved RevenueEntry instances to the stage (replacing anything staged before).
+
+        Staged rows are numbered 1..n in the stage's id column, in the order given.
+        """
+        connection = self.connection
+        qn = connection.ops.quote_name
+        table = qn(self.model._meta.db_table)
+        columns = f'{qn(self.model._meta.pk.column)}, {self._columns()}'
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 1))
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} AS SELECT * FROM {table} WHERE 0 = 1')
+            cursor.execute(f'DELETE FROM {STAGE_TABLE}')
+            self.staged = 0
+            batch = []
+            for entry in entries:
+                batch.append([self.staged + len(batch) + 1] + [
+                    f.get_db_prep_save(f.pre_save(entry, True), connection) for f in self.fields
+                ])
+                if len(batch) >= batch_size:
+                    cursor.executemany(f'INSERT INTO {STAGE_TABLE} ({columns}) VALUES ({placeholders})', batch)
+                    self.staged += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(f'INSERT INTO {STAGE_TABLE} ({columns}) VALUES ({placeholders})', batch)
+                self.staged += len(batch)
+        return self.staged
+
+    def swap(self, after=None):
+        """Replace the week's rows with the staged ones in one short transaction.
+
+        `after` runs inside the same transaction (registry update, generation
+        bump), so readers see the new rows and the new generation together.
+        Returns the number of rows swapped in.
+        """
+        table = self.connection.ops.quote_name(self.model._meta.db_table)
+        columns = self._columns()
+        try:
+            with transaction.atomic(using=self.using):
+                self.model.objects.using(self.using).filter(date=self.week).delete()
+                with self.connection.cursor() as cursor:
+                    cursor.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {STAGE_TABLE}')
+                    swapped = cursor.rowcount
+                if after is not None:
+                    after()
+        finally:
+            self.discard()
+        logger.info(f"Swapped {swapped} staged rows into week {self.week}")
+        return swapped
+
+    def _same(self, left, right):
+        # Null-safe equality
+        if self.connection.vendor == 'sqlite':
+            return f'{left} IS {right}'
+        return f'{left} IS NOT DISTINCT FROM {right}'
+
+    def _matches(self):
+        """SELECT of (entry_id, stage_id) pairs: the n-th stored row of an engagement id
+        in the week matches the n-th staged row of that id (duplicates in upload order)."""
+        qn = self.connection.ops.quote_name
+        table = qn(self.model._meta.db_table)
+        pk, key, date = qn(self.model._meta.pk.column), qn('engagement_id'), qn('date')
+        numbered = f'SELECT {pk} AS row_id, {key} AS row_key, ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY {pk}) AS n FROM '
+        return (
+            f'SELECT w.row_id AS entry_id, s.row_id AS stage_id '
+            f'FROM ({numbered}{table} WHERE {date} = %s) w '
+            f'JOIN ({numbered}{STAGE_TABLE}) s ON {self._same("w.row_key", "s.row_key")} AND w.n = s.n'
+        )
+
+    def merge(self, after=None):
+        """Apply the staged rows to the week as a diff, in one short transaction.
+
+        Stored rows without a staged match are deleted, matched rows are updated
+        when any value differs and unmatched staged rows are inserted. `after(diff)`
+        runs inside the same transaction. Returns {'inserted', 'updated', 'deleted',
+        'unchanged', 'rows'}.
+        """
+        connection = self.connection
+        qn = connection.ops.quote_name
+        table = qn(self.model._meta.db_table)
+        pk = qn(self.model._meta.pk.column)
+        columns = [qn(f.column) for f in self.fields]
+        week = self.model._meta.get_field('date').get_db_prep_value(self.week, connection)
+        differs = ' OR '.join(f'NOT ({self._same(f"w.{c}", f"s.{c}")})' for c in columns)
+        try:
+            with transaction.atomic(using=self.using), connection.cursor() as cursor:
+                # A write first, so the matching below reads the week under the write lock
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE {qn("date")} = %s AND {pk} NOT IN (SELECT entry_id FROM ({self._matches()}) m)',
+                    [week, week],
+                )
+                deleted = cursor.rowcount
+                cursor.execute(f'DROP TABLE IF EXISTS {MATCH_TABLE}')
+                cursor.execute(
+                    f'CREATE TEMP TABLE {MATCH_TABLE} AS SELECT m.entry_id, m.stage_id, '
+                    f'CASE WHEN {differs} THEN 1 ELSE 0 END AS changed FROM ({self._matches()}) m '
+                    f'JOIN {table} w ON w.{pk} = m.entry_id JOIN {STAGE_TABLE} s ON s.{pk} = m.stage_id',
+                    [week],
+                )
+                cursor.execute(
+                    f'UPDATE {table} SET ({", ".join(columns)}) = ('
+                    f'SELECT {", ".join(f"s.{c}" for c in columns)} FROM {MATCH_TABLE} m '
+                    f'JOIN {STAGE_TABLE} s ON s.{pk} = m.stage_id WHERE m.entry_id = {table}.{pk}) '
+                    f'WHERE {pk} IN (SELECT entry_id FROM {MATCH_TABLE} WHERE changed = 1)'
+                )
+                updated = cursor.rowcount
+                cursor.execute(
+                    f'INSERT INTO {table} ({", ".join(columns)}) SELECT {", ".join(columns)} FROM {STAGE_TABLE} '
+                    f'WHERE {pk} NOT IN (SELECT stage_id FROM {MATCH_TABLE}) ORDER BY {pk}'
+                )
+                inserted = cursor.rowcount
+                cursor.execute(f'SELECT COUNT(*) FROM {MATCH_TABLE}')
+                matched = cursor.fetchone()[0]
+                diff = {
+                    'inserted': inserted, 'updated': updated, 'deleted': deleted,
+                    'unchanged': matched - updated, 'rows': matched + inserted,
+                }
+                if after is not None:
+                    after(diff)
+        finally:
+            self.discard()
+        logger.info(
+            f"Merged {self.staged} staged rows into week {self.week}: {diff['inserted']} inserted, "
+            f"{diff['updated']} updated, {diff['deleted']} deleted, {diff['unchanged']} unchanged"
+        )
+        return diff
+
+    def discard(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {STAGE_TABLE}')
+            cursor.execute(f'DROP TABLE IF EXISTS {MATCH_TABLE}')
+        self.staged = 0
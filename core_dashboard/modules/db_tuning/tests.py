@@ -0,0 +1,172 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import Client as TestClient, TestCase, TransactionTestCase, override_settings
+
+from core_dashboard.models import Client, Contract, ReportWeek, RevenueEntry, SubArea
+from core_dashboard.modules.data_cache import get_generations, week_scope
+from core_dashboard.modules.synthetic_data import SyntheticDataset
+
+from .services import current_pragmas
+from .staging import WeekStaging, resolve_dimensions
+
+
+def build_import_frame(dataset, directory, week):
+    """merged_df for week, built from the synthetic workbooks like the import script does."""
+    from process_uploaded_data import _load_file, build_merged_df
+
+    paths = dataset.write_workbooks(directory, week)
+    engagement_df = _load_file(paths['engagement_list'], ['EngagementID', 'Client'], sheet_name='DATA ENG LIST')
+    revenue_df = _load_file(paths['revenue_days'], ['Employee Country/Region', 'Employee'], sheet_name='RevenueDays')
+    engagement_df['Week'] = week
+    return build_merged_df(engagement_df, revenue_df, week)
+
+
+class SqliteTuningTests(TestCase):
+    @unittest.skipIf(connection.vendor != 'sqlite', 'SQLite pragmas')
+    def test_pragmas_applied_to_new_connections(self):
+        pragmas = current_pragmas()
+        if not connection.is_in_memory_db():
+            self.assertEqual(pragmas['journal_mode'].lower(), 'wal')
+        self.assertEqual(pragmas['synchronous'], 1)  # NORMAL
+        self.assertEqual(pragmas['cache_size'], -65536)
+        self.assertEqual(pragmas['temp_store'], 2)  # MEMORY
+
+    def test_resolve_dimensions_is_idempotent(self):
+        rows = [
+            ('Client A', 'Assurance', 'Audit', 'Eng 1'),
+            ('Client A', 'Assurance', 'Audit', 'Eng 2'),
+            ('Client B', 'Tax', 'Indirect Tax', 'Eng 3'),
+            ('Client B', 'Tax', 'Indirect Tax', float('nan')),
+        ]
+        first = resolve_dimensions(rows, '2025-09-26')
+        self.assertEqual(set(first['contracts']), {('Client A', 'Eng 1'), ('Client A', 'Eng 2'), ('Client B', 'Eng 3')})
+        with self.assertNumQueries(6):  # savepoint, four lookups, release: nothing to create
+            second = resolve_dimensions(rows, '2025-09-26')
+        self.assertEqual(first['sub_areas'][('Tax', 'Indirect Tax')], second['sub_areas'][('Tax', 'Indirect Tax')])
+        self.assertEqual((Client.objects.count(), SubArea.objects.count(), Contract.objects.count()), (2, 2, 3))
+
+
+class WeekStagingTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.dataset = SyntheticDataset(partners=2, managers=3, engagements=10, weeks=2, seed=3)
+        self.dataset.write_database()
+        self.week = self.dataset.report_dates[-1]
+
+    def test_staged_rows_are_invisible_until_swapped(self):
+        from process_uploaded_data import import_week
+
+        merged = build_import_frame(self.dataset, self.directory, self.week)
+        merged = merged.iloc[:7]
+        stage = WeekStaging(self.week)
+        stage.load([RevenueEntry(date=self.week, client=Client.objects.first(), area=SubArea.objects.first().area)])
+        self.assertEqual(RevenueEntry.objects.filter(date=self.week).count(), 10)
+        stage.discard()
+
+        self.assertEqual(import_week(merged, self.week)['rows'], 7)
+        self.assertEqual(RevenueEntry.objects.filter(date=self.week).count(), 7)
+        self.assertEqual(RevenueEntry.objects.filter(date=self.dataset.report_dates[0]).count(), 10)
+        self.assertEqual(ReportWeek.objects.get(week_ending=self.week).row_count, 7)
+        entry = RevenueEntry.objects.get(date=self.week, engagement_id='E-00003')
+        self.assertEqual(entry.contract.name, 'Engagement 00003')
+        self.assertEqual(entry.sub_area.area_id, entry.area_id)
+
+    def test_reupload_applies_only_the_difference(self):
+        import pandas as pd
+
+        from process_uploaded_data import import_week
+
+        merged = build_import_frame(self.dataset, self.directory, self.week)
+        import_week(merged, self.week)
+        ids = dict(RevenueEntry.objects.filter(date=self.week).values_list('id', 'engagement_id'))
+        other_week = week_scope(self.dataset.report_dates[0])
+        generations = get_generations([week_scope(self.week), other_week])
+
+        self.assertEqual(import_week(merged, self.week), {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 10, 'rows': 10})
+        self.assertEqual(get_generations([week_scope(self.week), other_week]), generations)
+
+        # Corrected upload: two amounts fixed, one engagement gone, a second row for another
+        corrected = merged.copy()
+        corrected.loc[corrected.index[:2], 'FYTD_ANSRAmt'] = 12345.5
+        dropped, duplicated = corrected.iloc[2]['EngagementID'], corrected.iloc[3]['EngagementID']
+        corrected = pd.concat([corrected.drop(corrected.index[2]), corrected.iloc[[3]]], ignore_index=True)
+        diff = import_week(corrected, self.week)
+        self.assertEqual(diff, {'inserted': 1, 'updated': 2, 'deleted': 1, 'unchanged': 7, 'rows': 10})
+
+        after = dict(RevenueEntry.objects.filter(date=self.week).values_list('id', 'engagement_id'))
+        self.assertEqual({ids[i] for i in set(ids) - set(after)}, {dropped})
+        self.assertEqual([after[i] for i in set(after) - set(ids)], [duplicated])
+        self.assertEqual(
+            RevenueEntry.objects.filter(date=self.week, fytd_ansr_amt=12345.5).count(), 2
+        )
+        self.assertEqual(ReportWeek.objects.get(week_ending=self.week).row_count, 10)
+        changed = get_generations([week_scope(self.week), other_week])
+        # Bumped once, with the rows (the invalidation event after the import does not bump again)
+        token, value = generations[week_scope(self.week)].split('.')
+        self.assertEqual(changed[week_scope(self.week)], f'{token}.{int(value) + 1}')
+        self.assertEqual(changed[other_week], generations[other_week])
+
+
+@unittest.skipIf(connection.vendor != 'sqlite' or connection.is_in_memory_db(), 'needs a file-backed SQLite database')
+class ConcurrentImportTests(TransactionTestCase):
+    """Imports running while the dashboard is being hammered: no lock errors, no partial weeks."""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.dataset = SyntheticDataset(partners=3, managers=6, engagements=60, weeks=3, seed=11)
+        self.dataset.write_database()
+        self.week = self.dataset.report_dates[-1]
+        self.merged = build_import_frame(self.dataset, f'{self.media_root}/source', self.week)
+
+    def test_readers_never_block_or_see_partial_weeks(self):
+        from process_uploaded_data import import_week
+
+        stop = threading.Event()
+        errors, counts, statuses = [], [], []
+
+        def reader(path):
+            client = TestClient()
+            try:
+                while not stop.is_set():
+                    counts.append(RevenueEntry.objects.filter(date=self.week).count())
+                    statuses.append(client.get(path, {'inline': '1'}).status_code)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        def writer():
+            try:
+                for _ in range(4):
+                    import_week(self.merged, self.week)
+                    time.sleep(0.05)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                stop.set()
+                connections.close_all()
+
+        threads = [threading.Thread(target=reader, args=('/',)) for _ in range(3)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=120)
+
+        self.assertEqual(errors, [])
+        self.assertTrue(statuses)
+        self.assertEqual(set(statuses), {200})
+        self.assertEqual(set(counts), {60})
+        self.assertEqual(RevenueEntry.objects.filter(date=self.week).count(), 60)
@@ -0,0 +1,16 @@
+"""
+Dimension Catalogue Module
+==========================
+
+Materializes the filter dropdown lists (partners, managers, service lines,
+sub-service lines and clients) once per data import and keeps them in the
+Django cache under a data-generation key (see `data_cache`). The lists are
+rebuilt lazily after an upload or a clear bumps the generation.
+
+A typeahead JSON endpoint lets large lists be searched without shipping them
+whole to the browser.
+"""
+
+from .services import DimensionCatalogueService, DIMENSIONS
+
+__all__ = ['DimensionCatalogueService', 'DIMENSIONS']
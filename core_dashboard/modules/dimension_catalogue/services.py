@@ -0,0 +1,80 @@
+import logging
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from core_dashboard.models import Area, Client, Manager, Partner, SubArea
+from core_dashboard.modules.data_cache import MANAGER_REVENUE_DAYS_SCOPE, REVENUE_SCOPE, cached, make_key
+from core_dashboard.modules.people import people_with_entries
+
+logger = logging.getLogger(__name__)
+
+# Public dimension names (also accepted by the typeahead endpoint)
+DIMENSIONS = ('partners', 'managers', 'engagement_managers', 'areas', 'sub_areas', 'clients')
+
+
+def _distinct_names(queryset, field):
+    return list(
+        queryset.values_list(field, flat=True).distinct()
+        .exclude(**{f'{field}__isnull': True}).exclude(Q(**{f'{field}__exact': ''}))
+        .order_by(field)
+    )
+
+
+class DimensionCatalogueService:
+    CACHE_NAMESPACE = 'dimension_catalogue:v2'
+    # The manager list also includes the Manager Revenue Days upload
+    CACHE_SCOPES = (REVENUE_SCOPE, MANAGER_REVENUE_DAYS_SCOPE)
+
+    def get_catalogue(self):
+        """Return {dimension: sorted list of names}, building it on a cache miss.
+
+        The key embeds the current data generations, so an upload or a clear
+        that bumps them makes the next call rebuild the lists.
+        """
+        return cached(self.CACHE_NAMESPACE, (), self.build_catalogue, scopes=self.CACHE_SCOPES)
+
+    def get_dimension(self, dimension):
+        return self.get_catalogue().get(dimension, [])
+
+    def invalidate(self):
+        cache.delete(make_key(self.CACHE_NAMESPACE, scopes=self.CACHE_SCOPES))
+
+    def build_catalogue(self):
+        engagement_managers = people_with_entries(Manager)
+
+        # Managers listed in the Manager Revenue Days report may have no entries yet
+        try:
+            from core_dashboard.modules.manager_revenue_days.analytics import ManagerAnalyticsService
+            revenue_days_managers = ManagerAnalyticsService().get_available_managers()
+        except Exception as e:
+            logger.warning(f"Error getting Revenue Days managers: {e}")
+            revenue_days_managers = []
+
+        return {
+            'partners': people_with_entries(Partner),
+            'managers': sorted({m for m in list(engagement_managers) + list(revenue_days_managers) if m}),
+            'engagement_managers': engagement_managers,
+            'areas': _distinct_names(Area.objects, 'name'),
+            'sub_areas': _distinct_names(SubArea.objects, 'name'),
+            'clients': _distinct_names(Client.objects, 'name'),
+        }
+
+    def search(self, dimension, query='', limit=20):
+        """Case-insensitive typeahead over one dimension; prefix matches come first.
+
+        Returns dict with results (at most `limit` names) and total matches.
+        """
+        names = self.get_dimension(dimension)
+        needle = (query or '').strip().casefold()
+        if not needle:
+            return {'results': names[:limit], 'total': len(names)}
+        prefix, contains = [], []
+        for name in names:
+            folded = name.casefold()
+            if folded.startswith(needle):
+                prefix.append(name)
+            elif needle in folded:
+                contains.append(name)
+        matches = prefix + contains
+        return {'results': matches[:limit], 'total': len(matches)}
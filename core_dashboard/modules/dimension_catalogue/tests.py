@@ -0,0 +1,62 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core_dashboard.models import Area, Client, RevenueEntry, SubArea
+from core_dashboard.modules.hooks import notify_data_invalidated
+from .services import DimensionCatalogueService
+
+
+@mock.patch(
+    'core_dashboard.modules.manager_revenue_days.analytics.ManagerAnalyticsService.get_available_managers',
+    return_value=['Excel Manager', 'Manager B'],
+)
+class DimensionCatalogueServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        area = Area.objects.create(name='Assurance')
+        SubArea.objects.create(area=area, name='Audit')
+        for name in ('Beta Corp', 'Alpha SA', 'Alphabet'):
+            Client.objects.create(name=name)
+        client = Client.objects.get(name='Alpha SA')
+        for partner, manager in (('Partner A', 'Manager B'), ('Partner C', ''), (None, 'Manager A')):
+            RevenueEntry.objects.create(
+                date=datetime.date(2025, 8, 15), client=client, area=area,
+                engagement_partner=partner, engagement_manager=manager,
+            )
+
+    def test_catalogue_lists_and_manager_union(self, _managers):
+        catalogue = DimensionCatalogueService().get_catalogue()
+        self.assertEqual(catalogue['partners'], ['Partner A', 'Partner C'])
+        self.assertEqual(catalogue['engagement_managers'], ['Manager A', 'Manager B'])
+        self.assertEqual(catalogue['managers'], ['Excel Manager', 'Manager A', 'Manager B'])
+        self.assertEqual(catalogue['clients'], ['Alpha SA', 'Alphabet', 'Beta Corp'])
+        self.assertEqual(catalogue['sub_areas'], ['Audit'])
+
+    def test_catalogue_is_cached_until_invalidated(self, _managers):
+        service = DimensionCatalogueService()
+        service.get_catalogue()
+        with self.assertNumQueries(1):  # the generation lookup only
+            service.get_catalogue()
+
+        Client.objects.create(name='Gamma')
+        self.assertNotIn('Gamma', service.get_dimension('clients'))
+        notify_data_invalidated(scope='weeks', weeks=[datetime.date(2025, 8, 15)])
+        self.assertIn('Gamma', service.get_dimension('clients'))
+
+    def test_search_prefers_prefix_matches(self, _managers):
+        result = DimensionCatalogueService().search('clients', 'alph', limit=1)
+        self.assertEqual(result, {'results': ['Alpha SA'], 'total': 2})
+        self.assertEqual(DimensionCatalogueService().search('clients', 'bet')['results'], ['Beta Corp', 'Alphabet'])
+
+    def test_typeahead_endpoint(self, _managers):
+        response = self.client.get(reverse('dimension_catalogue:typeahead'), {'dimension': 'partners', 'q': 'c'})
+        payload = response.json()
+        self.assertTrue(payload['success'])
+        self.assertEqual(payload['results'], ['Partner C'])
+
+        response = self.client.get(reverse('dimension_catalogue:typeahead'), {'dimension': 'nope'})
+        self.assertEqual(response.status_code, 400)
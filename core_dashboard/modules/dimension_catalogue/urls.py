@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'dimension_catalogue'
+
+urlpatterns = [
+    path('typeahead/', views.typeahead_view, name='typeahead'),
+]
@@ -0,0 +1,21 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .services import DIMENSIONS, DimensionCatalogueService
+
+
+@require_GET
+def typeahead_view(request):
+    """Search a filter dimension. Query params: dimension, q, limit (max 100)."""
+    dimension = request.GET.get('dimension', '')
+    if dimension not in DIMENSIONS:
+        return JsonResponse(
+            {'success': False, 'error': f"Unknown dimension '{dimension}'. Use one of: {', '.join(DIMENSIONS)}"},
+            status=400,
+        )
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 100))
+    except ValueError:
+        limit = 20
+    result = DimensionCatalogueService().search(dimension, request.GET.get('q', ''), limit=limit)
+    return JsonResponse({'success': True, 'dimension': dimension, **result})
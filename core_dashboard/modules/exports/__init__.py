@@ -0,0 +1,17 @@
+"""
+Exports Module
+==============
+
+Streams weekly snapshots of ``RevenueEntry`` (joined with client, contract,
+area and sub-area) straight from the database into CSV, XLSX or Parquet
+files. Rows are read with server-side cursors (``.iterator(chunk_size=...)``)
+and written incrementally, so memory stays flat regardless of the week size.
+
+Generated files are cached under ``MEDIA_ROOT/exports`` keyed by the week
+range and the data generation of that range, so repeat downloads are served
+from disk without touching the database again.
+"""
+
+from .services import RevenueExportService, EXPORT_FORMATS
+
+__all__ = ['RevenueExportService', 'EXPORT_FORMATS']
@@ -0,0 +1,271 @@
+import csv
+import datetime
+import glob
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from core_dashboard.models import RevenueEntry
+from core_dashboard.modules.data_cache import get_generations, week_scope
+from core_dashboard.modules.report_weeks import get_report_dates
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+
+# (column header, ORM lookup) in output order. Related names are resolved by
+# the database join so no per-row attribute access happens in Python.
+EXPORT_COLUMNS = [
+    ('date', 'date'),
+    ('engagement_id', 'engagement_id'),
+    ('engagement', 'engagement'),
+    ('client', 'client__name'),
+    ('contract', 'contract__name'),
+    ('area', 'area__name'),
+    ('sub_area', 'sub_area__name'),
+    ('engagement_partner', 'engagement_partner'),
+    ('engagement_manager', 'engagement_manager'),
+    ('engagement_service_line', 'engagement_service_line'),
+    ('engagement_sub_service_line', 'engagement_sub_service_line'),
+    ('duplicate_engagement_id', 'duplicate_engagement_id'),
+    ('periodo_fiscal', 'periodo_fiscal'),
+    ('original_week_string', 'original_week_string'),
+    ('fecha_cobro', 'fecha_cobro'),
+    ('fytd_charged_hours', 'fytd_charged_hours'),
+    ('fytd_direct_cost_amt', 'fytd_direct_cost_amt'),
+    ('fytd_ansr_amt', 'fytd_ansr_amt'),
+    ('mtd_charged_hours', 'mtd_charged_hours'),
+    ('mtd_direct_cost_amt', 'mtd_direct_cost_amt'),
+    ('mtd_ansr_amt', 'mtd_ansr_amt'),
+    ('cp_ansr_amt', 'cp_ansr_amt'),
+    ('dif_div', 'dif_div'),
+    ('perdida_tipo_cambio_monitor', 'perdida_tipo_cambio_monitor'),
+    ('fytd_diferencial_final', 'fytd_diferencial_final'),
+    ('diferencial_mtd', 'diferencial_mtd'),
+    ('fytd_ansr_sintetico', 'fytd_ansr_sintetico'),
+    ('total_revenue_days_p_cp', 'total_revenue_days_p_cp'),
+    ('fytd_ar_collected_amt', 'fytd_ar_collected_amt'),
+    ('fytd_ar_collected_tax_amt', 'fytd_ar_collected_tax_amt'),
+    ('fytd_collect_total_amt', 'fytd_collect_total_amt'),
+    ('fytd_total_billed_amt', 'fytd_total_billed_amt'),
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class RevenueExportService:
+    """Write weekly RevenueEntry extracts to disk, reusing previously generated files."""
+
+    def __init__(self, chunk_size=2000):
+        self.chunk_size = chunk_size
+        self.media_folder = os.path.join(settings.MEDIA_ROOT, 'exports')
+        os.makedirs(self.media_folder, exist_ok=True)
+
+    @staticmethod
+    def parquet_available():
+        return pq is not None
+
+    def get_available_weeks(self):
+        """Return the imported report dates, newest first (from the report-week registry)."""
+        return get_report_dates()[::-1]
+
+    def data_generation(self, start_date, end_date):
+        """Fingerprint of the rows in the range.
+
+        Imports update rows in place and bump the data generation of their week,
+        so the fingerprint combines the week generations of the range with the
+        row count and highest primary key (which writers that bypass the import
+        still change).
+        """
+        stats = RevenueEntry.objects.filter(date__range=[start_date, end_date]).aggregate(
+            rows=Count('id'), last_id=Max('id')
+        )
+        days = [start_date + datetime.timedelta(days=7 * i) for i in range((end_date - start_date).days // 7 + 1)]
+        scopes = list(dict.fromkeys(week_scope(day) for day in days + [end_date]))
+        generations = get_generations(scopes)
+        digest = hashlib.sha256('|'.join(generations[s] for s in scopes).encode('utf-8')).hexdigest()[:12]
+        return f"{stats['rows'] or 0}-{stats['last_id'] or 0}-{digest}"
+
+    def export(self, start_date, end_date=None, fmt='csv'):
+        """Export the report dates between start_date and end_date (inclusive).
+
+        Returns dict with success, path, filename, content_type, rows and cached.
+        """
+        fmt = (fmt or 'csv').lower()
+        if fmt not in EXPORT_FORMATS:
+            return {'success': False, 'error': f'Unsupported export format: {fmt}'}
+        if fmt == 'parquet' and pq is None:
+            return {'success': False, 'error': 'Parquet export requires pyarrow to be installed'}
+
+        end_date = end_date or start_date
+        if end_date < start_date:
+            start_date, end_date = end_date, start_date
+
+        generation = self.data_generation(start_date, end_date)
+        if generation.startswith('0-'):
+            return {'success': False, 'error': f'No data found between {start_date} and {end_date}'}
+
+        stem = self._file_stem(start_date, end_date)
+        filename = f'{stem}.{fmt}'
+        path = os.path.join(self.media_folder, f'{stem}__{generation}.{fmt}')
+        result = {
+            'success': True,
+            'path': path,
+            'filename': filename,
+            'content_type': EXPORT_FORMATS[fmt],
+            'generation': generation,
+        }
+        if os.path.exists(path):
+            result.update({'cached': True, 'rows': None})
+            return result
+
+        self._remove_stale_files(stem, fmt)
+        tmp_path = path + '.tmp'
+        writer = getattr(self, f'_write_{fmt}')
+        try:
+            rows = writer(tmp_path, self._iter_chunks(start_date, end_date))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.exception('Failed to export RevenueEntry data')
+            try:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except Exception:
+                pass
+            return {'success': False, 'error': str(e)}
+
+        result.update({'cached': False, 'rows': rows})
+        return result
+
+    def preview(self, report_date, limit=200):
+        """Return the first `limit` rows of a report date as a list of dicts."""
+        headers = [h for h, _ in EXPORT_COLUMNS]
+        lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+        qs = RevenueEntry.objects.filter(date=report_date).order_by('id').values_list(*lookups)[:limit]
+        return [dict(zip(headers, row)) for row in qs]
+
+    def clear(self, week=None):
+        """Remove cached export files (all of them, or only those covering `week`).
+
+        Returns the number of files removed.
+        """
+        removed = 0
+        for path in glob.glob(os.path.join(self.media_folder, 'RevenueEntry_*')):
+            if week is not None and not self._file_covers(os.path.basename(path), week):
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except Exception:
+                pass
+        return removed
+
+    def _file_stem(self, start_date, end_date):
+        if start_date == end_date:
+            return f'RevenueEntry_{start_date.isoformat()}'
+        return f'RevenueEntry_{start_date.isoformat()}_{end_date.isoformat()}'
+
+    @staticmethod
+    def _file_covers(filename, week):
+        """True when an export file name (RevenueEntry_<start>[_<end>]__<gen>.<ext>) includes week."""
+        dates = filename.split('__', 1)[0].split('_')[1:]
+        try:
+            start = datetime.date.fromisoformat(dates[0])
+            end = datetime.date.fromisoformat(dates[-1])
+        except (IndexError, ValueError):
+            return True
+        return start <= week <= end
+
+    def _remove_stale_files(self, stem, fmt):
+        for old in glob.glob(os.path.join(self.media_folder, f'{stem}__*.{fmt}')):
+            try:
+                os.remove(old)
+            except Exception:
+                pass
+
+    def _iter_chunks(self, start_date, end_date):
+        """Yield lists of row tuples of at most chunk_size rows from a server-side cursor."""
+        lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+        qs = (
+            RevenueEntry.objects.filter(date__range=[start_date, end_date])
+            .order_by('date', 'id')
+            .values_list(*lookups)
+        )
+        chunk = []
+        for row in qs.iterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _write_csv(self, path, chunks):
+        rows = 0
+        with open(path, 'w', newline='', encoding='utf-8') as fh:
+            writer = csv.writer(fh)
+            writer.writerow([h for h, _ in EXPORT_COLUMNS])
+            for chunk in chunks:
+                writer.writerows(chunk)
+                rows += len(chunk)
+        return rows
+
+    def _write_xlsx(self, path, chunks):
+        from openpyxl import Workbook
+
+        # write_only workbooks stream rows to disk instead of building the sheet in memory
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('RevenueEntry')
+        ws.append([h for h, _ in EXPORT_COLUMNS])
+        rows = 0
+        for chunk in chunks:
+            for row in chunk:
+                ws.append(list(row))
+            rows += len(chunk)
+        with open(path, 'wb') as fh:
+            wb.save(fh)
+        return rows
+
+    def _write_parquet(self, path, chunks):
+        headers = [h for h, _ in EXPORT_COLUMNS]
+        schema = pa.schema([
+            (h, pa.date32() if h == 'date'
+             else pa.int64() if h == 'duplicate_engagement_id'
+             else pa.float64() if h.startswith(('fytd_', 'mtd_', 'cp_', 'dif_', 'perdida_', 'diferencial_', 'total_'))
+             else pa.string())
+            for h in headers
+        ])
+        rows = 0
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in chunks:
+                columns = list(zip(*chunk))
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array(col, type=schema.field(i).type) for i, col in enumerate(columns)],
+                    schema=schema,
+                )
+                writer.write_batch(batch)
+                rows += len(chunk)
+        return rows
+
+
+def parse_week(value):
+    """Parse a YYYY-MM-DD query parameter into a date, returning None when invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
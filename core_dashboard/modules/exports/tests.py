@@ -0,0 +1,111 @@
+import csv
+import datetime
+import shutil
+import tempfile
+import unittest
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core_dashboard.models import Area, Client, RevenueEntry, SubArea
+from core_dashboard.modules.data_cache import bump_weeks
+from core_dashboard.modules.report_weeks import sync_from_entries
+from .services import RevenueExportService
+
+
+class RevenueExportServiceTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+        client = Client.objects.create(name='ACME')
+        area = Area.objects.create(name='Assurance')
+        sub_area = SubArea.objects.create(area=area, name='Audit')
+        self.week = datetime.date(2025, 8, 8)
+        for i in range(5):
+            RevenueEntry.objects.create(
+                date=self.week, client=client, area=area, sub_area=sub_area,
+                engagement_id=f'E-{i}', engagement_partner='Partner A', fytd_ansr_amt=100.0 * i,
+            )
+        RevenueEntry.objects.create(
+            date=datetime.date(2025, 8, 15), client=client, area=area, engagement_id='E-9',
+        )
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_csv_export_streams_rows_and_reuses_cached_file(self):
+        service = RevenueExportService(chunk_size=2)
+        result = service.export(self.week, fmt='csv')
+        self.assertTrue(result['success'], msg=result.get('error'))
+        self.assertFalse(result['cached'])
+        self.assertEqual(result['rows'], 5)
+
+        with open(result['path'], newline='', encoding='utf-8') as fh:
+            rows = list(csv.DictReader(fh))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['client'], 'ACME')
+        self.assertEqual(rows[0]['sub_area'], 'Audit')
+
+        again = service.export(self.week, fmt='csv')
+        self.assertTrue(again['cached'])
+        self.assertEqual(again['path'], result['path'])
+
+    def test_new_data_produces_new_generation(self):
+        service = RevenueExportService()
+        first = service.export(self.week, fmt='csv')
+        entry = RevenueEntry.objects.filter(date=self.week).first()
+        RevenueEntry.objects.create(date=self.week, client=entry.client, area=entry.area, engagement_id='E-new')
+        second = service.export(self.week, fmt='csv')
+        self.assertFalse(second['cached'])
+        self.assertNotEqual(first['generation'], second['generation'])
+        self.assertEqual(second['rows'], 6)
+
+    def test_corrected_import_produces_new_generation(self):
+        # An import updates rows in place: same count and ids, new week generation
+        service = RevenueExportService()
+        first = service.export(self.week, fmt='csv')
+        RevenueEntry.objects.filter(date=self.week, engagement_id='E-1').update(fytd_ansr_amt=1.0)
+        bump_weeks([self.week])
+        second = service.export(self.week, fmt='csv')
+        self.assertFalse(second['cached'])
+        self.assertNotEqual(first['generation'], second['generation'])
+        self.assertEqual(first['generation'].split('-')[:2], second['generation'].split('-')[:2])
+
+    def test_available_weeks_read_the_registry(self):
+        sync_from_entries()
+        with self.assertNumQueries(1):
+            weeks = RevenueExportService().get_available_weeks()
+        self.assertEqual(weeks, [datetime.date(2025, 8, 15), self.week])
+
+    def test_range_and_xlsx_export(self):
+        from openpyxl import load_workbook
+
+        service = RevenueExportService()
+        result = service.export(self.week, datetime.date(2025, 8, 15), fmt='xlsx')
+        self.assertTrue(result['success'], msg=result.get('error'))
+        wb = load_workbook(result['path'], read_only=True)
+        self.assertEqual(sum(1 for _ in wb['RevenueEntry'].iter_rows()), 7)  # header + 6 rows
+
+    @unittest.skipUnless(RevenueExportService.parquet_available(), 'pyarrow not installed')
+    def test_parquet_export(self):
+        import pyarrow.parquet as pq
+
+        result = RevenueExportService(chunk_size=2).export(self.week, fmt='parquet')
+        self.assertTrue(result['success'], msg=result.get('error'))
+        self.assertEqual(pq.read_table(result['path']).num_rows, 5)
+
+    def test_empty_week_and_view(self):
+        service = RevenueExportService()
+        self.assertFalse(service.export(datetime.date(2020, 1, 3))['success'])
+
+        response = self.client.get(reverse('exports:revenue'), {'week': '2025-08-08', 'format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response['Content-Disposition'])
+        # Drain the stream: the client closes the file without recycling the DB connection
+        self.assertTrue(b''.join(response.streaming_content))
+
+        response = self.client.get(reverse('exports:revenue'), {'week': 'not-a-date'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'exports'
+
+urlpatterns = [
+    path('revenue/', views.export_revenue_view, name='revenue'),
+]
@@ -0,0 +1,30 @@
+from django.http import FileResponse, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .services import RevenueExportService, parse_week
+
+
+@require_GET
+def export_revenue_view(request):
+    """Download a week (or range of weeks) of RevenueEntry as csv, xlsx or parquet.
+
+    Query params: week=YYYY-MM-DD, optional end_week=YYYY-MM-DD, format=csv|xlsx|parquet
+    """
+    start_date = parse_week(request.GET.get('week'))
+    if start_date is None:
+        return JsonResponse({'success': False, 'error': 'Missing or invalid week (expected YYYY-MM-DD)'}, status=400)
+    end_date = parse_week(request.GET.get('end_week')) or start_date
+
+    service = RevenueExportService()
+    result = service.export(start_date, end_date, fmt=request.GET.get('format', 'csv'))
+    if not result.get('success'):
+        return JsonResponse(result, status=400)
+
+    response = FileResponse(
+        open(result['path'], 'rb'),
+        as_attachment=True,
+        filename=result['filename'],
+        content_type=result['content_type'],
+    )
+    response['X-Export-Cache'] = 'hit' if result.get('cached') else 'miss'
+    return response
@@ -67,6 +67,7 @@ class FacturacionService:
                     os.remove(self._cache_file)
             except Exception:
                 pass
+            self.bump_generation()
 
             return {
                 'success': True,
@@ -85,6 +86,14 @@ class FacturacionService:
             logger.exception('Error processing Facturacion file')
             return {'success': False, 'error': str(e)}
 
+    def bump_generation(self):
+        """Invalidate generation-keyed caches built from the Facturacion files."""
+        try:
+            from core_dashboard.modules.data_cache import FACTURACION_SCOPE, bump_generation
+            bump_generation(FACTURACION_SCOPE)
+        except Exception as e:
+            logger.warning(f"Could not bump Facturacion data generation: {e}")
+
     def get_latest_file_info(self):
         files = [os.path.join(self.media_folder, f) for f in os.listdir(self.media_folder) if f.lower().endswith(('.xlsx', '.xls'))]
         if not files:
@@ -41,4 +41,5 @@ def clear_view(request):
             os.remove(service._cache_file)
     except Exception:
         pass
+    service.bump_generation()
     return JsonResponse({'success': True, 'message': 'Facturacion files cleared'})
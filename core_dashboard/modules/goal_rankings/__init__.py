@@ -0,0 +1,18 @@
+"""
+Goal Rankings Module
+====================
+
+The partner, manager, service line and sub service line rankings of the
+Key Performance Indicators cards, each row with its ANSR/hours FYTD, RPH,
+the metas goal and the comparison against the dimension's average.
+
+All four rankings come from one grouped pass over the selected rows
+(`grouped_frame` of the OLAP engine). The metas CSVs are loaded once per
+change into one long table indexed by normalized label and fiscal month, so
+goals are attached with a merge and every derived column is computed on
+whole columns instead of per ranking row.
+"""
+
+from .services import GOAL_SOURCES, RANKING_FIELDS, RANKING_GOALS, goal_rankings, load_goal_table
+
+__all__ = ['GOAL_SOURCES', 'RANKING_FIELDS', 'RANKING_GOALS', 'goal_rankings', 'load_goal_table']
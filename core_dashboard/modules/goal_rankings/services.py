@@ -0,0 +1,206 @@
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from core_dashboard.modules.olap import LABELED, engine_for
+from core_dashboard.utils import get_fiscal_month_year, normalize_key
+
+logger = logging.getLogger(__name__)
+
+# Goal tables: metas file, label column, monthly ANSR goal column
+GOAL_SOURCES = {
+    'partner': ('metas_PPED.csv', 'Partner', 'ANSR Goal PPED'),
+    'manager': ('metas_MANAGERS.csv', 'Manager', 'ANSR Goal'),
+    'service_line': ('metas_SL.csv', 'SL', 'ANSR Goal'),
+}
+# Ranking dimension -> (goal source, match labels by contains when the key is unknown,
+# use the yearly 'Total' row when there are no monthly goals up to the report month)
+RANKING_GOALS = {
+    'partner__name': ('partner', True, True),
+    'manager__name': ('manager', True, True),
+    'area__name': ('service_line', False, True),
+    # No dedicated file for sub service lines; metas_SL rows of the same name, if any
+    'sub_area__name': ('service_line', False, False),
+}
+RANKING_FIELDS = tuple(RANKING_GOALS)
+
+SPANISH_MONTHS = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
+    'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12,
+}
+TOTAL_PERIOD = 0
+
+_goal_table = None  # (signature, frame), rebuilt when a metas file changes
+_lock = threading.Lock()
+
+
+def fiscal_period(mes):
+    """(fiscal year start, fiscal month 1..12 from July) of a metas 'Mes' label like 'Julio 25';
+    (None, TOTAL_PERIOD) for 'Total' and None for anything else."""
+    parts = str(mes).split()
+    if len(parts) == 1 and parts[0].casefold() == 'total':
+        return None, TOTAL_PERIOD
+    if len(parts) != 2 or parts[0].casefold() not in SPANISH_MONTHS or not parts[1].isdigit():
+        return None
+    month, year = SPANISH_MONTHS[parts[0].casefold()], 2000 + int(parts[1])
+    return (year if month >= 7 else year - 1), (month - 7) % 12 + 1
+
+
+def _read_source(source):
+    name, label_col, goal_col = GOAL_SOURCES[source]
+    path = os.path.join(settings.BASE_DIR, name)
+    if not os.path.exists(path):
+        return None
+    try:
+        metas = pd.read_csv(path)
+    except Exception as e:
+        logger.warning(f"Could not read {name}: {e}")
+        return None
+    if not {label_col, goal_col, 'Mes'} <= set(metas.columns):
+        logger.warning(f"{name} has no {label_col!r} / {goal_col!r} / 'Mes' columns; no goals for {source}")
+        return None
+    periods = metas['Mes'].map(fiscal_period)
+    known = periods.notna()
+    metas, periods = metas[known], periods[known]
+    return pd.DataFrame({
+        'source': source,
+        'key': metas[label_col].map(normalize_key).to_numpy(),
+        'fy': [fy for fy, _ in periods],
+        'period': [period for _, period in periods],
+        'goal': pd.to_numeric(metas[goal_col], errors='coerce').to_numpy(),
+    })
+
+
+def load_goal_table():
+    """Every monthly and yearly ANSR goal of the metas files, long format
+    (source, key, fy, period, goal), loaded once per change of the files."""
+    global _goal_table
+    signature = []
+    for name, _, _ in GOAL_SOURCES.values():
+        try:
+            signature.append(os.path.getmtime(os.path.join(settings.BASE_DIR, name)))
+        except OSError:
+            signature.append(None)
+    signature = (str(settings.BASE_DIR), tuple(signature))
+    table = _goal_table
+    if table is None or table[0] != signature:
+        with _lock:
+            table = _goal_table
+            if table is None or table[0] != signature:
+                frames = [f for f in (_read_source(source) for source in GOAL_SOURCES) if f is not None]
+                frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+                    {'source': [], 'key': [], 'fy': [], 'period': [], 'goal': []}
+                )
+                _goal_table = table = (signature, frame)
+    return table[1]
+
+
+def goals_by_key(table, source, report_date):
+    """Per metas key of `source`: the goal of the report's fiscal month (`goal`, NaN when
+    the month has no row), the cumulative FYTD goal (`goal_fytd`) and the yearly Total."""
+    rows = table[table['source'] == source]
+    target = fiscal_period(get_fiscal_month_year(report_date)) if report_date else None
+    if target is not None:
+        fy, period = target
+        in_year = rows['fy'].eq(fy)
+        month = rows[in_year & rows['period'].eq(period)].groupby('key')['goal'].sum()
+        fytd = rows[in_year & rows['period'].between(1, period)].groupby('key')['goal'].sum()
+    else:
+        month = fytd = pd.Series(dtype='float64')
+    total = rows[rows['period'].eq(TOTAL_PERIOD)].groupby('key')['goal'].sum()
+    goals = pd.DataFrame({'goal': month, 'goal_fytd': fytd, 'goal_total': total})
+    goals.index.name = 'key'
+    return goals
+
+
+def _match_goals(keys, goals, contains):
+    """Goal columns aligned to `keys`: the metas row of the same key, else (contains) the
+    sum of every metas key containing it."""
+    keys = np.asarray(keys, dtype=object)
+    matched = goals.reindex(keys).reset_index(drop=True)
+    if contains and not goals.empty:
+        unknown = ~np.isin(keys, goals.index.to_numpy()) & (keys != '')
+        for key in pd.unique(keys[unknown]):
+            hits = goals[goals.index.str.contains(key, regex=False)]
+            if not hits.empty:
+                matched.loc[keys == key, :] = hits.sum(min_count=1).to_numpy()
+    return matched
+
+
+def _color(pct):
+    return np.select([pct < 50, pct < 95, pct >= 95], ['red', 'yellow', 'green'], 'grey')
+
+
+def _rank(frame, field, goals, contains, use_total):
+    """The ranking rows of one dimension from the multi-dimension grouped frame."""
+    key = LABELED.get(field, field)
+    groups = frame.groupby(key, dropna=False, sort=False).agg(
+        label=(field, 'first'), ansr_fytd=('ansr_fytd', 'sum'), hours_fytd=('hours_fytd', 'sum'),
+    ).reset_index(drop=True)
+    groups = groups.sort_values('ansr_fytd', ascending=False, kind='stable').reset_index(drop=True)
+    if groups.empty:
+        return []
+
+    ansr = groups['ansr_fytd'].to_numpy(dtype='float64')
+    hours = groups['hours_fytd'].to_numpy(dtype='float64')
+    keys = groups['label'].map(normalize_key)
+    matched = _match_goals(keys, goals, contains)
+
+    goal_fytd = matched['goal_fytd'].to_numpy(dtype='float64')
+    if use_total:
+        # No cumulative goal up to the report month: compare against the yearly Total
+        goal_fytd = np.where(np.nan_to_num(goal_fytd) == 0, matched['goal_total'].to_numpy(dtype='float64'), goal_fytd)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rph = np.where(hours != 0, ansr / hours, 0.0)
+        completion = np.where(goal_fytd > 0, ansr / goal_fytd * 100, np.nan)
+        avg_ansr = float(ansr.mean())
+        comparison = ansr / avg_ansr * 100 if avg_ansr > 0 else np.full(len(ansr), np.nan)
+
+    labels = groups['label'].where(groups['label'].notna() & groups['label'].ne(''), '-').tolist()
+    columns = {
+        'ansr_fytd': ansr.tolist(),
+        'hours_fytd': hours.tolist(),
+        'rph': rph.tolist(),
+        'goal': matched['goal'].tolist(),
+        'goal_completion_percentage': completion.tolist(),
+        'goal_color': _color(completion).tolist(),
+        'comparison_pct': comparison.tolist(),
+        'comparison_color': _color(comparison).tolist(),
+    }
+    rows = []
+    for i, label in enumerate(labels):
+        row = {'label': label}
+        for name, values in columns.items():
+            value = values[i]
+            row[name] = None if isinstance(value, float) and np.isnan(value) else value
+        row['avg_ansr'] = avg_ansr
+        rows.append(row)
+    return rows
+
+
+def goal_rankings(selection, report_date=None, fields=RANKING_FIELDS):
+    """{field: ranking rows} for every field of RANKING_GOALS, from one grouped pass.
+
+    Rows are ordered by ANSR FYTD and carry: label, ansr_fytd, hours_fytd, rph,
+    goal (monthly goal of the report's fiscal month), goal_completion_percentage
+    (against the cumulative FYTD goal) and goal_color, and avg_ansr,
+    comparison_pct / comparison_color against the average of the dimension.
+    Goals match on the normalized label (see utils.normalize_key).
+    """
+    frame = engine_for(selection).grouped_frame(
+        selection, list(fields), {'ansr_fytd': 'fytd_ansr_sintetico', 'hours_fytd': 'fytd_charged_hours'}
+    )
+    frame[['ansr_fytd', 'hours_fytd']] = frame[['ansr_fytd', 'hours_fytd']].fillna(0.0)
+    table = load_goal_table()
+    goals = {}
+    rankings = {}
+    for field in fields:
+        source, contains, use_total = RANKING_GOALS[field]
+        if source not in goals:
+            goals[source] = goals_by_key(table, source, report_date)
+        rankings[field] = _rank(frame, field, goals[source], contains, use_total)
+    return rankings
@@ -0,0 +1,132 @@
+import datetime
+import shutil
+import tempfile
+
+import pandas as pd
+from django.core.cache import cache
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+
+from core_dashboard.models import Area, Client, RevenueEntry
+from core_dashboard.modules.olap import FrameEngine, Selection
+from core_dashboard.modules.olap.tests import round_floats
+from core_dashboard.modules.synthetic_data import SyntheticDataset
+
+from .services import fiscal_period, goal_rankings, load_goal_table
+
+WEEK = datetime.date(2025, 9, 26)  # fiscal month 'Septiembre 25'
+MONTHS = ('Julio 25', 'Agosto 25', 'Septiembre 25', 'Octubre 25')
+
+
+def write_metas(base_dir):
+    pped = [('Partner 00', mes, 100.0) for mes in MONTHS] + [('Partner 00', 'Total', 5000.0)]
+    pped += [('Partner 01', 'Total', 2000.0)]  # yearly goal only
+    pped += [('Socio Partner 02 (CP)', mes, 10.0) for mes in MONTHS]  # matched by contains
+    pd.DataFrame(pped, columns=['Partner', 'Mes', 'ANSR Goal PPED']).to_csv(f'{base_dir}/metas_PPED.csv', index=False)
+    managers = [('MANAGER 00 ', mes, 50.0) for mes in MONTHS]
+    pd.DataFrame(managers, columns=['Manager', 'Mes', 'ANSR Goal']).to_csv(f'{base_dir}/metas_MANAGERS.csv', index=False)
+    sl = [('Assurance', mes, 1000.0) for mes in MONTHS] + [('Tax', 'Total', 8000.0), ('Audit', 'Agosto 25', 40.0)]
+    pd.DataFrame(sl, columns=['SL', 'Mes', 'ANSR Goal']).to_csv(f'{base_dir}/metas_SL.csv', index=False)
+
+
+class GoalRankingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        SyntheticDataset(partners=4, managers=5, engagements=40, weeks=3, end_date=WEEK, seed=3).write_database()
+        RevenueEntry.objects.create(date=WEEK, client=Client.objects.first(), area=Area.objects.first(),
+                                    engagement_partner='', fytd_ansr_sintetico=None)
+
+    def setUp(self):
+        cache.clear()
+        FrameEngine.reset()
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        write_metas(self.base_dir)
+
+    def rankings(self, engine=None, report_date=WEEK):
+        with override_settings(BASE_DIR=self.base_dir, DASHBOARD_OLAP_ENGINE=engine or 'orm'):
+            return goal_rankings(Selection({'date': WEEK}), report_date)
+
+    def by_label(self, rows):
+        return {row['label']: row for row in rows}
+
+    def test_fiscal_period(self):
+        self.assertEqual(fiscal_period('Julio 25'), (2025, 1))
+        self.assertEqual(fiscal_period('junio 26'), (2025, 12))
+        self.assertEqual(fiscal_period('Total'), (None, 0))
+        self.assertIsNone(fiscal_period('Q1'))
+
+    def test_rankings_match_the_grouped_sums(self):
+        rankings = self.rankings()
+        week = RevenueEntry.objects.filter(date=WEEK)
+        for field, rows in rankings.items():
+            self.assertEqual([r['ansr_fytd'] for r in rows], sorted((r['ansr_fytd'] for r in rows), reverse=True))
+            expected = {(row[field] or '-'): row['ansr'] or 0 for row in week.values(field).annotate(ansr=Sum('fytd_ansr_sintetico'))}
+            self.assertEqual(set(self.by_label(rows)), set(expected), field)
+            for label, ansr in expected.items():
+                self.assertAlmostEqual(self.by_label(rows)[label]['ansr_fytd'], ansr, places=4)
+            avg = sum(r['ansr_fytd'] for r in rows) / len(rows)
+            for row in rows:
+                self.assertAlmostEqual(row['avg_ansr'], avg)
+                self.assertAlmostEqual(row['comparison_pct'], row['ansr_fytd'] / avg * 100)
+                self.assertAlmostEqual(row['rph'], row['ansr_fytd'] / row['hours_fytd'] if row['hours_fytd'] else 0)
+
+    def test_goals_by_normalized_label_and_fiscal_month(self):
+        rankings = self.rankings()
+        partners = self.by_label(rankings['partner__name'])
+        # Monthly goal displayed, completion against Julio..Septiembre
+        self.assertEqual(partners['Partner 00']['goal'], 100.0)
+        self.assertAlmostEqual(partners['Partner 00']['goal_completion_percentage'], partners['Partner 00']['ansr_fytd'] / 3)
+        # Only a yearly goal: no monthly goal, completion against the Total
+        self.assertIsNone(partners['Partner 01']['goal'])
+        self.assertAlmostEqual(partners['Partner 01']['goal_completion_percentage'], partners['Partner 01']['ansr_fytd'] / 20)
+        self.assertEqual(partners['Partner 02']['goal'], 10.0)
+        self.assertIsNone(partners['Partner 03']['goal_completion_percentage'])
+        self.assertEqual(partners['Partner 03']['goal_color'], 'grey')
+        self.assertEqual(partners['-']['ansr_fytd'], 0.0)
+
+        managers = self.by_label(rankings['manager__name'])
+        self.assertEqual(managers['Manager 00']['goal'], 50.0)
+
+        lines = self.by_label(rankings['area__name'])
+        self.assertEqual(lines['Assurance']['goal'], 1000.0)
+        self.assertIsNone(lines['Tax']['goal'])
+        self.assertAlmostEqual(lines['Tax']['goal_completion_percentage'], lines['Tax']['ansr_fytd'] / 80)
+        # Sub service lines: no yearly fallback
+        subs = self.by_label(rankings['sub_area__name'])
+        self.assertIsNone(subs['Audit']['goal'])
+        self.assertAlmostEqual(subs['Audit']['goal_completion_percentage'], subs['Audit']['ansr_fytd'] / 40 * 100)
+
+        for rows in rankings.values():
+            for row in rows:
+                pct = row['goal_completion_percentage']
+                expected = 'grey' if pct is None else 'red' if pct < 50 else 'yellow' if pct < 95 else 'green'
+                self.assertEqual(row['goal_color'], expected)
+
+    def test_without_report_date_only_yearly_goals_apply(self):
+        partners = self.by_label(self.rankings(report_date=None)['partner__name'])
+        self.assertIsNone(partners['Partner 00']['goal'])
+        self.assertAlmostEqual(partners['Partner 00']['goal_completion_percentage'], partners['Partner 00']['ansr_fytd'] / 50)
+
+    def test_engines_agree(self):
+        expected = self.rankings('orm')
+        self.assertEqual(round_floats(self.rankings('frame')), round_floats(expected))
+        with override_settings(BASE_DIR=self.base_dir):
+            queryset = goal_rankings(RevenueEntry.objects.filter(date=WEEK), WEEK)
+        self.assertEqual(round_floats(queryset), round_floats(expected))
+
+    def test_goal_table_is_loaded_once_per_change(self):
+        with override_settings(BASE_DIR=self.base_dir):
+            table = load_goal_table()
+            self.assertIs(load_goal_table(), table)
+            self.assertEqual(set(table['source']), {'partner', 'manager', 'service_line'})
+            # A metas file that is not a goal table gives no goals instead of failing
+            with open(f'{self.base_dir}/metas_SL.csv', 'w') as fh:
+                fh.write('version https://git-lfs.github.com/spec/v1\n')
+            with self.assertLogs('core_dashboard.modules.goal_rankings.services', 'WARNING'):
+                table = load_goal_table()
+            self.assertEqual(set(table['source']), {'partner', 'manager'})
+
+    def test_empty_selection(self):
+        with override_settings(BASE_DIR=self.base_dir):
+            self.assertEqual(goal_rankings(Selection.none(), WEEK), {field: [] for field in self.rankings()})
@@ -0,0 +1,89 @@
+"""
+Cross-module hooks.
+
+`data_invalidated` is the single event fired whenever stored data is removed
+or replaced. Modules that keep derived files or caches listen to it instead of
+each caller having to know which caches exist.
+
+Signal kwargs:
+- scope: 'all' when everything was purged, 'weeks' for a scoped change
+- weeks: list of datetime.date report dates affected (only for scope='weeks')
+- bump_generations: False when the caller already bumped the data generations
+  (an import does it in its own transaction)
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.dispatch import Signal, receiver
+
+logger = logging.getLogger(__name__)
+
+data_invalidated = Signal()
+
+
+def notify_data_invalidated(sender=None, scope='all', weeks=None, bump_generations=True):
+    """Fire the invalidation event, never letting a broken receiver fail the caller."""
+    results = data_invalidated.send_robust(
+        sender=sender, scope=scope, weeks=list(weeks or []), bump_generations=bump_generations
+    )
+    for func, outcome in results:
+        if isinstance(outcome, Exception):
+            logger.warning('Cache invalidation receiver %s failed: %s', getattr(func, '__name__', func), outcome)
+    return results
+
+
+@receiver(data_invalidated)
+def clear_export_files(sender, scope='all', weeks=None, **kwargs):
+    from core_dashboard.modules.exports.services import RevenueExportService
+
+    service = RevenueExportService()
+    if scope == 'all':
+        return service.clear()
+    # Range exports may include the week as well, so drop any file mentioning it
+    removed = 0
+    for week in weeks or []:
+        removed += service.clear(week)
+    return removed
+
+
+@receiver(data_invalidated)
+def clear_module_pickle_caches(sender, scope='all', weeks=None, **kwargs):
+    # Cobranzas/Facturacion caches are built from their own uploads, not from
+    # RevenueEntry, so they only need to go when everything is purged.
+    if scope != 'all':
+        return 0
+    removed = 0
+    for rel in ('cobranzas/cobranzas_combined_cache.pkl', 'facturacion/facturacion_combined_cache.pkl'):
+        path = os.path.join(settings.MEDIA_ROOT, rel)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        except Exception:
+            pass
+    return removed
+
+
+@receiver(data_invalidated)
+def bump_data_generation(sender, scope='all', weeks=None, bump_generations=True, **kwargs):
+    # Generation-keyed caches (dashboard KPIs, rankings, catalogue) go stale at once
+    from core_dashboard.modules.data_cache import bump_all, bump_weeks
+
+    if not bump_generations:
+        return
+    if scope == 'all':
+        bump_all()
+    else:
+        bump_weeks(weeks)
+
+
+@receiver(data_invalidated)
+def clear_parsed_sources(sender, scope='all', weeks=None, **kwargs):
+    # Parsed workbooks are keyed by file content, so a week re-import never makes
+    # them stale; only a full purge drops them.
+    if scope != 'all':
+        return 0
+    from core_dashboard.modules.source_cache import clear
+
+    return clear()
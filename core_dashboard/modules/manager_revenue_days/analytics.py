@@ -13,7 +13,9 @@ from decimal import Decimal
 from django.conf import settings
 from django.db.models import Sum, Count, Q
 from datetime import datetime, timedelta
-from core_dashboard.models import RevenueEntry
+from core_dashboard.models import Manager, RevenueEntry
+from core_dashboard.modules.people import match_person, people_with_entries
+from core_dashboard.utils import normalize_key
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +53,7 @@ class ManagerAnalyticsService:
             
             # Get revenue entries for this manager, filtered by selected date if provided
             manager_entries = RevenueEntry.objects.filter(
-                engagement_manager=manager_name
+                manager__key=normalize_key(manager_name)
             )
             
             # Apply date filtering like the main dashboard does
@@ -62,21 +64,14 @@ class ManagerAnalyticsService:
                 start_of_week = friday_date - timedelta(days=friday_date.weekday())
                 end_of_week = start_of_week + timedelta(days=6)
                 manager_entries = manager_entries.filter(date__range=[start_of_week, end_of_week])
-                logger.info(f"Filtered entries for week {start_of_week} to {end_of_week}: {manager_entries.count()} entries")
+                logger.debug(f"Filtering entries for week {start_of_week} to {end_of_week}")
             else:
-                # If no date provided, use the most recent week available
-                from django.db.models.functions import TruncWeek
-                available_weeks_raw = RevenueEntry.objects.annotate(
-                    calculated_week=TruncWeek('date')
-                ).values_list('calculated_week', flat=True).distinct().order_by('calculated_week')
-                
-                if available_weeks_raw:
-                    most_recent_week_start = list(available_weeks_raw)[-1]
-                    friday_date = most_recent_week_start + timedelta(days=4)
-                    start_of_week = friday_date - timedelta(days=friday_date.weekday())
-                    end_of_week = start_of_week + timedelta(days=6)
+                # If no date provided, use the most recent week in the report-week registry
+                from core_dashboard.modules.report_weeks import get_week_range
+                start_of_week, end_of_week = get_week_range()
+                if start_of_week:
                     manager_entries = manager_entries.filter(date__range=[start_of_week, end_of_week])
-                    logger.info(f"Using most recent week {start_of_week} to {end_of_week}: {manager_entries.count()} entries")
+                    logger.info(f"Using most recent week {start_of_week} to {end_of_week}")
             
             if not manager_entries.exists():
                 logger.warning(f"No revenue entries found for manager: {manager_name}")
@@ -223,7 +218,7 @@ class ManagerAnalyticsService:
                 logger.info(f"Filtered for Venezuela: {len(df)} entries")
             
             # Find the manager in the Employee column
-            manager_row = df[df['Employee'].str.contains(manager_name, case=False, na=False)]
+            manager_row = df[match_person(df['Employee'], manager_name).to_numpy()]
             
             if manager_row.empty:
                 logger.warning(f"Manager {manager_name} not found in Revenue Days file")
@@ -369,15 +364,7 @@ class ManagerAnalyticsService:
     def get_all_managers(self):
         """Get list of all available managers."""
         try:
-            managers = RevenueEntry.objects.values_list(
-                'engagement_manager', flat=True
-            ).distinct().exclude(
-                engagement_manager__isnull=True
-            ).exclude(
-                engagement_manager__exact=''
-            ).order_by('engagement_manager')
-            
-            return list(managers)
+            return people_with_entries(Manager)
             
         except Exception as e:
             logger.error(f"Error getting managers list: {str(e)}")
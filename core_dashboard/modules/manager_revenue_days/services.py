@@ -71,6 +71,7 @@ class ManagerRevenueDaysService:
             extracted_data.to_excel(output_path, index=False, sheet_name='RevenueDays')
             
             logger.info(f"Successfully saved extracted sheet to: {output_path}")
+            self._bump_generation()
             
             return {
                 'success': True,
@@ -129,6 +130,7 @@ class ManagerRevenueDaysService:
                         cleared_files.append(filename)
             
             logger.info(f"Cleared {len(cleared_files)} Manager Revenue Days files")
+            self._bump_generation()
             
             return {
                 'success': True,
@@ -142,3 +144,11 @@ class ManagerRevenueDaysService:
                 'success': False,
                 'error': f'Error clearing files: {str(e)}'
             }
+
+    def _bump_generation(self):
+        """Invalidate caches built from this file (e.g. the dashboard manager dropdown)."""
+        try:
+            from core_dashboard.modules.data_cache import MANAGER_REVENUE_DAYS_SCOPE, bump_generation
+            bump_generation(MANAGER_REVENUE_DAYS_SCOPE)
+        except Exception as e:
+            logger.warning(f"Could not bump Manager Revenue Days data generation: {e}")
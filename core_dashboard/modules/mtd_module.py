@@ -0,0 +1,184 @@
+"""
+Diferencial MTD engine.
+
+`diferencial_mtd` is the month-to-date part of the FYTD exchange differential:
+
+- first fiscal month (Julio): MTD equals `fytd_diferencial_final`
+- later months: current `fytd_diferencial_final` minus the value the same
+  engagement had on the last report of the previous fiscal month (baseline)
+
+The same rules are used at import time (`compute_frame_mtd`, on the pandas
+frame being loaded) and when revalidating stored data
+(`recompute_diferencial_mtd`, set-based over any range of weeks).
+"""
+import bisect
+import logging
+import time
+
+import pandas as pd
+from django.db import transaction
+
+from core_dashboard.models import RevenueEntry
+from core_dashboard.modules.data_cache import week_scope
+from core_dashboard.modules.hooks import notify_data_invalidated
+from core_dashboard.utils import get_fiscal_month_year
+
+logger = logging.getLogger(__name__)
+
+FIRST_FISCAL_MONTH = 'Julio'
+TOLERANCE = 0.01
+
+
+def is_first_fiscal_month(report_date):
+    return get_fiscal_month_year(report_date).split(' ')[0] == FIRST_FISCAL_MONTH
+
+
+def get_report_dates():
+    """All imported report dates, ascending (from the report-week registry)."""
+    from core_dashboard.modules.report_weeks import get_report_dates as registry_dates
+    return registry_dates()
+
+
+def previous_fiscal_baseline(report_date, known_dates):
+    """Last date in known_dates (sorted ascending) before report_date that belongs
+    to a different fiscal period, or None when there is none."""
+    period = get_fiscal_month_year(report_date)
+    idx = bisect.bisect_left(known_dates, report_date) - 1
+    # Fiscal periods are monotonic in time, so walking back over the current
+    # period's reports lands on the previous period's last report.
+    while idx >= 0 and get_fiscal_month_year(known_dates[idx]) == period:
+        idx -= 1
+    return known_dates[idx] if idx >= 0 else None
+
+
+def import_guard_scopes(report_date):
+    """Generation scopes an import of report_date depends on: its own week and,
+    after the first fiscal month, the week of its MTD baseline. A stored import
+    is only reusable while none of them has been bumped."""
+    scopes = [week_scope(report_date)]
+    if not is_first_fiscal_month(report_date):
+        baseline = previous_fiscal_baseline(report_date, get_report_dates())
+        if baseline is not None:
+            scopes.append(week_scope(baseline))
+    return scopes
+
+
+def get_baseline_values(baseline_date):
+    """{engagement_id: fytd_diferencial_final} for the rows of baseline_date."""
+    if baseline_date is None:
+        return {}
+    rows = (
+        RevenueEntry.objects.filter(date=baseline_date)
+        .order_by('id')
+        .values_list('engagement_id', 'fytd_diferencial_final')
+    )
+    return {str(eng_id): value for eng_id, value in rows}
+
+
+def compute_frame_mtd(frame, report_date, baseline_values=None, id_col='EngagementID', final_col='diferencial_final'):
+    """Vectorized MTD for an import frame. Returns a Series aligned with frame.
+
+    Without a baseline (first fiscal month, or no previous month imported yet)
+    MTD is the FYTD value itself.
+    """
+    final = pd.to_numeric(frame[final_col], errors='coerce')
+    if is_first_fiscal_month(report_date) or not baseline_values:
+        return final.copy()
+    prev = pd.to_numeric(frame[id_col].astype(str).map(baseline_values), errors='coerce').fillna(0.0)
+    return final.fillna(0.0) - prev
+
+
+def recompute_diferencial_mtd(start_date=None, end_date=None, dry_run=False, batch_size=2000):
+    """Validate (and fix unless dry_run) diferencial_mtd for every report date in range.
+
+    All rows of the range and of their baselines are read in one query and
+    joined in memory on (baseline date, engagement_id); only rows whose value
+    differs are written back with bulk_update in batches, and the weeks that
+    changed are invalidated.
+
+    Returns dict with total_fixes, elapsed_seconds and a per-date summary list.
+    """
+    start = time.perf_counter()
+    known_dates = get_report_dates()
+    targets = [
+        d for d in known_dates
+        if (start_date is None or d >= start_date) and (end_date is None or d <= end_date)
+    ]
+    summary = {'total_fixes': 0, 'dry_run': dry_run, 'dates': []}
+    if not targets:
+        summary['elapsed_seconds'] = round(time.perf_counter() - start, 3)
+        return summary
+
+    first_month = {d: is_first_fiscal_month(d) for d in targets}
+    baselines = {
+        d: (None if first_month[d] else previous_fiscal_baseline(d, known_dates)) for d in targets
+    }
+    needed_dates = set(targets) | {b for b in baselines.values() if b is not None}
+
+    df = pd.DataFrame.from_records(
+        RevenueEntry.objects.filter(date__in=needed_dates)
+        .order_by('id')
+        .values_list('id', 'date', 'engagement_id', 'fytd_diferencial_final', 'diferencial_mtd'),
+        columns=['id', 'date', 'engagement_id', 'final', 'mtd'],
+    )
+    df['final'] = pd.to_numeric(df['final'], errors='coerce')
+    df['mtd'] = pd.to_numeric(df['mtd'], errors='coerce')
+
+    # Baseline side of the self-join; on duplicated engagement ids the last row wins
+    base = (
+        df[['date', 'engagement_id', 'final']]
+        .drop_duplicates(['date', 'engagement_id'], keep='last')
+        .rename(columns={'date': 'baseline_date', 'final': 'prev'})
+    )
+    base['prev'] = base['prev'].fillna(0.0)
+
+    cur = df[df['date'].isin(targets)].copy()
+    cur['baseline_date'] = cur['date'].map(baselines)
+    cur['first_month'] = cur['date'].map(first_month)
+    cur = cur.merge(base, on=['baseline_date', 'engagement_id'], how='left')
+
+    has_final = cur['final'].notna()
+    has_baseline = cur['baseline_date'].notna()
+    cur['expected'] = cur['mtd']
+    # First fiscal month: MTD == FYTD, or 0 when there is no FYTD value
+    fm = cur['first_month']
+    fm_fix_final = fm & has_final & (cur['mtd'] != cur['final'])
+    fm_fix_zero = fm & ~has_final & cur['mtd'].notna() & (cur['mtd'] != 0)
+    cur.loc[fm_fix_final, 'expected'] = cur.loc[fm_fix_final, 'final']
+    cur.loc[fm_fix_zero, 'expected'] = 0.0
+    # Later months: FYTD minus the previous fiscal month's last report
+    later = ~fm & has_baseline & has_final
+    later_expected = cur['final'] - cur['prev'].fillna(0.0)
+    later_fix = later & ((cur['mtd'].fillna(0.0) - later_expected).abs() > TOLERANCE)
+    cur.loc[later_fix, 'expected'] = later_expected[later_fix]
+
+    cur['fix'] = fm_fix_final | fm_fix_zero | later_fix
+    cur['old_mtd'] = cur['mtd']
+    fixes = cur[cur['fix']]
+
+    if not dry_run and not fixes.empty:
+        objs = [RevenueEntry(id=int(i), diferencial_mtd=float(v)) for i, v in zip(fixes['id'], fixes['expected'])]
+        with transaction.atomic():
+            RevenueEntry.objects.bulk_update(objs, ['diferencial_mtd'], batch_size=batch_size)
+        cur['mtd'] = cur['expected']
+        # Generation-keyed caches, exports and snapshots of the fixed weeks go stale
+        notify_data_invalidated(sender=recompute_diferencial_mtd, scope='weeks', weeks=sorted(set(fixes['date'])))
+
+    for report_date, group in cur.groupby('date', sort=True):
+        date_fixes = group[group['fix']]
+        summary['dates'].append({
+            'date': report_date,
+            'fiscal_period': get_fiscal_month_year(report_date),
+            'first_fiscal_month': bool(first_month[report_date]),
+            'baseline_date': baselines[report_date],
+            'fixes': int(len(date_fixes)),
+            'examples': [
+                (int(i), None if pd.isna(old) else float(old), float(new))
+                for i, old, new in zip(date_fixes['id'][:5], date_fixes['old_mtd'][:5], date_fixes['expected'][:5])
+            ],
+            'mtd_sum': float(group['mtd'].fillna(0.0).sum()),
+            'final_sum': float(group['final'].fillna(0.0).sum()),
+        })
+    summary['total_fixes'] = int(len(fixes))
+    summary['elapsed_seconds'] = round(time.perf_counter() - start, 3)
+    return summary
@@ -0,0 +1,47 @@
+"""
+OLAP Module
+===========
+
+Pluggable aggregation engines for the dashboard's grouped metrics (KPI sums,
+partner/manager/client/SL/SSL rankings, the revenue trend):
+
+- `Selection`: the RevenueEntry rows to aggregate, as Django filter lookups
+- `OrmEngine`: Django ORM aggregates (default)
+- `FrameEngine`: in-process columnar snapshot (pandas), rebuilt per import
+  generation
+- `DuckDBEngine`: the snapshot queried through DuckDB, when installed
+
+`grouped_frame()` groups by several dimensions in one pass, for callers that
+roll the result up per dimension (the goal rankings).
+
+`get_engine()` returns the engine chosen by `DASHBOARD_OLAP_ENGINE`;
+`python manage.py benchmark_olap` compares them on a synthetic dataset.
+"""
+
+from .services import (
+    DIMENSIONS,
+    ENGINES,
+    LABELED,
+    MEASURES,
+    AggregationEngine,
+    DuckDBEngine,
+    FrameEngine,
+    OrmEngine,
+    Selection,
+    engine_for,
+    get_engine,
+)
+
+__all__ = [
+    'AggregationEngine',
+    'DIMENSIONS',
+    'DuckDBEngine',
+    'ENGINES',
+    'FrameEngine',
+    'LABELED',
+    'MEASURES',
+    'OrmEngine',
+    'Selection',
+    'engine_for',
+    'get_engine',
+]
@@ -0,0 +1,642 @@
+"""
+Aggregation engines for the dashboard's grouped metrics.
+
+The KPI, ranking and trend services describe *what* they need (a selection of
+RevenueEntry rows, the measures to sum, the dimension to group by) and an
+engine computes it:
+
+- `OrmEngine`: Django ORM aggregates on the row table (the default)
+- `FrameEngine`: an in-process columnar snapshot of RevenueEntry (pandas,
+  categorical dimensions); after an import only the imported week's rows are
+  reloaded
+- `DuckDBEngine`: the same snapshot queried with DuckDB's vectorized SQL;
+  optional, only when the duckdb package is installed
+
+`DASHBOARD_OLAP_ENGINE` picks the engine ('orm', 'frame' or 'duckdb').
+Selections the snapshot engines cannot express fall back to the ORM, and a
+plain QuerySet is always aggregated by the ORM.
+"""
+import datetime
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import connection, models
+from django.db.models import CharField, FloatField, Q, QuerySet, Sum, Value
+from django.db.models.functions import Coalesce
+
+from core_dashboard.models import Area, Client, Contract, Manager, Partner, RevenueEntry, SubArea
+from core_dashboard.modules.data_cache import REVENUE_SCOPE, get_generation, get_generations, week_scope
+from core_dashboard.modules.report_weeks import get_report_dates
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+# Dimension lookups a snapshot can filter and group by, with the SQL that loads them
+DIMENSIONS = {
+    'engagement_partner': 'e.engagement_partner',
+    'engagement_manager': 'e.engagement_manager',
+    'engagement_id': 'e.engagement_id',
+    'engagement_service_line': 'e.engagement_service_line',
+    'engagement_sub_service_line': 'e.engagement_sub_service_line',
+    'partner': 'e.partner_id',
+    'manager': 'e.manager_id',
+    'client': 'e.client_id',
+    'contract': 'e.contract_id',
+    'area': 'e.area_id',
+    'sub_area': 'e.sub_area_id',
+    'client__name': 'c.name',
+    'contract__name': 'k.name',
+    'area__name': 'a.name',
+    'sub_area__name': 's.name',
+    'partner__name': 'p.name',
+    'partner__key': 'p.key',
+    'manager__name': 'm.name',
+    'manager__key': 'm.key',
+}
+# Integer foreign keys among the dimensions
+FOREIGN_KEYS = ('client', 'contract', 'area', 'sub_area', 'partner', 'manager')
+# Person names are grouped on their integer key, then labelled
+LABELED = {'partner__name': 'partner', 'manager__name': 'manager'}
+# Numeric RevenueEntry fields a snapshot can sum
+MEASURES = tuple(
+    f.name for f in RevenueEntry._meta.concrete_fields
+    if isinstance(f, (models.FloatField, models.DecimalField, models.IntegerField)) and not f.primary_key
+)
+
+
+class UnsupportedSelection(Exception):
+    """The snapshot cannot evaluate this selection; the ORM will."""
+
+
+class Selection:
+    """RevenueEntry rows described by Django filter lookups (e.g. {'date__range': (a, b), 'area__name': 'Tax'})."""
+
+    def __init__(self, lookups=None, empty=False):
+        self.lookups = dict(lookups or {})
+        self.empty = empty
+
+    @classmethod
+    def none(cls):
+        return cls(empty=True)
+
+    def narrow(self, **lookups):
+        """A new selection with extra lookups (None values are ignored)."""
+        merged = dict(self.lookups)
+        merged.update({k: v for k, v in lookups.items() if v is not None})
+        return Selection(merged, self.empty)
+
+    def queryset(self):
+        if self.empty:
+            return RevenueEntry.objects.none()
+        return RevenueEntry.objects.filter(**self.lookups)
+
+    def __repr__(self):
+        return f'Selection({self.lookups!r}, empty={self.empty})'
+
+
+class AggregationEngine:
+    """Common interface; every method takes a Selection (or a QuerySet for the ORM)."""
+
+    name = None
+
+    def totals(self, selection, measures, distinct=()):
+        """{measure: SUM or None} plus {'<field>__distinct': count} for each distinct field."""
+        raise NotImplementedError
+
+    def grouped(self, selection, group_by, measures, order_by=None, exclude_blank=False):
+        """[{group_by: label, alias: SUM or None}] for measures={alias: field}.
+
+        order_by is an alias or group_by itself, '-' for descending; NULLs sort as
+        the smallest value, like SQLite. exclude_blank drops NULL and empty labels.
+        """
+        raise NotImplementedError
+
+    def ranked(self, selection, group_by, field, after=None, limit=None):
+        """[{group_by: label, 'total': SUM(field) or 0.0}] ordered by total descending,
+        then label ascending (NULL as '').
+
+        Keyset pagination: `after` is the (total, label) of the last row already
+        seen; `limit` caps the rows returned.
+        """
+        raise NotImplementedError
+
+    def grouped_frame(self, selection, group_bys, measures):
+        """One grouped pass over several dimensions at once, as a DataFrame.
+
+        One row per observed combination of `group_bys` (plus the integer key of
+        each LABELED dimension), with a float column per alias of measures={alias:
+        field}; NULL sums are NaN. Callers roll it up to each dimension with pandas.
+        """
+        raise NotImplementedError
+
+    def daily_trend(self, selection):
+        """(labels, data): per engagement, the change between consecutive cumulative
+        `revenue` reports, summed per report date."""
+        raise NotImplementedError
+
+
+class OrmEngine(AggregationEngine):
+    name = 'orm'
+
+    @staticmethod
+    def _queryset(selection):
+        return selection if isinstance(selection, QuerySet) else selection.queryset()
+
+    def totals(self, selection, measures, distinct=()):
+        qs = self._queryset(selection)
+        result = qs.aggregate(**{m: Sum(m) for m in measures})
+        for field in distinct:
+            result[f'{field}__distinct'] = qs.values(field).distinct().count()
+        return result
+
+    def grouped(self, selection, group_by, measures, order_by=None, exclude_blank=False):
+        qs = self._queryset(selection)
+        key = LABELED.get(group_by)
+        if exclude_blank:
+            qs = qs.exclude(**{f'{group_by}__isnull': True}).exclude(**{f'{group_by}__exact': ''})
+        rows = qs.values(*([key] if key else []), group_by).annotate(
+            **{alias: Sum(field) for alias, field in measures.items()}
+        )
+        if order_by:
+            rows = rows.order_by(order_by)
+        rows = list(rows)
+        if key:
+            for row in rows:
+                del row[key]
+        return rows
+
+    def ranked(self, selection, group_by, field, after=None, limit=None):
+        key = LABELED.get(group_by)
+        rows = self._queryset(selection).values(*([key] if key else []), group_by).annotate(
+            total=Coalesce(Sum(field), Value(0.0), output_field=FloatField()),
+            rank_label=Coalesce(group_by, Value(''), output_field=CharField()),
+        )
+        if after is not None:
+            total, label = after
+            rows = rows.filter(Q(total__lt=total) | Q(total=total, rank_label__gt=label))
+        rows = rows.order_by('-total', 'rank_label')
+        if limit is not None:
+            rows = rows[:limit]
+        return [{group_by: row[group_by], 'total': float(row['total'])} for row in rows]
+
+    def grouped_frame(self, selection, group_bys, measures):
+        keys = _frame_keys(group_bys)
+        rows = list(self._queryset(selection).values(*keys).annotate(
+            **{alias: Sum(field) for alias, field in measures.items()}
+        ).order_by())
+        frame = pd.DataFrame({key: pd.Series([row[key] for row in rows], dtype=object) for key in keys})
+        for alias in measures:
+            frame[alias] = pd.to_numeric(pd.Series([row[alias] for row in rows], dtype=object), errors='coerce').astype('float64')
+        return frame
+
+    def daily_trend(self, selection):
+        all_entries = list(
+            self._queryset(selection).order_by('engagement_id', 'date').values('engagement_id', 'date', 'revenue')
+        )
+
+        daily_revenues = []
+        prev_engagement_id = None
+        prev_revenue = 0
+
+        for entry in all_entries:
+            current_engagement_id = entry['engagement_id']
+            current_revenue = entry['revenue'] or 0
+
+            if current_engagement_id != prev_engagement_id:
+                # New engagement, so the daily revenue is the current revenue
+                daily_revenue = current_revenue
+            else:
+                # Same engagement, calculate the difference
+                daily_revenue = current_revenue - prev_revenue
+
+            daily_revenues.append({
+                'date': entry['date'],
+                'daily_revenue': daily_revenue
+            })
+
+            prev_engagement_id = current_engagement_id
+            prev_revenue = current_revenue
+
+        # Sum up daily revenues by date
+        df = pd.DataFrame(daily_revenues)
+        if df.empty:
+            return [], []
+        # Ensure 'daily_revenue' is numeric before summing
+        df['daily_revenue'] = pd.to_numeric(df['daily_revenue'], errors='coerce').fillna(0)
+        daily_totals = df.groupby('date')['daily_revenue'].sum().reset_index()
+        # Ensure the 'date' column is in datetime format before using .dt accessor
+        daily_totals['date'] = pd.to_datetime(daily_totals['date'])
+        trend_labels = daily_totals['date'].dt.strftime('%Y-%m-%d').tolist()
+        trend_data = [float(x) for x in daily_totals['daily_revenue']]
+        return trend_labels, trend_data
+
+
+def load_snapshot(weeks=None):
+    """RevenueEntry rows as a columnar frame: categorical dimensions, float measures.
+
+    Every row, or only those of the given week scopes ('week:<friday>', Monday
+    to Sunday around that Friday).
+    """
+    columns = [f'{sql} AS "{name}"' for name, sql in DIMENSIONS.items()]
+    columns += [f'e.{RevenueEntry._meta.get_field(m).column} AS "{m}"' for m in MEASURES]
+    sql = (
+        f'SELECT e.date AS "date", {", ".join(columns)} '
+        f'FROM {RevenueEntry._meta.db_table} e '
+        f'LEFT JOIN {Client._meta.db_table} c ON c.id = e.client_id '
+        f'LEFT JOIN {Contract._meta.db_table} k ON k.id = e.contract_id '
+        f'LEFT JOIN {Area._meta.db_table} a ON a.id = e.area_id '
+        f'LEFT JOIN {SubArea._meta.db_table} s ON s.id = e.sub_area_id '
+        f'LEFT JOIN {Partner._meta.db_table} p ON p.id = e.partner_id '
+        f'LEFT JOIN {Manager._meta.db_table} m ON m.id = e.manager_id'
+    )
+    params = []
+    if weeks is not None:
+        if not weeks:
+            sql += ' WHERE 1 = 0'
+        else:
+            sql += ' WHERE ' + ' OR '.join(['e.date BETWEEN %s AND %s'] * len(weeks))
+            for scope in weeks:
+                params += [d.isoformat() for d in _week_bounds(scope)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        names = [col[0] for col in cursor.description]
+        frame = pd.DataFrame.from_records(cursor.fetchall(), columns=names)
+    frame['date'] = pd.to_datetime(frame['date'], format='ISO8601').astype('datetime64[s]')
+    for name in DIMENSIONS:
+        frame[name] = frame[name].astype('category')
+    for name in MEASURES:
+        frame[name] = pd.to_numeric(frame[name], errors='coerce').astype('float64')
+    return frame
+
+
+def _week_scopes(frame):
+    """{report date: week scope} for the dates present in a snapshot frame."""
+    return {date: week_scope(date) for date in frame['date'].unique()}
+
+
+def _week_bounds(scope):
+    """(Monday, Sunday) of a 'week:<friday>' scope."""
+    friday = datetime.date.fromisoformat(scope.split(':', 1)[1])
+    return friday - datetime.timedelta(days=4), friday + datetime.timedelta(days=2)
+
+
+class FrameEngine(AggregationEngine):
+    """Columnar snapshot of RevenueEntry kept in process memory.
+
+    The revenue generation is checked on every read (one query). When an import
+    has bumped it, only the weeks whose generation changed are reloaded; the
+    rest of the snapshot is kept.
+    """
+
+    name = 'frame'
+
+    _snapshot = None  # Snapshot, shared by every instance in the process
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.orm = OrmEngine()
+
+    def frame(self):
+        generation = get_generation(REVENUE_SCOPE)
+        snapshot = FrameEngine._snapshot
+        if snapshot is None or snapshot.generation != generation:
+            with FrameEngine._lock:
+                snapshot = FrameEngine._snapshot
+                if snapshot is None or snapshot.generation != generation:
+                    FrameEngine._snapshot = snapshot = self._refresh(snapshot)
+        return snapshot.frame
+
+    @staticmethod
+    def _refresh(snapshot):
+        """The next snapshot: the stale weeks of `snapshot` reloaded, or everything on first load."""
+        # Generations are read before the rows, so a concurrent import only
+        # makes the next read refresh again
+        weeks = {week_scope(d) for d in get_report_dates()}
+        if snapshot is not None:
+            weeks |= set(snapshot.weeks)
+        generations = get_generations([REVENUE_SCOPE, *weeks])
+        generation = generations.pop(REVENUE_SCOPE)
+        stale = [scope for scope, value in generations.items() if snapshot is None or snapshot.weeks.get(scope) != value]
+        if snapshot is None or not stale or len(stale) == len(generations):
+            # First load, a full purge, or a revenue bump without week scopes
+            frame = load_snapshot()
+            # Weeks with rows but no registry entry are reloaded on the next bump
+            for scope in set(_week_scopes(frame).values()) - set(generations):
+                generations[scope] = None
+            logger.info(f"Loaded columnar snapshot: {len(frame)} rows (generation {generation})")
+            return Snapshot(generation, generations, frame)
+
+        kept = snapshot.frame
+        stale_dates = [date for date, scope in _week_scopes(kept).items() if scope in stale]
+        kept = kept[~kept['date'].isin(stale_dates)]
+        fresh = load_snapshot(stale)
+        frame = pd.concat([kept, fresh], ignore_index=True).sort_values('date', kind='stable', ignore_index=True)
+        for name in DIMENSIONS:
+            frame[name] = frame[name].astype(object).astype('category')
+        logger.info(
+            f"Refreshed columnar snapshot: {len(fresh)} rows reloaded for {len(stale)} week(s), "
+            f"{len(frame)} rows (generation {generation})"
+        )
+        return Snapshot(generation, generations, frame)
+
+    @classmethod
+    def reset(cls):
+        cls._snapshot = None
+
+    # Selection -> row mask
+
+    def _mask(self, frame, selection):
+        if isinstance(selection, QuerySet):
+            raise UnsupportedSelection('QuerySet')
+        mask = np.ones(len(frame), dtype=bool)
+        if selection.empty:
+            return ~mask
+        dates = frame['date'].to_numpy()
+        for lookup, value in selection.lookups.items():
+            if lookup == 'date__range':
+                start, end = (np.datetime64(pd.Timestamp(v), 's') for v in value)
+                mask &= (dates >= start) & (dates <= end)
+            elif lookup == 'date__gte':
+                mask &= dates >= np.datetime64(pd.Timestamp(value), 's')
+            elif lookup == 'date__lte':
+                mask &= dates <= np.datetime64(pd.Timestamp(value), 's')
+            elif lookup == 'date':
+                mask &= dates == np.datetime64(pd.Timestamp(value), 's')
+            elif lookup in DIMENSIONS:
+                column = frame[lookup]
+                if value is None:
+                    mask &= column.isna().to_numpy()
+                elif value in column.cat.categories:
+                    mask &= column.cat.codes.to_numpy() == column.cat.categories.get_loc(value)
+                else:
+                    mask[:] = False
+            else:
+                raise UnsupportedSelection(lookup)
+        return mask
+
+    def _rows(self, selection, columns):
+        frame = self.frame()
+        mask = self._mask(frame, selection)
+        return frame.loc[mask, list(dict.fromkeys(columns))]
+
+    @staticmethod
+    def _sum(series):
+        # SQL semantics: SUM over no non-NULL values is NULL
+        return None if series.notna().sum() == 0 else float(series.sum())
+
+    # Engine interface
+
+    def totals(self, selection, measures, distinct=()):
+        try:
+            rows = self._rows(selection, list(measures) + list(distinct))
+        except UnsupportedSelection:
+            return self.orm.totals(selection, measures, distinct)
+        result = {m: self._sum(rows[m]) for m in measures}
+        for field in distinct:
+            # values(field).distinct() counts NULL as a value too
+            column = rows[field]
+            result[f'{field}__distinct'] = int(column.nunique()) + (1 if column.isna().any() else 0)
+        return result
+
+    def grouped(self, selection, group_by, measures, order_by=None, exclude_blank=False):
+        if group_by not in DIMENSIONS or any(f not in MEASURES for f in measures.values()):
+            return self.orm.grouped(selection, group_by, measures, order_by, exclude_blank)
+        try:
+            rows = self._rows(selection, [LABELED.get(group_by, group_by), group_by] + list(measures.values()))
+        except UnsupportedSelection:
+            return self.orm.grouped(selection, group_by, measures, order_by, exclude_blank)
+        if exclude_blank:
+            rows = rows[rows[group_by].notna() & (rows[group_by].astype(object) != '')]
+        if rows.empty:
+            return []
+        fields = list(dict.fromkeys(measures.values()))
+        keys = [LABELED[group_by], group_by] if group_by in LABELED else [group_by]
+        sums = rows.groupby(keys, observed=True, dropna=False, sort=False)[fields].sum(min_count=1)
+        grouped = pd.DataFrame({group_by: sums.index.get_level_values(group_by).to_numpy()})
+        for alias, field in measures.items():
+            grouped[alias] = sums[field].to_numpy()
+        if order_by:
+            alias = order_by.lstrip('-')
+            descending = order_by.startswith('-')
+            grouped = grouped.sort_values(
+                alias, ascending=not descending, na_position='last' if descending else 'first', kind='stable'
+            )
+        labels = grouped[group_by].astype(object).where(grouped[group_by].notna(), None).tolist()
+        result = []
+        values = {alias: grouped[alias].tolist() for alias in measures}
+        for i, label in enumerate(labels):
+            row = {group_by: _python(label)}
+            for alias in measures:
+                value = values[alias][i]
+                row[alias] = None if pd.isna(value) else float(value)
+            result.append(row)
+        return result
+
+    def ranked(self, selection, group_by, field, after=None, limit=None):
+        grouped = self.grouped(selection, group_by, {'total': field})
+        if not grouped:
+            return []
+        frame = pd.DataFrame({
+            'label': pd.Series([row[group_by] for row in grouped], dtype=object),
+            'total': pd.Series([row['total'] for row in grouped], dtype='float64').fillna(0.0),
+        })
+        frame['rank_label'] = frame['label'].fillna('').astype(str)
+        if after is not None:
+            total, label = after
+            frame = frame[(frame['total'] < total) | ((frame['total'] == total) & (frame['rank_label'] > label))]
+        frame = frame.sort_values(['total', 'rank_label'], ascending=[False, True], kind='stable')
+        if limit is not None:
+            frame = frame.head(limit)
+        return [{group_by: label, 'total': float(total)} for label, total in zip(frame['label'], frame['total'])]
+
+    def grouped_frame(self, selection, group_bys, measures):
+        keys = _frame_keys(group_bys)
+        if any(k not in DIMENSIONS for k in keys) or any(f not in MEASURES for f in measures.values()):
+            return self.orm.grouped_frame(selection, group_bys, measures)
+        fields = list(dict.fromkeys(measures.values()))
+        try:
+            rows = self._rows(selection, keys + fields)
+        except UnsupportedSelection:
+            return self.orm.grouped_frame(selection, group_bys, measures)
+        sums = rows.groupby(keys, observed=True, dropna=False, sort=False)[fields].sum(min_count=1)
+        frame = pd.DataFrame({key: pd.Series(
+            [None if pd.isna(v) else int(v) if key in FOREIGN_KEYS else _python(v) for v in sums.index.get_level_values(key)],
+            dtype=object,
+        ) for key in keys})
+        for alias, field in measures.items():
+            frame[alias] = sums[field].to_numpy()
+        return frame
+
+    def daily_trend(self, selection):
+        try:
+            rows = self._rows(selection, ['engagement_id', 'date', 'revenue'])
+        except UnsupportedSelection:
+            return self.orm.daily_trend(selection)
+        if rows.empty:
+            return [], []
+        engagement = rows['engagement_id'].astype(object).fillna('\0')
+        ordered = pd.DataFrame({
+            'engagement': engagement.to_numpy(),
+            'date': rows['date'].to_numpy(),
+            'revenue': rows['revenue'].fillna(0.0).to_numpy(),
+        }).sort_values(['engagement', 'date'], kind='stable')
+        same = ordered['engagement'].eq(ordered['engagement'].shift())
+        daily = ordered['revenue'] - ordered['revenue'].shift().where(same, 0.0).fillna(0.0)
+        totals = daily.groupby(ordered['date']).sum().sort_index()
+        return [d.strftime('%Y-%m-%d') for d in totals.index], [float(x) for x in totals.to_numpy()]
+
+
+class DuckDBEngine(FrameEngine):
+    """The columnar snapshot queried through DuckDB (requires the duckdb package)."""
+
+    name = 'duckdb'
+
+    def __init__(self):
+        if duckdb is None:
+            raise ImportError('duckdb is not installed')
+        super().__init__()
+        self._local = threading.local()
+
+    def _connection(self):
+        # One DuckDB connection per thread, re-registered when the snapshot changes
+        frame = self.frame()
+        state = getattr(self._local, 'state', None)
+        if state is None or state[0] is not frame:
+            con = duckdb.connect()
+            con.register('entries', frame)
+            self._local.state = state = (frame, con)
+        return state[1]
+
+    @staticmethod
+    def _where(selection):
+        if isinstance(selection, QuerySet):
+            raise UnsupportedSelection('QuerySet')
+        if selection.empty:
+            return 'WHERE FALSE', []
+        clauses, params = [], []
+        for lookup, value in selection.lookups.items():
+            if lookup == 'date__range':
+                clauses.append('"date" BETWEEN ? AND ?')
+                params += [pd.Timestamp(v).to_pydatetime() for v in value]
+            elif lookup in ('date__gte', 'date__lte'):
+                clauses.append(f'"date" {">=" if lookup.endswith("gte") else "<="} ?')
+                params.append(pd.Timestamp(value).to_pydatetime())
+            elif lookup == 'date':
+                clauses.append('"date" = ?')
+                params.append(pd.Timestamp(value).to_pydatetime())
+            elif lookup in DIMENSIONS and value is not None:
+                clauses.append(f'CAST("{lookup}" AS VARCHAR) = ?')
+                params.append(str(value))
+            else:
+                raise UnsupportedSelection(lookup)
+        return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def totals(self, selection, measures, distinct=()):
+        try:
+            where, params = self._where(selection)
+        except UnsupportedSelection:
+            return self.orm.totals(selection, measures, distinct)
+        parts = [f'SUM("{m}")' for m in measures]
+        # COUNT(DISTINCT) skips NULL; values(field).distinct() counts it
+        parts += [f'COUNT(DISTINCT "{f}") + MAX(CASE WHEN "{f}" IS NULL THEN 1 ELSE 0 END)' for f in distinct]
+        row = self._connection().execute(f'SELECT {", ".join(parts)} FROM entries {where}', params).fetchone()
+        result = {m: (None if row[i] is None else float(row[i])) for i, m in enumerate(measures)}
+        for j, field in enumerate(distinct):
+            result[f'{field}__distinct'] = int(row[len(measures) + j] or 0)
+        return result
+
+    def grouped(self, selection, group_by, measures, order_by=None, exclude_blank=False):
+        if group_by not in DIMENSIONS or any(f not in MEASURES for f in measures.values()):
+            return self.orm.grouped(selection, group_by, measures, order_by, exclude_blank)
+        try:
+            where, params = self._where(selection)
+        except UnsupportedSelection:
+            return self.orm.grouped(selection, group_by, measures, order_by, exclude_blank)
+        if exclude_blank:
+            blank = f'"{group_by}" IS NOT NULL AND CAST("{group_by}" AS VARCHAR) <> \'\''
+            where = f'{where} AND {blank}' if where else f'WHERE {blank}'
+        sums = ', '.join(f'SUM("{field}") AS "{alias}"' for alias, field in measures.items())
+        order = ''
+        if order_by:
+            alias = order_by.lstrip('-')
+            order = f'ORDER BY "{alias}" ' + ('DESC NULLS LAST' if order_by.startswith('-') else 'ASC NULLS FIRST')
+        keys = f'"{LABELED[group_by]}", ' if group_by in LABELED else ''
+        sql = (
+            f'SELECT CAST("{group_by}" AS VARCHAR) AS "{group_by}", {sums} '
+            f'FROM entries {where} GROUP BY {keys}"{group_by}" {order}'
+        )
+        rows = self._connection().execute(sql, params).fetchall()
+        numeric = group_by in FOREIGN_KEYS
+        return [
+            {group_by: (int(row[0]) if numeric and row[0] is not None else row[0]),
+             **{alias: (None if v is None else float(v)) for alias, v in zip(measures, row[1:])}}
+            for row in rows
+        ]
+
+    def daily_trend(self, selection):
+        try:
+            where, params = self._where(selection)
+        except UnsupportedSelection:
+            return self.orm.daily_trend(selection)
+        sql = f'''
+            SELECT strftime(day, '%Y-%m-%d'), SUM(delta) FROM (
+                SELECT "date" AS day,
+                       COALESCE(revenue, 0) - COALESCE(LAG(COALESCE(revenue, 0)) OVER (
+                           PARTITION BY COALESCE(CAST(engagement_id AS VARCHAR), chr(0)) ORDER BY "date"), 0) AS delta
+                FROM entries {where}
+            ) GROUP BY 1 ORDER BY 1
+        '''
+        rows = self._connection().execute(sql, params).fetchall()
+        return [r[0] for r in rows], [float(r[1]) for r in rows]
+
+
+class Snapshot:
+    """A loaded frame with the generations it reflects: revenue, and {week scope: generation}."""
+
+    def __init__(self, generation, weeks, frame):
+        self.generation = generation
+        self.weeks = weeks
+        self.frame = frame
+
+
+def _frame_keys(group_bys):
+    """Group-by columns of grouped_frame: each LABELED dimension is preceded by its integer key."""
+    keys = []
+    for group_by in group_bys:
+        keys += [LABELED[group_by], group_by] if group_by in LABELED else [group_by]
+    return list(dict.fromkeys(keys))
+
+
+def _python(value):
+    """numpy scalars to plain Python, so results pickle and JSON-encode like ORM rows."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+ENGINES = {'orm': OrmEngine, 'frame': FrameEngine, 'duckdb': DuckDBEngine}
+_engines = {}
+
+
+def get_engine(name=None):
+    """The configured engine (`DASHBOARD_OLAP_ENGINE`); duckdb falls back to frame when missing."""
+    name = name or getattr(settings, 'DASHBOARD_OLAP_ENGINE', 'orm')
+    if name == 'duckdb' and duckdb is None:
+        logger.warning("DASHBOARD_OLAP_ENGINE='duckdb' but duckdb is not installed; using 'frame'")
+        name = 'frame'
+    if name not in ENGINES:
+        raise ValueError(f"Unknown aggregation engine: {name}")
+    engine = _engines.get(name)
+    if engine is None:
+        engine = _engines[name] = ENGINES[name]()
+    return engine
+
+
+def engine_for(selection):
+    """The configured engine, or the ORM for plain QuerySets."""
+    return OrmEngine() if isinstance(selection, QuerySet) else get_engine()
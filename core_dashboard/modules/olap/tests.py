@@ -0,0 +1,232 @@
+import os
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client as TestClient, TestCase, override_settings
+
+from core_dashboard.models import Area, Client, RevenueEntry
+from core_dashboard.modules.data_cache import bump_weeks, week_scope
+from core_dashboard.modules.synthetic_data import SyntheticDataset
+
+from .services import DuckDBEngine, FrameEngine, OrmEngine, Selection, duckdb, get_engine, load_snapshot
+
+MEASURES = ('revenue', 'fytd_ansr_sintetico', 'fytd_charged_hours', 'fytd_diferencial_final')
+GROUP_BY = (
+    'engagement_partner', 'engagement_manager', 'partner__name', 'manager__name',
+    'client__name', 'area__name', 'sub_area__name', 'contract__name',
+)
+
+
+def round_floats(value):
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, dict):
+        return {k: round_floats(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [round_floats(v) for v in value]
+    return value
+
+
+def by_label(rows, group_by):
+    return {row[group_by]: row for row in rows}
+
+
+class EngineParityTests(TestCase):
+    """Every snapshot engine must answer exactly like the ORM."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = SyntheticDataset(partners=4, managers=7, clients=9, engagements=40, weeks=6, seed=5)
+        cls.dataset.write_database()
+        cls.start, cls.end = cls.dataset.report_dates[1], cls.dataset.report_dates[-1]
+        # A row with blank labels and NULL measures, like an incomplete upload
+        RevenueEntry.objects.create(
+            date=cls.end, client=Client.objects.first(), area=Area.objects.first(),
+            engagement_partner='', engagement_manager=None, revenue=None,
+        )
+
+    def setUp(self):
+        cache.clear()
+        FrameEngine.reset()
+        self.orm = OrmEngine()
+        self.engines = [FrameEngine()]
+        if duckdb is not None:
+            self.engines.append(DuckDBEngine())
+
+    def selections(self):
+        week = Selection({'date__range': (self.start, self.end)})
+        return [
+            Selection(),
+            week,
+            week.narrow(area__name='Assurance'),
+            week.narrow(area__name='Assurance', sub_area__name=None),
+            Selection({'date': self.end, 'engagement_partner': 'Partner 1'}),
+            Selection({'date': self.end, 'partner__key': 'partner 01', 'manager__key': 'manager 02'}),
+            Selection({'date__gte': self.end, 'client__name': 'No such client'}),
+            Selection.none(),
+        ]
+
+    def assertRowsAlmostEqual(self, expected, actual, msg=None):
+        self.assertEqual(expected.keys(), actual.keys(), msg)
+        for key, value in expected.items():
+            if isinstance(value, (float, Decimal)):
+                # DecimalField sums come back as Decimal from the ORM, float from a snapshot
+                self.assertAlmostEqual(float(value), actual[key], places=4, msg=f'{msg}: {key}')
+            else:
+                self.assertEqual(value, actual[key], f'{msg}: {key}')
+
+    def test_totals(self):
+        for selection in self.selections():
+            expected = self.orm.totals(selection, MEASURES, distinct=('client', 'engagement_manager'))
+            for engine in self.engines:
+                self.assertRowsAlmostEqual(
+                    expected, engine.totals(selection, MEASURES, distinct=('client', 'engagement_manager')),
+                    f'{engine.name} {selection}',
+                )
+
+    def test_grouped(self):
+        measures = {'total_revenue': 'fytd_ansr_sintetico', 'hours': 'fytd_charged_hours'}
+        for selection in self.selections():
+            for group_by in GROUP_BY:
+                for exclude_blank in (False, True):
+                    expected = self.orm.grouped(selection, group_by, measures, exclude_blank=exclude_blank)
+                    for engine in self.engines:
+                        actual = engine.grouped(selection, group_by, measures, exclude_blank=exclude_blank)
+                        label = f'{engine.name} {selection} by {group_by}'
+                        self.assertEqual(len(expected), len(actual), label)
+                        actual = by_label(actual, group_by)
+                        for key, row in by_label(expected, group_by).items():
+                            self.assertRowsAlmostEqual(row, actual[key], label)
+
+    def test_grouped_order(self):
+        selection = Selection({'date': self.end})
+        for order_by in ('-total_revenue', 'total_revenue'):
+            expected = self.orm.grouped(selection, 'engagement_partner', {'total_revenue': 'revenue'}, order_by=order_by)
+            for engine in self.engines:
+                actual = engine.grouped(selection, 'engagement_partner', {'total_revenue': 'revenue'}, order_by=order_by)
+                self.assertEqual(
+                    [r['engagement_partner'] for r in expected], [r['engagement_partner'] for r in actual],
+                    f'{engine.name} {order_by}',
+                )
+
+    def test_grouped_frame(self):
+        group_bys = ['partner__name', 'manager__name', 'area__name', 'sub_area__name']
+        measures = {'total_revenue': 'fytd_ansr_sintetico', 'hours': 'fytd_charged_hours'}
+        keys = ['partner', 'partner__name', 'manager', 'manager__name', 'area__name', 'sub_area__name']
+        for selection in self.selections():
+            expected = self.orm.grouped_frame(selection, group_bys, measures)
+            self.assertEqual(list(expected.columns), keys + list(measures))
+            for engine in self.engines:
+                actual = engine.grouped_frame(selection, group_bys, measures)
+                self.assertEqual(list(actual.columns), list(expected.columns))
+                self.assertEqual(len(actual), len(expected), f'{engine.name} {selection}')
+                for field in group_bys:
+                    key = 'partner' if field == 'partner__name' else 'manager' if field == 'manager__name' else field
+                    totals = [
+                        {str(k): v for k, v in frame.groupby(key, dropna=False)['total_revenue'].sum().items()}
+                        for frame in (expected, actual)
+                    ]
+                    self.assertEqual(
+                        round_floats(totals[0]), round_floats(totals[1]),
+                        f'{engine.name} {selection} by {field}',
+                    )
+
+    def test_daily_trend(self):
+        for selection in self.selections():
+            labels, data = self.orm.daily_trend(selection)
+            for engine in self.engines:
+                actual_labels, actual_data = engine.daily_trend(selection)
+                self.assertEqual(labels, actual_labels, engine.name)
+                for expected, actual in zip(data, actual_data):
+                    self.assertAlmostEqual(expected, actual, places=4)
+
+    def test_querysets_and_unknown_lookups_use_the_orm(self):
+        engine = FrameEngine()
+        queryset = RevenueEntry.objects.filter(date=self.end)
+        self.assertEqual(
+            engine.totals(queryset, ['revenue']), self.orm.totals(queryset, ['revenue']),
+        )
+        selection = Selection({'engagement_partner__startswith': 'Partner'})
+        expected = self.orm.grouped(selection, 'engagement_partner', {'n': 'revenue'})
+        self.assertEqual(len(engine.grouped(selection, 'engagement_partner', {'n': 'revenue'})), len(expected))
+
+    def test_snapshot_follows_the_revenue_generation(self):
+        engine = FrameEngine()
+        before = engine.totals(Selection({'date': self.end}), ['revenue'])['revenue']
+        with self.assertNumQueries(1):  # generation check only
+            engine.totals(Selection({'date': self.end}), ['revenue'])
+
+        RevenueEntry.objects.filter(date=self.end).update(revenue=0)
+        # Still the old snapshot until an import bumps the generation
+        self.assertEqual(engine.totals(Selection({'date': self.end}), ['revenue'])['revenue'], before)
+        bump_weeks([self.end])
+        self.assertEqual(engine.totals(Selection({'date': self.end}), ['revenue'])['revenue'], 0)
+
+    def test_import_reloads_only_its_week(self):
+        for engine in self.engines:
+            engine.frame()
+        RevenueEntry.objects.filter(date=self.end).update(revenue=1)
+        RevenueEntry.objects.filter(date=self.start).update(revenue=2)
+        at_end = Selection({'date': self.end})
+        with mock.patch('core_dashboard.modules.olap.services.load_snapshot', wraps=load_snapshot) as load:
+            bump_weeks([self.end])
+            for engine in self.engines:
+                self.assertEqual(engine.totals(at_end, ['revenue']), self.orm.totals(at_end, ['revenue']))
+        load.assert_called_once_with([week_scope(self.end)])
+        # Other weeks are kept as loaded until their own generation changes
+        at_start = Selection({'date': self.start})
+        self.assertNotEqual(FrameEngine().totals(at_start, ['revenue']), self.orm.totals(at_start, ['revenue']))
+
+        bump_weeks([self.start])
+        measures = {'total_revenue': 'revenue', 'hours': 'fytd_charged_hours'}
+        for engine in self.engines:
+            for selection in self.selections():
+                label = f'{engine.name} {selection}'
+                self.assertRowsAlmostEqual(self.orm.totals(selection, MEASURES), engine.totals(selection, MEASURES), label)
+                for group_by in GROUP_BY:
+                    expected = self.orm.grouped(selection, group_by, measures)
+                    actual = by_label(engine.grouped(selection, group_by, measures), group_by)
+                    self.assertEqual(len(expected), len(actual), f'{label} by {group_by}')
+                    for key, row in by_label(expected, group_by).items():
+                        self.assertRowsAlmostEqual(row, actual[key], f'{label} by {group_by}')
+
+    def test_get_engine(self):
+        self.assertIsInstance(get_engine('orm'), OrmEngine)
+        self.assertIsInstance(get_engine('frame'), FrameEngine)
+        with self.assertRaises(ValueError):
+            get_engine('spark')
+
+    @unittest.skipUnless(os.environ.get('REQUIRE_DUCKDB'), 'duckdb is optional')
+    def test_duckdb_is_installed(self):
+        # CI sets REQUIRE_DUCKDB so the DuckDB parity checks cannot silently drop out
+        self.assertIsNotNone(duckdb, 'pip install -r requirements-optional.txt')
+
+    @unittest.skipIf(duckdb is not None, 'duckdb is installed')
+    def test_missing_duckdb_falls_back_to_frame(self):
+        with self.assertLogs('core_dashboard.modules.olap.services', 'WARNING'):
+            self.assertEqual(get_engine('duckdb').name, 'frame')
+
+
+class DashboardOnSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        SyntheticDataset(partners=3, managers=5, engagements=30, weeks=4, seed=9).write_database()
+
+    def setUp(self):
+        cache.clear()
+        FrameEngine.reset()
+
+    def render(self):
+        cache.clear()
+        response = TestClient().get('/', {'inline': '1'})
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_dashboard_matches_the_orm(self):
+        expected = self.render()
+        with override_settings(DASHBOARD_OLAP_ENGINE='frame'):
+            actual = self.render()
+        for key in ('top_partners', 'all_partners_ranked', 'all_fytd_charged_hours_by_partner', 'top_managers', 'top_clients_rank'):
+            self.assertEqual(round_floats(expected[key]), round_floats(actual[key]), key)
@@ -0,0 +1,14 @@
+"""
+People Module
+=============
+
+Partner and Manager dimension tables. Every spelling of a name found in the
+uploads is matched on a normalized key (trimmed, casefolded, accents
+stripped), so RevenueEntry rows carry small integer keys (`partner`,
+`manager`) that rankings group on and filters look up by index, instead of
+the free-text `engagement_partner` / `engagement_manager` columns.
+"""
+
+from .services import find_person, match_person, people_with_entries, resolve_people
+
+__all__ = ['find_person', 'match_person', 'people_with_entries', 'resolve_people']
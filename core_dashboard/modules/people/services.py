@@ -0,0 +1,107 @@
+import logging
+
+import pandas as pd
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from core_dashboard.models import Manager, Partner, RevenueEntry
+from core_dashboard.utils import normalize_key
+
+logger = logging.getLogger(__name__)
+
+
+def _directory(model):
+    """{match key: person} over every person's key and the keys of its aliases (the tables are small)."""
+    directory = {}
+    people = list(model.objects.all())
+    for person in people:
+        for alias in person.aliases:
+            directory.setdefault(normalize_key(alias), person)
+    # A person's own key wins over someone else's alias
+    directory.update((person.key, person) for person in people)
+    return directory
+
+
+def _display(name):
+    return ' '.join(str(name).split())
+
+
+def _resolve(model, names, batch_size):
+    """{raw name: person} for every non-blank name, creating missing people and recording new spellings."""
+    spellings = {}  # key -> raw spellings in order of appearance
+    for name in names:
+        if isinstance(name, str) or not pd.isna(name):
+            key = normalize_key(name)
+            if key:
+                spellings.setdefault(key, {})[name] = None
+    if not spellings:
+        return {}
+
+    directory = _directory(model)
+    missing = [key for key in spellings if key not in directory]
+    if missing:
+        # The first spelling seen becomes the display name
+        model.objects.bulk_create(
+            [model(key=key, name=_display(next(iter(spellings[key])))) for key in missing], batch_size=batch_size,
+        )
+        directory.update((p.key, p) for p in model.objects.filter(key__in=missing))
+
+    changed = {}
+    for key, names in spellings.items():
+        person = directory[key]
+        new = [d for d in dict.fromkeys(_display(n) for n in names) if d != person.name and d not in person.aliases]
+        if new:
+            person.aliases = person.aliases + new
+            changed[person.pk] = person
+    if changed:
+        model.objects.bulk_update(list(changed.values()), ['aliases'], batch_size=batch_size)
+    return {name: directory[key] for key, names in spellings.items() for name in names}
+
+
+def resolve_people(partner_names=(), manager_names=(), batch_size=2000):
+    """Find or bulk-create the Partner and Manager rows a batch of entries points to.
+
+    Returns {'partners': {raw name: Partner}, 'managers': {raw name: Manager}};
+    blank names are left out (their entries keep a NULL key).
+    """
+    with transaction.atomic():
+        return {
+            'partners': _resolve(Partner, partner_names, batch_size),
+            'managers': _resolve(Manager, manager_names, batch_size),
+        }
+
+
+def people_with_entries(model):
+    """Display names of the partners or managers that have at least one RevenueEntry."""
+    field = 'partner' if model is Partner else 'manager'
+    has_entries = Exists(RevenueEntry.objects.filter(**{field: OuterRef('pk')}))
+    return list(model.objects.filter(has_entries).order_by('name').values_list('name', flat=True))
+
+
+def find_person(model, name):
+    """The partner or manager called `name` (key or alias spelling), or None."""
+    key = normalize_key(name)
+    if not key:
+        return None
+    return model.objects.filter(key=key).first() or _directory(model).get(key)
+
+
+def match_person(names, name, model=Manager):
+    """Boolean mask of the `names` Series entries that are the person called `name`.
+
+    Matches on the normalized key, then on the keys of the person's recorded
+    aliases; when nothing matches, falls back to keys containing the name's
+    key (the Excel lists sometimes add a suffix to the name).
+    """
+    key = normalize_key(name)
+    if not key:
+        return pd.Series(False, index=names.index)
+    keys = names.map(normalize_key)
+    mask = keys == key
+    if not mask.any():
+        person = find_person(model, name)
+        if person is not None:
+            mask = keys.isin({person.key, *(normalize_key(alias) for alias in person.aliases)})
+    if not mask.any():
+        mask = keys.str.contains(key, regex=False)
+    return mask
@@ -0,0 +1,135 @@
+import datetime
+import importlib
+
+import pandas as pd
+from django.apps import apps
+from django.core.cache import cache
+from django.test import TestCase
+
+from core_dashboard.models import Area, Client, Manager, Partner, RevenueEntry
+from core_dashboard.modules.dashboard_cards.services import DashboardFilters, build_partner, build_rankings
+from core_dashboard.utils import normalize_key
+
+from .services import find_person, match_person, people_with_entries, resolve_people
+
+WEEK = datetime.date(2025, 8, 15)
+
+
+class NormalizeKeyTests(TestCase):
+    def test_spellings_share_a_key(self):
+        self.assertEqual(normalize_key('  José   Pérez '), 'jose perez')
+        self.assertEqual(normalize_key('JOSE PEREZ'), 'jose perez')
+        self.assertEqual(normalize_key(None), '')
+        self.assertEqual(normalize_key(float('nan')), '')
+
+
+class ResolvePeopleTests(TestCase):
+    def test_resolve_merges_spellings_and_records_aliases(self):
+        people = resolve_people(['María Gómez', 'MARIA GOMEZ ', None, ''], ['Manager A'])
+        self.assertIs(people['partners']['María Gómez'], people['partners']['MARIA GOMEZ '])
+        self.assertEqual(Partner.objects.count(), 1)
+        self.assertEqual(Manager.objects.count(), 1)
+
+        partner = Partner.objects.get()
+        self.assertEqual(partner.key, 'maria gomez')
+        self.assertEqual(len(partner.aliases), 1)
+
+        # Known spellings need no writes; a new one is added to the aliases
+        with self.assertNumQueries(4):  # savepoint, two directory loads, release
+            resolve_people(['María Gómez', 'MARIA GOMEZ '], ['Manager A'])
+        resolve_people(['maria gómez'])
+        self.assertEqual(len(Partner.objects.get().aliases), 2)
+
+    def test_aliases_with_another_key_resolve_to_the_person(self):
+        Partner.objects.create(name='Gómez, María', key='gomez, maria', aliases=['María Gómez'])
+        people = resolve_people(['Maria Gomez'])
+        self.assertEqual(people['partners']['Maria Gomez'].name, 'Gómez, María')
+        self.assertEqual(Partner.objects.count(), 1)
+        self.assertEqual(find_person(Partner, 'MARIA GÓMEZ').name, 'Gómez, María')
+        self.assertIsNone(find_person(Partner, 'Someone Else'))
+
+    def test_single_saves_resolve_the_keys(self):
+        area = Area.objects.create(name='Assurance')
+        client = Client.objects.create(name='Client A')
+        entry = RevenueEntry.objects.create(
+            date=WEEK, client=client, area=area, engagement_partner='Partner Á', engagement_manager='',
+        )
+        self.assertEqual(entry.partner.key, 'partner a')
+        self.assertIsNone(entry.manager)
+        self.assertEqual(people_with_entries(Partner), ['Partner Á'])
+        self.assertEqual(people_with_entries(Manager), [])
+
+        # Editing a source field re-resolves what is derived from it; other edits keep it
+        entry = RevenueEntry.objects.get(pk=entry.pk)
+        entry.engagement_partner = 'Partner B'
+        entry.engagement_service_line = 'Tax'
+        entry.save()
+        entry = RevenueEntry.objects.get(pk=entry.pk)
+        self.assertEqual((entry.partner.key, entry.service_line_key), ('partner b', 'tax'))
+        entry.revenue = 10
+        with self.assertNumQueries(1):
+            entry.save()
+        self.assertEqual(RevenueEntry.objects.get(pk=entry.pk).partner.key, 'partner b')
+
+    def test_match_person(self):
+        Manager.objects.create(name='Pérez, Ana', key='perez, ana', aliases=['Ana Perez'])
+        employees = pd.Series(['PEREZ, ANA', 'Ana Perez (VE)', 'Luis Diaz', None])
+        self.assertEqual(match_person(employees, 'Pérez, Ana').tolist(), [True, False, False, False])
+        self.assertEqual(match_person(employees, 'Ana Pérez').tolist(), [True, False, False, False])
+        self.assertEqual(match_person(employees, 'Luis').tolist(), [False, False, True, False])
+        self.assertFalse(match_person(employees, '').any())
+
+
+class BackfillTests(TestCase):
+    def test_backfill_groups_existing_spellings(self):
+        area = Area.objects.create(name='Assurance')
+        client = Client.objects.create(name='Client A')
+        for partner in ('Partner A', 'PARTNER  A', 'Partner B', ''):
+            RevenueEntry.objects.create(date=WEEK, client=client, area=area, engagement_partner=partner)
+        RevenueEntry.objects.update(partner=None, manager=None)
+        Partner.objects.all().delete()
+
+        migration = importlib.import_module('core_dashboard.migrations.0009_partner_manager')
+        migration.backfill_people(apps, None)
+
+        self.assertEqual(sorted(Partner.objects.values_list('key', flat=True)), ['partner a', 'partner b'])
+        self.assertEqual(Partner.objects.get(key='partner a').entries.count(), 2)
+        self.assertEqual(RevenueEntry.objects.filter(partner__isnull=True).count(), 1)
+
+
+class PersonKeyedCardsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        area = Area.objects.create(name='Assurance')
+        client = Client.objects.create(name='Client A')
+        rows = (('Partner A', 'Manager A', 100.0), ('PARTNER A ', 'Manager B', 50.0), ('Partner B', 'Manager A', 30.0))
+        people = resolve_people([r[0] for r in rows], [r[1] for r in rows])
+        for partner, manager, ansr in rows:
+            RevenueEntry.objects.create(
+                date=WEEK, client=client, area=area, engagement_partner=partner, engagement_manager=manager,
+                partner=people['partners'][partner], manager=people['managers'][manager],
+                fytd_ansr_sintetico=ansr, fytd_charged_hours=10.0, mtd_charged_hours=2.0,
+            )
+
+    def filters(self, **params):
+        return DashboardFilters({'week': WEEK.isoformat(), **params})
+
+    def test_rankings_group_spellings_on_the_key(self):
+        rankings = build_rankings(self.filters())
+        self.assertEqual(
+            [(p['engagement_partner'], p['total_revenue']) for p in rankings['all_partners_ranked']],
+            [('Partner A', '$150.00'), ('Partner B', '$30.00')],
+        )
+        self.assertEqual(
+            rankings['all_fytd_charged_hours_by_partner'],
+            [{'engagement_partner': 'Partner A', 'total_fytd_charged_hours': 20.0},
+             {'engagement_partner': 'Partner B', 'total_fytd_charged_hours': 10.0}],
+        )
+
+    def test_partner_filter_matches_any_spelling(self):
+        data = build_partner(self.filters(partner='partner a'))
+        self.assertEqual([m['label'] for m in data['all_managers_ranked']], ['Manager A', 'Manager B'])
+        self.assertEqual(
+            [(m['engagement_manager'], m['total_fytd_charged_hours']) for m in data['fytd_charged_hours_by_manager']],
+            [('Manager A', 10.0), ('Manager B', 10.0)],
+        )
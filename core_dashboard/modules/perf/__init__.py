@@ -0,0 +1,26 @@
+"""
+Performance Instrumentation Module
+==================================
+
+Request-level timings for the dashboard views:
+
+- `span('name')`: context manager / decorator timing a block and the DB
+  queries it runs; free when instrumentation is off
+- `PerfMiddleware`: per-request query count and time, a `Server-Timing`
+  response header (total, db and one metric per span) and rolling samples
+- `/perf/`: staff-only panel with rolling p50/p95 per view and span
+
+Enable with ``DASHBOARD_PERF = True``; ``DASHBOARD_PERF_WINDOW`` sets how
+many samples per metric are kept (in process memory).
+"""
+
+from .services import RequestRecorder, RollingStats, percentile, perf_enabled, span, stats
+
+__all__ = [
+    'RequestRecorder',
+    'RollingStats',
+    'percentile',
+    'perf_enabled',
+    'span',
+    'stats',
+]
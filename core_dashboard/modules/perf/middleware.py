@@ -0,0 +1,62 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from .services import finish_request, perf_enabled, start_request, stats
+
+logger = logging.getLogger(__name__)
+
+
+class PerfMiddleware:
+    """Records every request when ``DASHBOARD_PERF`` is on.
+
+    Counts DB queries and their time (overall and per span), adds a
+    `Server-Timing` header and feeds the rolling stats shown on /perf/.
+    Works for both the sync views and the async dashboard.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not perf_enabled():
+            return self.get_response(request)
+        recorder, token = start_request()
+        attached = recorder.install()
+        try:
+            response = self.get_response(request)
+        finally:
+            recorder.uninstall(attached)
+            finish_request(token)
+        return self._finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not perf_enabled():
+            return await self.get_response(request)
+        recorder, token = start_request()
+        # Sync views and ORM calls of async views run on the thread-sensitive worker
+        attached = await sync_to_async(recorder.install)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recorder.uninstall)(attached)
+            finish_request(token)
+        return self._finish(request, response, recorder)
+
+    @staticmethod
+    def _finish(request, response, recorder):
+        try:
+            response['Server-Timing'] = recorder.server_timing()
+            match = getattr(request, 'resolver_match', None)
+            stats.record(match.view_name if match else request.path, recorder)
+        except Exception as e:
+            logger.warning(f"Could not record request timings: {e}")
+        return response
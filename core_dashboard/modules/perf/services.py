@@ -0,0 +1,225 @@
+"""
+Request instrumentation: named spans, per-request DB query accounting and
+rolling per-view percentiles for the /perf/ panel.
+"""
+import functools
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Recorder of the request being served; None outside an instrumented request,
+# which is what makes span() free when instrumentation is off.
+_recorder = ContextVar('perf_recorder', default=None)
+# Name of the innermost open span in this context (queries are charged to it)
+_current_span = ContextVar('perf_current_span', default=None)
+
+_TOKEN_RE = re.compile(r'[^A-Za-z0-9_.\-]+')
+
+
+def perf_enabled():
+    return getattr(settings, 'DASHBOARD_PERF', False)
+
+
+class RequestRecorder:
+    """Per-request totals: wall time, DB queries and time, and the same per span.
+
+    Spans may run on worker threads (the async dashboard's card groups), so
+    updates are serialized with a lock.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def _span(self, name):
+        return self.spans.setdefault(name, {'count': 0, 'seconds': 0.0, 'queries': 0, 'query_seconds': 0.0})
+
+    def add_span(self, name, seconds):
+        with self._lock:
+            entry = self._span(name)
+            entry['count'] += 1
+            entry['seconds'] += seconds
+
+    def add_query(self, seconds):
+        name = _current_span.get()
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+            if name is not None:
+                entry = self._span(name)
+                entry['queries'] += 1
+                entry['query_seconds'] += seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper: times every query run under this recorder."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add_query(time.perf_counter() - start)
+
+    def install(self):
+        """Attach to this thread's connections; returns the ones to detach later."""
+        attached = []
+        for conn in connections.all(initialized_only=False):
+            if self not in conn.execute_wrappers:
+                conn.execute_wrappers.append(self)
+                attached.append(conn)
+        return attached
+
+    def uninstall(self, attached):
+        for conn in attached:
+            if self in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self)
+
+    @property
+    def elapsed_seconds(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """`Server-Timing` header value: total, db and one metric per span."""
+        metrics = [
+            f'total;dur={self.elapsed_seconds * 1000:.1f}',
+            f'db;dur={self.query_seconds * 1000:.1f};desc="{self.queries} queries"',
+        ]
+        for name, entry in self.spans.items():
+            metrics.append(
+                f'{_TOKEN_RE.sub("-", name)};dur={entry["seconds"] * 1000:.1f};desc="{entry["queries"]} queries"'
+            )
+        return ', '.join(metrics)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.attached = self.recorder.install()
+        self.token = _current_span.set(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.add_span(self.name, time.perf_counter() - self.start)
+        _current_span.reset(self.token)
+        self.recorder.uninstall(self.attached)
+        return False
+
+
+class span:
+    """Named timing span, usable as a context manager or a decorator::
+
+        with span('macro'):
+            ...
+
+        @span('rankings')
+        def build_rankings(filters): ...
+
+    Outside an instrumented request (``DASHBOARD_PERF`` off, management
+    commands, tests) it is a no-op.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        recorder = _recorder.get()
+        self._active = _Span(recorder, self.name) if recorder is not None else _NOOP
+        return self._active.__enter__()
+
+    def __exit__(self, *exc):
+        return self._active.__exit__(*exc)
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            with _Span(recorder, name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def start_request():
+    """Begin recording the current request; returns (recorder, reset token)."""
+    recorder = RequestRecorder()
+    return recorder, _recorder.set(recorder)
+
+
+def finish_request(token):
+    _recorder.reset(token)
+
+
+class RollingStats:
+    """Last N samples (milliseconds) per (view, metric), kept in process memory."""
+
+    def __init__(self, window=None):
+        self.window = window
+        self._samples = defaultdict(self._new_window)
+        self._lock = threading.Lock()
+
+    def _new_window(self):
+        return deque(maxlen=self.window or getattr(settings, 'DASHBOARD_PERF_WINDOW', 500))
+
+    def record(self, view, recorder):
+        with self._lock:
+            self._samples[(view, 'total')].append(recorder.elapsed_seconds * 1000)
+            self._samples[(view, 'db')].append(recorder.query_seconds * 1000)
+            self._samples[(view, 'queries')].append(recorder.queries)
+            for name, entry in recorder.spans.items():
+                self._samples[(view, name)].append(entry['seconds'] * 1000)
+
+    def summary(self):
+        """[{view, metric, count, p50, p95, max}] sorted by view then metric."""
+        with self._lock:
+            items = [(key, list(samples)) for key, samples in self._samples.items()]
+        rows = []
+        for (view, metric), samples in sorted(items):
+            ordered = sorted(samples)
+            rows.append({
+                'view': view,
+                'metric': metric,
+                'count': len(ordered),
+                'p50': round(percentile(ordered, 50), 1),
+                'p95': round(percentile(ordered, 95), 1),
+                'max': round(ordered[-1], 1),
+            })
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an ascending list (0.0 when empty)."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return float(ordered[int(rank) - 1])
+
+
+stats = RollingStats()
@@ -0,0 +1,120 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core_dashboard.models import Area, Client, RevenueEntry, SubArea
+from core_dashboard.modules.report_weeks import sync_from_entries
+
+from .services import RequestRecorder, finish_request, percentile, span, start_request, stats
+
+
+def create_entries():
+    client = Client.objects.create(name='ACME')
+    area = Area.objects.create(name='Assurance')
+    sub_area = SubArea.objects.create(area=area, name='Audit')
+    for i in range(3):
+        RevenueEntry.objects.create(
+            date=datetime.date(2025, 8, 15), client=client, area=area, sub_area=sub_area,
+            engagement_id=f'E{i}', engagement_partner='Partner Alpha', engagement_manager='Manager One',
+            fytd_ansr_sintetico=10.0 * (i + 1),
+        )
+    sync_from_entries()
+
+
+def metrics(header):
+    return {item.split(';')[0].strip(): item for item in header.split(',')}
+
+
+class SpanTests(TestCase):
+    def test_span_is_a_noop_outside_a_recorded_request(self):
+        @span('work')
+        def work():
+            return RevenueEntry.objects.count()
+
+        with span('block'):
+            self.assertEqual(work(), 0)
+        self.assertNotIn(RequestRecorder, [type(w) for w in connection.execute_wrappers])
+
+    def test_span_counts_its_queries(self):
+        recorder, token = start_request()
+        try:
+            with span('outer'):
+                RevenueEntry.objects.count()
+                with span('inner'):
+                    RevenueEntry.objects.exists()
+                    RevenueEntry.objects.first()
+        finally:
+            finish_request(token)
+        self.assertEqual(recorder.queries, 3)
+        self.assertEqual(recorder.spans['outer']['queries'], 1)
+        self.assertEqual(recorder.spans['inner']['queries'], 2)
+        self.assertGreaterEqual(recorder.spans['outer']['seconds'], recorder.spans['inner']['seconds'])
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50.0)
+        self.assertEqual(percentile(samples, 95), 95.0)
+        self.assertEqual(percentile([7], 95), 7.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+@override_settings(DASHBOARD_PERF=True)
+class PerfMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        stats.clear()
+        create_entries()
+
+    def test_server_timing_and_rolling_stats(self):
+        for _ in range(2):
+            response = self.client.get(reverse('dashboard_cards:card', args=['macro']))
+        found = metrics(response['Server-Timing'])
+        self.assertIn('total', found)
+        self.assertRegex(found['db'], r'desc="[1-9]\d* queries"')
+        self.assertIn('card.macro', found)
+        self.assertIn('template.macro', found)
+
+        rows = {(r['view'], r['metric']): r for r in stats.summary()}
+        self.assertEqual(rows[('dashboard_cards:card', 'total')]['count'], 2)
+        self.assertIn(('dashboard_cards:card', 'card.macro'), rows)
+
+    @override_settings(DASHBOARD_PERF=False)
+    def test_disabled_adds_nothing(self):
+        response = self.client.get(reverse('dashboard_cards:card', args=['macro']))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(stats.summary(), [])
+
+    def test_panel_is_staff_only(self):
+        self.assertEqual(self.client.get(reverse('perf:panel')).status_code, 302)
+
+        User.objects.create_user('staff', password='pw', is_staff=True)
+        self.client.login(username='staff', password='pw')
+        self.client.get('/')
+        response = self.client.get(reverse('perf:panel'))
+        self.assertContains(response, 'dashboard')
+        payload = self.client.get(reverse('perf:panel'), {'format': 'json'}).json()
+        self.assertTrue(payload['enabled'])
+        self.assertIn('p95', payload['rows'][0])
+
+        self.client.post(reverse('perf:panel'))
+        rows = self.client.get(reverse('perf:panel'), {'format': 'json'}).json()['rows']
+        self.assertNotIn('dashboard', {row['view'] for row in rows})
+
+
+@override_settings(DASHBOARD_PERF=True)
+class AsyncPerfTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        create_entries()
+
+    def test_card_spans_from_worker_threads_are_recorded(self):
+        response = self.client.get(reverse('dashboard_async'))
+        found = metrics(response['Server-Timing'])
+        for name in ('filters', 'catalogue', 'card.macro', 'card.rankings', 'template.exchange'):
+            self.assertIn(name, found)
+        self.assertRegex(found['card.macro'], r'desc="[1-9]\d* queries"')
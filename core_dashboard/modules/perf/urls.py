@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'perf'
+
+urlpatterns = [
+    path('', views.perf_view, name='panel'),
+]
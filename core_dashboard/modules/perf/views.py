@@ -0,0 +1,20 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import redirect, render
+
+from .services import perf_enabled, stats
+
+
+@staff_member_required
+def perf_view(request):
+    """Staff-only panel with rolling p50/p95 (ms) per view and span.
+
+    ``?format=json`` returns the rows; POST clears the samples.
+    """
+    if request.method == 'POST':
+        stats.clear()
+        return redirect('perf:panel')
+    rows = stats.summary()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'success': True, 'enabled': perf_enabled(), 'rows': rows})
+    return render(request, 'core_dashboard/perf.html', {'rows': rows, 'enabled': perf_enabled()})
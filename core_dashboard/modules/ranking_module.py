@@ -1,28 +1,64 @@
-from django.db.models import Sum
+import base64
+import json
 
+from core_dashboard.modules.olap import engine_for
 
-def compute_ranking(queryset, group_by_field, revenue_field='fytd_ansr_sintetico'):
+TOP_N = 5
+PAGE_SIZE = 50
+
+
+def _row(item, group_by_field):
+    return {'label': item[group_by_field], 'total_revenue': item['total']}
+
+
+def compute_ranking(queryset, group_by_field, revenue_field='fytd_ansr_sintetico', limit=None):
     """Return full ranking and top 5 for a queryset grouped by group_by_field.
 
     Args:
-        queryset: Django QuerySet of RevenueEntry-like objects
+        queryset: Django QuerySet of RevenueEntry-like objects, or an olap Selection
+            (aggregated by the configured engine)
         group_by_field: string name of the field to group by (e.g., 'engagement_manager')
         revenue_field: field name to sum as revenue
+        limit: when given, only the first `limit` groups are fetched (SQL LIMIT)
 
     Returns:
         (top5_list, full_ranking_list) where each list contains dicts with keys:
            - 'label' (group value)
            - 'total_revenue'
+        Groups are ordered by revenue descending, then label.
+    """
+    ranked = engine_for(queryset).ranked(queryset, group_by_field, revenue_field, limit=limit)
+    full = [_row(item, group_by_field) for item in ranked]
+    return full[:TOP_N], full
+
+
+def top_ranking(queryset, group_by_field, n=TOP_N, revenue_field='fytd_ansr_sintetico'):
+    """The first `n` rows of the ranking, without grouping the rest into Python."""
+    return compute_ranking(queryset, group_by_field, revenue_field, limit=n)[1]
+
+
+def encode_cursor(row):
+    """Opaque 'next page' token for the ranking row last shown."""
+    payload = json.dumps([row['total_revenue'], row['label'] or '']).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """(total, label) of an encode_cursor() token; ValueError when it is malformed."""
+    try:
+        total, label = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(total), str(label)
+    except Exception as e:
+        raise ValueError(f"Invalid ranking cursor: {cursor!r}") from e
+
+
+def ranking_page(queryset, group_by_field, after=None, limit=PAGE_SIZE, revenue_field='fytd_ansr_sintetico'):
+    """One page of the full ranking, by keyset (the rows after the `after` cursor).
+
+    Returns {'results': [{'label', 'total_revenue'}], 'next': cursor or None}.
     """
-    grouped = queryset.values(group_by_field).annotate(total_revenue=Sum(revenue_field)).order_by('-total_revenue')
-
-    full = [
-        {
-            'label': item[group_by_field],
-            'total_revenue': item['total_revenue'] or 0
-        }
-        for item in grouped
-    ]
-
-    top5 = full[:5]
-    return top5, full
+    after_key = decode_cursor(after) if after else None
+    ranked = engine_for(queryset).ranked(queryset, group_by_field, revenue_field, after=after_key, limit=limit + 1)
+    results = [_row(item, group_by_field) for item in ranked[:limit]]
+    has_more = len(ranked) > limit
+    return {'results': results, 'next': encode_cursor(results[-1]) if has_more else None}
@@ -0,0 +1,32 @@
+"""
+Report Weeks Module
+===================
+
+Registry of imported report dates (`ReportWeek`). The import pipeline records
+one row per week-ending date with its fiscal period, row count, source-file
+hashes, import duration and partner revenue-days mapping; the dashboard and
+analytics services read week lists, the latest week and a partner's revenue
+days from here instead of scanning RevenueEntry.
+"""
+
+from .services import (
+    record_import,
+    sync_from_entries,
+    get_report_dates,
+    get_available_weeks,
+    get_week_range,
+    hash_source_files,
+    partner_revenue_days_from_entries,
+    get_partner_revenue_days,
+)
+
+__all__ = [
+    'record_import',
+    'sync_from_entries',
+    'get_report_dates',
+    'get_available_weeks',
+    'get_week_range',
+    'hash_source_files',
+    'partner_revenue_days_from_entries',
+    'get_partner_revenue_days',
+]
@@ -0,0 +1,140 @@
+import datetime
+import logging
+
+from django.db.models import Count
+
+from core_dashboard.models import ReportWeek, RevenueEntry
+from core_dashboard.modules.data_cache import cached, week_scope
+from core_dashboard.modules.shared.cache_utils import compute_files_hash
+from core_dashboard.utils import get_fiscal_month_year, normalize_key
+
+logger = logging.getLogger(__name__)
+
+
+def _week_start(report_date):
+    return report_date - datetime.timedelta(days=report_date.weekday())
+
+
+def hash_source_files(source_files):
+    """{role: short sha256} for a {role: path} mapping; unreadable files are skipped."""
+    hashes = {}
+    for role, path in (source_files or {}).items():
+        digest = compute_files_hash([path]) if path else ''
+        if digest:
+            hashes[role] = digest
+    return hashes
+
+
+def partner_revenue_days_from_entries(dates=None):
+    """{report date: {engagement partner: Total Revenue Days P CP}} rebuilt from stored
+    entries (the later row wins, like the import) for writers that bypass the import."""
+    rows = (
+        RevenueEntry.objects.exclude(engagement_partner__isnull=True).exclude(engagement_partner='')
+        .exclude(total_revenue_days_p_cp__isnull=True)
+    )
+    if dates is not None:
+        rows = rows.filter(date__in=dates)
+    mappings = {}
+    for report_date, partner, days in rows.order_by('id').values_list(
+        'date', 'engagement_partner', 'total_revenue_days_p_cp'
+    ).iterator():
+        mappings.setdefault(report_date, {})[partner] = days
+    return mappings
+
+
+def record_import(week_ending, row_count=None, source_files=None, source_hashes=None, duration_seconds=None,
+                  partner_revenue_days=None):
+    """Create or refresh the registry row of an imported report date.
+
+    row_count defaults to the number of RevenueEntry rows stored for the date.
+    source_files ({role: path}) are hashed unless source_hashes is given.
+    partner_revenue_days ({engagement partner: days}) defaults to the mapping of
+    the stored entries.
+    """
+    if row_count is None:
+        row_count = RevenueEntry.objects.filter(date=week_ending).count()
+    if source_hashes is None:
+        source_hashes = hash_source_files(source_files)
+    if partner_revenue_days is None:
+        partner_revenue_days = partner_revenue_days_from_entries([week_ending]).get(week_ending, {})
+    week, _ = ReportWeek.objects.update_or_create(
+        week_ending=week_ending,
+        defaults={
+            'week_start': _week_start(week_ending),
+            'fiscal_period': get_fiscal_month_year(week_ending),
+            'row_count': row_count,
+            'source_hashes': source_hashes,
+            'import_duration_seconds': duration_seconds,
+            'partner_revenue_days': partner_revenue_days,
+        },
+    )
+    return week
+
+
+def sync_from_entries(dates=None):
+    """Rebuild registry rows from RevenueEntry for writers that bypass the import
+    pipeline (legacy CSV import, manual fixes). Dates without entries are dropped.
+
+    Returns the number of registered weeks after the sync.
+    """
+    entries = RevenueEntry.objects.all()
+    weeks = ReportWeek.objects.all()
+    if dates is not None:
+        entries = entries.filter(date__in=dates)
+        weeks = weeks.filter(week_ending__in=dates)
+    counts = dict(entries.values_list('date').annotate(rows=Count('id')).order_by())
+    weeks.exclude(week_ending__in=list(counts)).delete()
+    mappings = partner_revenue_days_from_entries(list(counts))
+    for report_date, rows in counts.items():
+        ReportWeek.objects.update_or_create(
+            week_ending=report_date,
+            defaults={
+                'week_start': _week_start(report_date),
+                'fiscal_period': get_fiscal_month_year(report_date),
+                'row_count': rows,
+                'partner_revenue_days': mappings.get(report_date, {}),
+            },
+        )
+    return ReportWeek.objects.count()
+
+
+def get_report_dates():
+    """Imported report dates, ascending."""
+    return list(ReportWeek.objects.order_by('week_ending').values_list('week_ending', flat=True))
+
+
+def get_available_weeks():
+    """Friday of every imported week as 'YYYY-MM-DD', ascending (dashboard week selector)."""
+    starts = ReportWeek.objects.order_by('week_start').values_list('week_start', flat=True).distinct()
+    return [(start + datetime.timedelta(days=4)).strftime('%Y-%m-%d') for start in starts]
+
+
+def get_week_range(friday_date=None):
+    """(start_of_week, end_of_week) for the given Friday, or for the most recent
+    imported week when friday_date is None. Returns (None, None) without data."""
+    if friday_date is None:
+        latest = ReportWeek.objects.order_by('-week_start').values_list('week_start', flat=True).first()
+        if latest is None:
+            return None, None
+        start_of_week = latest
+    else:
+        start_of_week = _week_start(friday_date)
+    return start_of_week, start_of_week + datetime.timedelta(days=6)
+
+
+def get_partner_revenue_days(start_of_week):
+    """{partner key: Total Revenue Days P CP} of the report week starting on start_of_week,
+    as recorded at import time (cached until the week is imported again)."""
+    if start_of_week is None:
+        return {}
+
+    def build():
+        mapping = {}
+        # Several report dates in one week: the latest one wins, like the week's rows
+        for days_by_partner in ReportWeek.objects.filter(week_start=start_of_week).order_by('week_ending').values_list(
+            'partner_revenue_days', flat=True
+        ):
+            mapping.update({normalize_key(partner): days for partner, days in (days_by_partner or {}).items()})
+        return mapping
+
+    return cached('report_weeks:partner_revenue_days', (start_of_week,), build, scopes=(week_scope(start_of_week),))
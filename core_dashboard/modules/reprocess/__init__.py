@@ -0,0 +1,28 @@
+"""
+Reprocess Module
+================
+
+Full-history re-import for when the diferencial or ANSR sintético rules
+change. Discovers the upload sets stored under
+MEDIA_ROOT/historico_de_final_database, parses and transforms them in a
+process pool (`process_uploaded_data.prepare_week`, no database access) and
+writes the weeks one by one in fiscal order, since the MTD of a week reads the
+last report of the previous fiscal month. Each week is recorded as the upload
+pipeline's 'revenue_import' stage, so a re-run skips the weeks already
+imported from the same files by the current code and resumes after a failure.
+Run it with `python manage.py reprocess_history`.
+"""
+
+from .services import (
+    HISTORY_DIR,
+    discover_upload_sets,
+    plan,
+    reprocess_history,
+)
+
+__all__ = [
+    'HISTORY_DIR',
+    'discover_upload_sets',
+    'plan',
+    'reprocess_history',
+]
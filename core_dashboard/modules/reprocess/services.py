@@ -0,0 +1,196 @@
+import collections
+import contextlib
+import datetime
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+from core_dashboard.modules.data_cache import week_scope
+from core_dashboard.modules.mtd_module import import_guard_scopes
+from core_dashboard.modules.source_cache import file_sha256
+from core_dashboard.modules.upload_registry import code_version, find_reusable_run, run_stage, stage_input_key
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = 'historico_de_final_database'  # under MEDIA_ROOT, one folder per report date
+# Role -> file name prefix given by the upload view
+ROLES = {'engagement': 'Engagement_df_', 'dif': 'Dif_df_', 'revenue_days': 'Revenue_days_'}
+ALLOWED_EXTENSIONS = ('.csv', '.xls', '.xlsx', '.xlsb')
+STAGE = 'revenue_import'  # the upload view's stage: a week imported by either is up to date for both
+
+
+def history_root():
+    return os.path.join(settings.MEDIA_ROOT, HISTORY_DIR)
+
+
+def _latest(directory, prefix):
+    # Older uploads of the same date were saved with a random suffix; the newest one was imported last
+    candidates = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith(prefix) and os.path.splitext(name)[1].lower() in ALLOWED_EXTENSIONS
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def discover_upload_sets(root=None, since=None, until=None):
+    """Stored upload sets under `root` (default MEDIA_ROOT/historico_de_final_database),
+    ordered by report date: [{'week', 'files': {role: path}, 'missing': [role]}]."""
+    root = root or history_root()
+    sets = []
+    if not os.path.isdir(root):
+        return sets
+    for name in os.listdir(root):
+        directory = os.path.join(root, name)
+        try:
+            week = datetime.date.fromisoformat(name)
+        except ValueError:
+            continue
+        if not os.path.isdir(directory) or (since and week < since) or (until and week > until):
+            continue
+        files = {role: _latest(directory, prefix) for role, prefix in ROLES.items()}
+        sets.append({
+            'week': week,
+            'files': {role: path for role, path in files.items() if path},
+            'missing': [role for role, path in files.items() if not path],
+        })
+    # Fiscal order is date order: the MTD of a week reads the previous fiscal month
+    return sorted(sets, key=lambda s: s['week'])
+
+
+def plan(upload_sets, force=False):
+    """Mark each complete set 'skip' (already imported from the same files by the current
+    code, and unchanged since) or 'import'. Once a week is imported every later one is
+    too, since its MTD baseline may have changed."""
+    version = code_version(STAGE)
+    importing = force
+    for upload_set in upload_sets:
+        upload_set['inputs'] = {role: file_sha256(path) for role, path in upload_set['files'].items()}
+        if not importing:
+            scope = week_scope(upload_set['week'])
+            key = stage_input_key(STAGE, upload_set['inputs'], version)
+            guard_scopes = import_guard_scopes(upload_set['week'])
+            importing = find_reusable_run(STAGE, scope, key, guard_scopes=guard_scopes) is None
+        upload_set['action'] = 'import' if importing else 'skip'
+    return upload_sets
+
+
+def _prepare(files, week, quiet=True):
+    """Parse and transform one upload set (worker process side; no database access)."""
+    import process_uploaded_data
+    # Calls logging.basicConfig() on import: must not bind the root handler to the redirect below
+    from core_dashboard.modules import collection_module  # noqa: F401
+
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            # The import script reports every step on stderr; one line per week is enough here
+            stack.enter_context(contextlib.redirect_stderr(stack.enter_context(open(os.devnull, 'w'))))
+        return process_uploaded_data.prepare_week(files['engagement'], files['dif'], files['revenue_days'], week)
+
+
+def _apply(upload_set, merged_df, started_at, quiet=True):
+    """Import one prepared week (main process side, in fiscal order)."""
+    import process_uploaded_data
+
+    week, files = upload_set['week'], upload_set['files']
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stderr(stack.enter_context(open(os.devnull, 'w'))))
+        process_uploaded_data.apply_mtd(merged_df, week)
+        process_uploaded_data.save_partner_revenue_days(merged_df)
+        diff = process_uploaded_data.import_week(
+            merged_df, week,
+            source_files={'engagement': files['engagement'], 'dif': files['dif'], 'revenue_days': files['revenue_days']},
+            started_at=started_at,
+        )
+    return {'success': True, 'week': week.isoformat(), **diff}
+
+
+def reprocess_history(root=None, since=None, until=None, workers=None, force=False, dry_run=False,
+                      quiet=True, progress=None):
+    """Re-import every stored upload set: parse and transform in a process pool, write the
+    weeks to the database one by one in fiscal order.
+
+    Weeks already imported from the same files by the current code are skipped, so an
+    interrupted run resumes where it stopped; `force` re-imports everything. A failed
+    week stops the run (later weeks depend on its MTD). `workers` <= 1 parses in this
+    process. `progress(done, total, upload_set)` is called after every week, the set
+    carrying its 'action' ('skip' / 'import' / 'failed') and 'rows' or 'error'.
+
+    Returns {'weeks', 'pending', 'imported', 'skipped', 'incomplete', 'failed', 'rows', 'elapsed_seconds'}.
+    """
+    started = time.perf_counter()
+    upload_sets = discover_upload_sets(root, since, until)
+    incomplete = [s for s in upload_sets if s['missing']]
+    for upload_set in incomplete:
+        logger.warning(f"Upload set {upload_set['week']} is missing {', '.join(upload_set['missing'])}; skipped")
+    upload_sets = plan([s for s in upload_sets if not s['missing']], force)
+    summary = {
+        'weeks': len(upload_sets), 'imported': 0, 'skipped': 0, 'incomplete': [s['week'] for s in incomplete],
+        'failed': None, 'rows': 0,
+    }
+    todo = [s for s in upload_sets if s['action'] == 'import']
+    summary['pending'] = len(todo)
+    if dry_run:
+        summary['skipped'] = len(upload_sets) - len(todo)
+        summary['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        return summary
+
+    done = 0
+    for upload_set in upload_sets:
+        if upload_set['action'] != 'skip':
+            break
+        done += 1
+        summary['skipped'] += 1
+        if progress:
+            progress(done, len(upload_sets), upload_set)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with contextlib.ExitStack() as stack:
+        pool = None
+        if workers > 1 and len(todo) > 1:
+            # Workers set Django up themselves (needed where processes are spawned, e.g. Windows)
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=django.setup))
+        # Keep a bounded window of weeks parsing ahead of the writes
+        pending = collections.deque()
+        queue = iter(todo)
+        for upload_set in todo:
+            while pool is not None and len(pending) < 2 * workers:
+                queued = next(queue, None)
+                if queued is None:
+                    break
+                pending.append(pool.submit(_prepare, queued['files'], queued['week'], quiet))
+            week_started = time.perf_counter()
+            try:
+                merged_df = pending.popleft().result() if pool is not None else _prepare(
+                    upload_set['files'], upload_set['week'], quiet
+                )
+                scope = week_scope(upload_set['week'])
+                outcome = run_stage(
+                    STAGE, scope, upload_set['inputs'],
+                    lambda: _apply(upload_set, merged_df, week_started, quiet),
+                    guard_scopes=import_guard_scopes(upload_set['week']),
+                    force=True,  # planned: its inputs, code or MTD baseline changed
+                )
+            except Exception as e:
+                logger.error(f"Reprocessing {upload_set['week']} failed: {e}")
+                upload_set.update(action='failed', error=str(e))
+                summary['failed'] = upload_set['week']
+                for future in pending:
+                    future.cancel()
+                if progress:
+                    progress(done + 1, len(upload_sets), upload_set)
+                break
+            upload_set['rows'] = outcome['result'].get('rows', 0)
+            upload_set['seconds'] = round(time.perf_counter() - week_started, 3)
+            summary['imported'] += 1
+            summary['rows'] += upload_set['rows']
+            done += 1
+            if progress:
+                progress(done, len(upload_sets), upload_set)
+    summary['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    return summary
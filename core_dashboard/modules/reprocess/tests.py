@@ -0,0 +1,114 @@
+import datetime
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+from django.test import TestCase, override_settings
+
+from core_dashboard.models import ReportWeek, RevenueEntry, StageRun
+from core_dashboard.modules.synthetic_data import SyntheticDataset
+
+from .services import HISTORY_DIR, discover_upload_sets, reprocess_history
+
+END = datetime.date(2025, 8, 15)  # weeks from July (first fiscal month) into August
+
+
+class ReprocessHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.root = os.path.join(self.media_root, HISTORY_DIR)
+        self.dataset = SyntheticDataset(partners=2, managers=3, engagements=12, weeks=4, end_date=END, seed=2)
+        self.weeks = self.dataset.report_dates
+        for week in self.weeks:
+            self.write_week(week)
+        # An upload without its Revenue Days file and a folder that is not a report date
+        incomplete = os.path.join(self.root, '2025-06-27')
+        os.makedirs(incomplete)
+        open(os.path.join(incomplete, 'Engagement_df_2025-06-27.xlsx'), 'wb').close()
+        os.makedirs(os.path.join(self.root, 'notes'))
+
+    def write_week(self, week, dataset=None):
+        paths = (dataset or self.dataset).write_workbooks(os.path.join(self.root, week.isoformat()), week)
+        return paths
+
+    def rows_per_week(self):
+        return dict(RevenueEntry.objects.values_list('date').annotate(n=Count('id')).order_by())
+
+    def test_discover_upload_sets(self):
+        sets = discover_upload_sets(self.root)
+        self.assertEqual([s['week'] for s in sets], [datetime.date(2025, 6, 27)] + self.weeks)
+        self.assertEqual(sets[0]['missing'], ['dif', 'revenue_days'])
+        self.assertEqual(set(sets[1]['files']), {'engagement', 'dif', 'revenue_days'})
+        self.assertEqual([s['week'] for s in discover_upload_sets(self.root, since=self.weeks[1], until=self.weeks[2])],
+                         self.weeks[1:3])
+
+        # Older uploads kept a random suffix: the newest file of a role is the one imported last
+        directory = os.path.join(self.root, self.weeks[0].isoformat())
+        newer = os.path.join(directory, f'Engagement_df_{self.weeks[0]}_Ab12Cd.xlsx')
+        shutil.copyfile(sets[1]['files']['engagement'], newer)
+        os.utime(newer, (2e9, 2e9))
+        self.assertEqual(discover_upload_sets(self.root)[1]['files']['engagement'], newer)
+
+    def test_reprocess_imports_in_fiscal_order_and_resumes(self):
+        seen = []
+        summary = reprocess_history(workers=1, progress=lambda done, total, s: seen.append((done, total, s['action'])))
+        self.assertEqual((summary['imported'], summary['skipped'], summary['failed']), (4, 0, None))
+        self.assertEqual(summary['incomplete'], [datetime.date(2025, 6, 27)])
+        self.assertEqual(seen, [(i, 4, 'import') for i in range(1, 5)])
+        self.assertEqual(self.rows_per_week(), {week: 12 for week in self.weeks})
+        self.assertEqual(list(ReportWeek.objects.values_list('week_ending', flat=True)), self.weeks)
+        self.assertEqual(StageRun.objects.filter(stage='revenue_import', succeeded=True).count(), 4)
+
+        # Nothing changed: every week is up to date
+        summary = reprocess_history(workers=1)
+        self.assertEqual((summary['imported'], summary['skipped']), (0, 4))
+
+        # A corrected upload of the second week re-imports it and every later week (MTD baselines)
+        self.write_week(self.weeks[1], SyntheticDataset(partners=2, managers=3, engagements=10, weeks=4, end_date=END, seed=5))
+        self.assertEqual(reprocess_history(dry_run=True)['pending'], 3)
+        summary = reprocess_history(workers=1)
+        self.assertEqual((summary['imported'], summary['skipped']), (3, 1))
+        self.assertEqual(self.rows_per_week()[self.weeks[1]], 10)
+
+        self.assertEqual(reprocess_history(workers=1, force=True)['imported'], 4)
+
+    def test_failed_week_stops_the_run_and_resumes_there(self):
+        revenue_days = discover_upload_sets(self.root)[3]['files']['revenue_days']
+        with open(revenue_days, 'rb') as fh:
+            original = fh.read()
+        with open(revenue_days, 'wb') as fh:
+            fh.write(b'not a workbook')
+
+        summary = reprocess_history(workers=1)
+        self.assertEqual((summary['imported'], summary['failed']), (2, self.weeks[2]))
+        self.assertEqual(set(self.rows_per_week()), set(self.weeks[:2]))
+
+        with open(revenue_days, 'wb') as fh:
+            fh.write(original)
+        summary = reprocess_history(workers=1)
+        self.assertEqual((summary['imported'], summary['skipped'], summary['failed']), (2, 2, None))
+        self.assertEqual(set(self.rows_per_week()), set(self.weeks))
+
+    def test_process_pool_matches_inline(self):
+        reprocess_history(workers=1)
+        inline = list(RevenueEntry.objects.order_by('date', 'engagement_id').values_list(
+            'date', 'engagement_id', 'fytd_ansr_sintetico', 'diferencial_mtd', 'total_revenue_days_p_cp'))
+        summary = reprocess_history(workers=2, force=True)
+        self.assertEqual(summary['imported'], 4)
+        pooled = list(RevenueEntry.objects.order_by('date', 'engagement_id').values_list(
+            'date', 'engagement_id', 'fytd_ansr_sintetico', 'diferencial_mtd', 'total_revenue_days_p_cp'))
+        self.assertEqual(pooled, inline)
+
+    def test_command(self):
+        call_command('reprocess_history', '--workers', '1', stdout=open(os.devnull, 'w'))
+        self.assertEqual(len(self.rows_per_week()), 4)
+        with self.assertRaises(CommandError):
+            call_command('reprocess_history', '--since', 'July')
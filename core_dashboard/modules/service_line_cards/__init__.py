@@ -14,12 +14,17 @@ aggregates requested by the user:
 
 This module returns only those cards and does not implement goals or
 additional manager-specific functionality.
+
+The values of every service line and sub service line of a week come from
+one grouped query (`line_cards_batch`), cached per week and data generation;
+single-line calls are served from that batch.
 """
 
 from .services import ServiceLineCardsService
-from .analytics import ServiceLineAnalyticsService
+from .analytics import ServiceLineAnalyticsService, line_cards_batch
 
 __all__ = [
     'ServiceLineCardsService',
     'ServiceLineAnalyticsService',
+    'line_cards_batch',
 ]
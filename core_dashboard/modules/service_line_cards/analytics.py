@@ -7,17 +7,72 @@ four KPI values required by the dashboard cards.
 """
 
 import logging
-from django.db.models import Sum, Q
+from django.db.models import Count, Min, Sum
 from core_dashboard.models import RevenueEntry
+from core_dashboard.modules.data_cache import REVENUE_SCOPE, cached, week_scope
+from core_dashboard.utils import normalize_key
 
 logger = logging.getLogger(__name__)
 
+# Card value name -> RevenueEntry field summed for it
+CARD_FIELDS = {
+    'fytd_ansr_value': 'fytd_ansr_sintetico',
+    'fytd_charged_hours': 'fytd_charged_hours',
+    'mtd_ansr_value': 'mtd_ansr_amt',
+    'mtd_charged_hours': 'mtd_charged_hours',
+}
+
+
+def line_cards_batch(start_date=None, end_date=None):
+    """Card values of every service line and sub service line, from one grouped query.
+
+    Returns {'service_lines': {key: cards}, 'sub_service_lines': {key: cards}}
+    where key is the normalized match key and cards holds 'name', 'rows' and
+    the four CARD_FIELDS sums. Cached per week (per data generation when no
+    week is given): an upload of that week invalidates it.
+    """
+    if start_date and end_date:
+        parts, scopes = (str(start_date), str(end_date)), (week_scope(end_date),)
+    else:
+        parts, scopes = (), (REVENUE_SCOPE,)
+    return cached('line_cards_batch', parts, lambda: _build_line_cards(start_date, end_date), scopes=scopes)
+
+
+def _build_line_cards(start_date, end_date):
+    qs = RevenueEntry.objects.all()
+    if start_date and end_date:
+        qs = qs.filter(date__range=[start_date, end_date])
+    groups = qs.values('service_line_key', 'sub_service_line_key').annotate(
+        sl_name=Min('engagement_service_line'),
+        ssl_name=Min('engagement_sub_service_line'),
+        rows=Count('id'),
+        **{name: Sum(field) for name, field in CARD_FIELDS.items()},
+    )
+
+    batch = {'service_lines': {}, 'sub_service_lines': {}}
+    for group in groups:
+        # SL totals roll up their sub service lines; an SSL key shared by two SLs adds up too
+        for level, key, name in (
+            ('service_lines', group['service_line_key'], group['sl_name']),
+            ('sub_service_lines', group['sub_service_line_key'], group['ssl_name']),
+        ):
+            if not key:
+                continue
+            cards = batch[level].setdefault(
+                key, {'name': ' '.join((name or key).split()), 'rows': 0, **dict.fromkeys(CARD_FIELDS, 0.0)}
+            )
+            cards['rows'] += group['rows']
+            for value in CARD_FIELDS:
+                cards[value] += float(group[value] or 0.0)
+    return batch
+
 
 class ServiceLineAnalyticsService:
     """Calculate aggregates for a given Service Line (SL).
 
-    Public method:
-      - get_sl_cards(sl_name)
+    Public methods:
+      - get_sl_cards(sl_name, start_date=None, end_date=None)
+      - get_all_sl_cards(start_date=None, end_date=None)
 
     Returns a dict with keys:
       - sl_fytd_ansr_value
@@ -39,38 +94,26 @@ class ServiceLineAnalyticsService:
                 logger.warning("Empty SL name provided to ServiceLineAnalyticsService")
                 return self._empty_cards()
 
-            # Normalize input and match either the engagement_service_line text or the related Area name
-            normalized_sl = sl_name.strip() if isinstance(sl_name, str) else sl_name
-            qs = RevenueEntry.objects.filter(
-                Q(engagement_service_line__iexact=normalized_sl) | Q(area__name__iexact=normalized_sl)
-            )
-
-            # Apply date filtering if provided (so cards reflect the same week/report)
-            if start_date and end_date:
-                qs = qs.filter(date__range=[start_date, end_date])
-
-            if not qs.exists():
+            # Served from the batch of every service line of the week (see line_cards_batch)
+            cards = line_cards_batch(start_date, end_date)['service_lines'].get(normalize_key(sl_name))
+            if not cards:
                 logger.info(f"No entries found for SL: {sl_name}")
                 return self._empty_cards()
 
-            aggregates = qs.aggregate(
-                fytd_ansr=Sum('fytd_ansr_sintetico'),
-                fytd_hours=Sum('fytd_charged_hours'),
-                mtd_ansr=Sum('mtd_ansr_amt'),
-                mtd_hours=Sum('mtd_charged_hours'),
-            )
-
-            return {
-                'sl_fytd_ansr_value': float(aggregates.get('fytd_ansr') or 0.0),
-                'sl_fytd_charged_hours': float(aggregates.get('fytd_hours') or 0.0),
-                'sl_mtd_ansr_value': float(aggregates.get('mtd_ansr') or 0.0),
-                'sl_mtd_charged_hours': float(aggregates.get('mtd_hours') or 0.0),
-            }
+            return {f'sl_{value}': cards[value] for value in CARD_FIELDS}
 
         except Exception as e:
             logger.error(f"Error computing SL cards for {sl_name}: {e}")
             return self._empty_cards()
 
+    def get_all_sl_cards(self, start_date=None, end_date=None):
+        """{SL name: the four values of get_sl_cards} for every service line of the period."""
+        batch = line_cards_batch(start_date, end_date)['service_lines']
+        return {
+            cards['name']: {f'sl_{value}': cards[value] for value in CARD_FIELDS}
+            for cards in batch.values()
+        }
+
     def _empty_cards(self):
         return {
             'sl_fytd_ansr_value': 0.0,
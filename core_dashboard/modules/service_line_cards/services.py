@@ -58,3 +58,27 @@ class ServiceLineCardsService:
                     {'key': 'Horas_MTD', 'label': 'Horas Cargadas MTD', 'value': 0.0},
                 ]
             }
+
+    def get_all_cards(self, start_date=None, end_date=None):
+        """Cards of every service line of the period, from one batched query.
+
+        Returns a list of {'sl_name', 'cards'} (same card layout as
+        get_cards_for_sl), ordered by name.
+        """
+        try:
+            data = self.analytics.get_all_sl_cards(start_date=start_date, end_date=end_date)
+        except Exception as e:
+            logger.error(f"Error in get_all_cards: {e}")
+            return []
+        return [
+            {
+                'sl_name': name,
+                'cards': [
+                    {'key': 'ANSR_YTD', 'label': 'ANSR YTD', 'value': values['sl_fytd_ansr_value']},
+                    {'key': 'Horas_YTD', 'label': 'Horas Cargadas YTD', 'value': values['sl_fytd_charged_hours']},
+                    {'key': 'ANSR_MTD', 'label': 'ANSR MTD', 'value': values['sl_mtd_ansr_value']},
+                    {'key': 'Horas_MTD', 'label': 'Horas Cargadas MTD', 'value': values['sl_mtd_charged_hours']},
+                ],
+            }
+            for name, values in sorted(data.items())
+        ]
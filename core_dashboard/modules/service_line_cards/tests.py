@@ -0,0 +1,85 @@
+import datetime
+import importlib
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+
+from core_dashboard.models import Area, Client, RevenueEntry, SubArea
+from core_dashboard.modules.data_cache import bump_weeks, get_generation, week_scope
+from core_dashboard.modules.sub_service_line_cards import SubServiceLineCardsService
+from core_dashboard.modules.sub_service_line_cards.analytics import SubServiceLineAnalyticsService
+
+from .analytics import ServiceLineAnalyticsService
+from .services import ServiceLineCardsService
+
+WEEK = datetime.date(2025, 8, 15)
+
+
+class ServiceLineKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        client = Client.objects.create(name='Client A')
+        area = Area.objects.create(name='Consultoría')
+        sub_area = SubArea.objects.create(area=area, name='Technology Risk')
+        for service_line, sub_service_line, ansr in (
+            ('Consultoría', 'Technology Risk', 100.0),
+            ('CONSULTORIA ', 'technology  risk', 50.0),
+            (None, None, 25.0),  # keys fall back to the Area / SubArea names
+        ):
+            RevenueEntry.objects.create(
+                date=WEEK, client=client, area=area, sub_area=sub_area,
+                engagement_service_line=service_line, engagement_sub_service_line=sub_service_line,
+                fytd_ansr_sintetico=ansr, fytd_charged_hours=1.0,
+            )
+        other = Area.objects.create(name='Tax')
+        RevenueEntry.objects.create(date=WEEK, client=client, area=other, engagement_service_line='Tax', fytd_ansr_sintetico=7.0)
+
+    def test_keys_are_written_on_save(self):
+        self.assertEqual(
+            set(RevenueEntry.objects.values_list('service_line_key', 'sub_service_line_key')),
+            {('consultoria', 'technology risk'), ('tax', '')},
+        )
+
+    def test_cards_match_any_spelling_by_key(self):
+        sl = ServiceLineAnalyticsService().get_sl_cards(' consultoria', start_date=WEEK, end_date=WEEK)
+        self.assertEqual(sl['sl_fytd_ansr_value'], 175.0)
+        self.assertEqual(sl['sl_fytd_charged_hours'], 3.0)
+        ssl = SubServiceLineAnalyticsService().get_ssl_cards('TECHNOLOGY RISK')
+        self.assertEqual(ssl['ssl_fytd_ansr_value'], 175.0)
+        self.assertEqual(ServiceLineAnalyticsService().get_sl_cards('Audit')['sl_fytd_ansr_value'], 0.0)
+
+    def test_card_query_uses_the_key_index(self):
+        if connection.vendor == 'sqlite':
+            sql, params = (
+                RevenueEntry.objects.filter(service_line_key='tax', date__range=(WEEK, WEEK)).query.sql_with_params()
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+            self.assertIn('revenue_sl_key_date', plan)
+
+    def test_backfill_fills_existing_rows(self):
+        RevenueEntry.objects.update(service_line_key='', sub_service_line_key='')
+        migration = importlib.import_module('core_dashboard.migrations.0010_service_line_keys')
+        migration.backfill_keys(apps, None)
+        self.assertEqual(RevenueEntry.objects.filter(service_line_key='consultoria').count(), 3)
+        self.assertEqual(RevenueEntry.objects.filter(sub_service_line_key='technology risk').count(), 3)
+
+    def test_batch_serves_every_line_from_one_query(self):
+        get_generation(week_scope(WEEK))
+        with self.assertNumQueries(2):  # week generation, grouped query
+            lines = ServiceLineCardsService().get_all_cards(start_date=WEEK, end_date=WEEK)
+        self.assertEqual([line['sl_name'] for line in lines], ['CONSULTORIA', 'Tax'])
+        self.assertEqual(lines[1]['cards'][0], {'key': 'ANSR_YTD', 'label': 'ANSR YTD', 'value': 7.0})
+        subs = SubServiceLineCardsService().get_all_cards(start_date=WEEK, end_date=WEEK)
+        self.assertEqual([(line['ssl_name'], line['cards'][0]['value']) for line in subs], [('Technology Risk', 175.0)])
+
+        # Single-line calls of the same week hit the cached batch
+        with self.assertNumQueries(1):  # week generation only
+            self.assertEqual(ServiceLineAnalyticsService().get_sl_cards('TAX', WEEK, WEEK)['sl_fytd_ansr_value'], 7.0)
+
+        RevenueEntry.objects.filter(service_line_key='tax').update(fytd_ansr_sintetico=9.0)
+        bump_weeks([WEEK])
+        self.assertEqual(ServiceLineAnalyticsService().get_sl_cards('Tax', WEEK, WEEK)['sl_fytd_ansr_value'], 9.0)
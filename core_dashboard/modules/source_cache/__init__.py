@@ -0,0 +1,32 @@
+"""
+Source Cache Module
+===================
+
+Parsed-source cache of the import workbooks. The Engagement List and Revenue
+Days sheets are parsed once per file content: the frame is stored as Parquet
+(pickle when pyarrow is not installed) keyed by the file's SHA-256 and the
+sheet, with the detected header row recorded alongside, so re-running a week
+for a logic fix reads the stored frame instead of parsing the workbook twice
+again. Entries not read for SOURCE_CACHE_MAX_AGE_DAYS, or beyond
+SOURCE_CACHE_MAX_BYTES, are pruned; a full data purge clears the cache.
+"""
+
+from .services import (
+    CACHE_VERSION,
+    cache_dir,
+    file_sha256,
+    load_source,
+    get_entries,
+    prune,
+    clear,
+)
+
+__all__ = [
+    'CACHE_VERSION',
+    'cache_dir',
+    'file_sha256',
+    'load_source',
+    'get_entries',
+    'prune',
+    'clear',
+]
@@ -0,0 +1,216 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+from django.conf import settings
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parsing rules change so entries of older rules are never read
+CACHE_VERSION = 1
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+HASH_CHUNK_SIZE = 1024 * 1024
+CACHE_SUBDIR = 'parsed_sources'  # under MEDIA_ROOT
+
+
+def cache_dir():
+    """Directory of the parsed sources; None when the cache is disabled.
+
+    Without an explicit SOURCE_CACHE_DIR it follows the current MEDIA_ROOT, so
+    a run under another media folder never writes into the real one.
+    """
+    if hasattr(settings, 'SOURCE_CACHE_DIR'):
+        return settings.SOURCE_CACHE_DIR
+    return os.path.join(settings.MEDIA_ROOT, CACHE_SUBDIR)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_base(directory, sha256, sheet_name, expected_columns, max_header_rows):
+    # The detected header row depends on the expected columns, so they are part of the key
+    raw = json.dumps([CACHE_VERSION, sheet_name, list(expected_columns), max_header_rows])
+    key = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(directory, sha256[:2], f'{sha256}-{key}')
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _store(base, frame, meta):
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    data_format = None
+    if pyarrow is not None:
+        try:
+            _write_atomic(base + '.parquet', lambda p: frame.to_parquet(p, index=False))
+            data_format = 'parquet'
+        except Exception as e:
+            # Mixed-type object columns (ids stored as numbers and text) have no Parquet type
+            logger.info(f"Parsed source {os.path.basename(base)} not storable as Parquet ({e}); using pickle")
+    if data_format is None:
+        _write_atomic(base + '.pkl', lambda p: frame.to_pickle(p))
+        data_format = 'pickle'
+    meta['format'] = data_format
+    # The metadata file is written last: an entry without it is incomplete and never read
+    _write_atomic(base + '.json', lambda p: _dump_json(p, meta))
+    return data_format
+
+
+def _dump_json(path, value):
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(value, fh, indent=2)
+
+
+def _data_path(base, meta):
+    return base + ('.parquet' if meta.get('format') == 'parquet' else '.pkl')
+
+
+def _read(base, meta):
+    path = _data_path(base, meta)
+    frame = pd.read_parquet(path) if meta.get('format') == 'parquet' else pd.read_pickle(path)
+    os.utime(path)  # last access, for prune()
+    return frame
+
+
+def load_source(path, sheet_name, expected_columns, max_header_rows, parse):
+    """The parsed frame of sheet `sheet_name` of the workbook at `path`, from the cache when
+    the same file content was parsed before with the same header search.
+
+    `parse()` does the actual parsing and returns (frame, sheet found, header row). The
+    frame is stored as Parquet (pickle when pyarrow is not installed or the frame has no
+    Parquet schema) next to a JSON record of the source hash, sheet and header row.
+    """
+    directory = cache_dir()
+    if not directory:
+        return parse()[0]
+    try:
+        sha256 = file_sha256(path)
+    except OSError:
+        return parse()[0]
+    base = _entry_base(directory, sha256, sheet_name, expected_columns, max_header_rows)
+
+    meta = _read_meta(base + '.json')
+    if meta is not None:
+        try:
+            frame = _read(base, meta)
+            logger.info(f"Parsed source cache hit for {os.path.basename(path)} "
+                        f"(sheet {meta.get('sheet')!r}, header row {meta.get('header_row')})")
+            return frame
+        except Exception as e:
+            logger.warning(f"Unreadable parsed-source cache entry {base}: {e}; parsing again")
+
+    frame, sheet, header_row = parse()
+    meta = {
+        'cache_version': CACHE_VERSION,
+        'source_sha256': sha256,
+        'source_name': os.path.basename(path),
+        'requested_sheet': sheet_name,
+        'sheet': sheet,
+        'header_row': header_row,
+        'expected_columns': list(expected_columns),
+        'columns': [str(c) for c in frame.columns],
+        'rows': len(frame),
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    try:
+        _store(base, frame, meta)
+        prune()
+    except Exception as e:
+        # The cache never fails an import
+        logger.warning(f"Could not cache parsed source {os.path.basename(path)}: {e}")
+    return frame
+
+
+def get_entries():
+    """Metadata of every complete cache entry, with its data `path`, `size` and `accessed` time."""
+    directory = cache_dir()
+    entries = []
+    if not directory or not os.path.isdir(directory):
+        return entries
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith('.json'):
+                continue
+            base = os.path.join(root, name[:-len('.json')])
+            meta = _read_meta(base + '.json')
+            if meta is None:
+                continue
+            path = _data_path(base, meta)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append({**meta, 'base': base, 'path': path, 'size': stat.st_size, 'accessed': stat.st_mtime})
+    return entries
+
+
+def _remove(base):
+    for ext in ('.json', '.parquet', '.pkl'):
+        try:
+            os.remove(base + ext)
+        except FileNotFoundError:
+            pass
+
+
+def prune(max_age_days=None, max_bytes=None):
+    """Cleanup policy: drop entries not read for `max_age_days` (SOURCE_CACHE_MAX_AGE_DAYS),
+    then the least recently read ones until the cache fits in `max_bytes`
+    (SOURCE_CACHE_MAX_BYTES). Returns the number of entries removed."""
+    if max_age_days is None:
+        max_age_days = getattr(settings, 'SOURCE_CACHE_MAX_AGE_DAYS', DEFAULT_MAX_AGE_DAYS)
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'SOURCE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+    entries = sorted(get_entries(), key=lambda e: e['accessed'])
+    cutoff = time.time() - max_age_days * 86400
+    total = sum(e['size'] for e in entries)
+    removed = 0
+    for entry in entries:
+        if entry['accessed'] >= cutoff and total <= max_bytes:
+            break
+        _remove(entry['base'])
+        total -= entry['size']
+        removed += 1
+    return removed
+
+
+def clear():
+    """Remove every parsed source; returns the number of entries removed."""
+    directory = cache_dir()
+    removed = len(get_entries())
+    if directory and os.path.isdir(directory):
+        shutil.rmtree(directory, ignore_errors=True)
+    return removed
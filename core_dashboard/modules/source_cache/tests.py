@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+import pandas as pd
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from core_dashboard.modules.hooks import notify_data_invalidated
+from core_dashboard.modules.synthetic_data import SyntheticDataset
+from process_uploaded_data import _load_file
+
+from .services import cache_dir, get_entries, load_source, prune
+
+REVENUE_COLUMNS = ['Employee Country/Region', 'Employee']
+
+
+class SourceCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.cache = os.path.join(self.directory, 'parsed_sources')
+        override = override_settings(SOURCE_CACHE_DIR=self.cache)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.parses = 0
+
+    def source(self, name, content=b'workbook'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as fh:
+            fh.write(content)
+        return path
+
+    def parse(self, rows=3):
+        def parse():
+            self.parses += 1
+            return pd.DataFrame({'Employee': [f'E{i}' for i in range(rows)], 'Days': range(rows)}), 'RevenueDays', 2
+        return parse
+
+    def test_workbook_sheets_are_parsed_once(self):
+        paths = SyntheticDataset(partners=2, managers=3, engagements=10, weeks=1, seed=1).write_workbooks(self.directory)
+        revenue = _load_file(paths['revenue_days'], REVENUE_COLUMNS, sheet_name='RevenueDays')
+        with patch('pandas.ExcelFile', side_effect=AssertionError('workbook parsed again')):
+            again = _load_file(paths['revenue_days'], REVENUE_COLUMNS, sheet_name='RevenueDays')
+        pd.testing.assert_frame_equal(revenue, again)
+        self.assertIn('Total Revenue Days.3', again.columns)
+
+        [entry] = get_entries()
+        self.assertEqual(entry['sheet'], 'RevenueDays')
+        self.assertGreater(entry['header_row'], 0)  # below the title preamble
+        self.assertEqual(entry['rows'], len(revenue))
+        self.assertEqual(entry['source_sha256'][:2], os.path.basename(os.path.dirname(entry['base'])))
+
+        # Another header search of the same file is another entry
+        _load_file(paths['revenue_days'], ['Employee'], sheet_name='RevenueDays')
+        self.assertEqual(len(get_entries()), 2)
+
+    def test_keyed_by_content(self):
+        path = self.source('Revenue_days.xlsb')
+        load_source(path, 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+        frame = load_source(path, 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+        self.assertEqual(self.parses, 1)
+        self.assertEqual(list(frame['Employee']), ['E0', 'E1', 'E2'])
+
+        # A copy under another name is the same source; changed bytes are not
+        load_source(self.source('copy.xlsb'), 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+        self.assertEqual(self.parses, 1)
+        self.source('Revenue_days.xlsb', b'corrected workbook')
+        load_source(path, 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+        self.assertEqual(self.parses, 2)
+
+    def test_prune_by_age_then_size(self):
+        for i in range(3):
+            load_source(self.source(f'week{i}.xlsx', f'workbook {i}'.encode()), 'RevenueDays', REVENUE_COLUMNS, 10,
+                        self.parse(rows=100))
+        entries = sorted(get_entries(), key=lambda e: e['source_name'])
+        old = time.time() - 40 * 86400
+        os.utime(entries[0]['path'], (old, old))
+        self.assertEqual(prune(max_age_days=30), 1)
+        self.assertEqual(sorted(e['source_name'] for e in get_entries()), ['week1.xlsx', 'week2.xlsx'])
+
+        # Reading an entry makes it the most recently used one
+        os.utime(entries[2]['path'], (old + 10, old + 10))
+        load_source(self.source('week2.xlsx', b'workbook 2'), 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+        self.assertEqual(prune(max_age_days=365, max_bytes=entries[2]['size']), 1)
+        self.assertEqual([e['source_name'] for e in get_entries()], ['week2.xlsx'])
+
+    def test_disabled_cache_always_parses(self):
+        path = self.source('Revenue_days.xlsb')
+        with override_settings(SOURCE_CACHE_DIR=None):
+            load_source(path, 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+            load_source(path, 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+        self.assertEqual(self.parses, 2)
+        self.assertFalse(os.path.exists(self.cache))
+
+    def test_full_purge_clears_the_cache(self):
+        load_source(self.source('Revenue_days.xlsb'), 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+        notify_data_invalidated(scope='weeks', weeks=[])
+        self.assertEqual(len(get_entries()), 1)
+        notify_data_invalidated(scope='all')
+        self.assertEqual(get_entries(), [])
+
+    def test_default_directory_follows_media_root(self):
+        with override_settings(MEDIA_ROOT=self.directory):
+            del settings.SOURCE_CACHE_DIR
+            self.assertEqual(cache_dir(), os.path.join(self.directory, 'parsed_sources'))
+            load_source(self.source('Revenue_days.xlsb'), 'RevenueDays', REVENUE_COLUMNS, 10, self.parse())
+        self.assertTrue(os.listdir(os.path.join(self.directory, 'parsed_sources')))
@@ -7,8 +7,8 @@ and returns the four KPI values required by the dashboard cards.
 """
 
 import logging
-from django.db.models import Sum, Q
-from core_dashboard.models import RevenueEntry
+from core_dashboard.modules.service_line_cards.analytics import CARD_FIELDS, line_cards_batch
+from core_dashboard.utils import normalize_key
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +16,9 @@ logger = logging.getLogger(__name__)
 class SubServiceLineAnalyticsService:
     """Calculate aggregates for a given Sub Service Line (SSL).
 
-    Public method:
+    Public methods:
       - get_ssl_cards(ssl_name, start_date=None, end_date=None)
+      - get_all_ssl_cards(start_date=None, end_date=None)
 
     Returns a dict with keys:
       - ssl_fytd_ansr_value
@@ -39,36 +40,26 @@ class SubServiceLineAnalyticsService:
                 logger.warning("Empty SSL name provided to SubServiceLineAnalyticsService")
                 return self._empty_cards()
 
-            # Normalize input and match the engagement_sub_service_line field
-            normalized_ssl = ssl_name.strip() if isinstance(ssl_name, str) else ssl_name
-            qs = RevenueEntry.objects.filter(engagement_sub_service_line__iexact=normalized_ssl)
-
-            # Apply date filtering if provided
-            if start_date and end_date:
-                qs = qs.filter(date__range=[start_date, end_date])
-
-            if not qs.exists():
+            # Served from the batch of every (sub) service line of the week
+            cards = line_cards_batch(start_date, end_date)['sub_service_lines'].get(normalize_key(ssl_name))
+            if not cards:
                 logger.info(f"No entries found for SSL: {ssl_name}")
                 return self._empty_cards()
 
-            aggregates = qs.aggregate(
-                fytd_ansr=Sum('fytd_ansr_sintetico'),
-                fytd_hours=Sum('fytd_charged_hours'),
-                mtd_ansr=Sum('mtd_ansr_amt'),
-                mtd_hours=Sum('mtd_charged_hours'),
-            )
-
-            return {
-                'ssl_fytd_ansr_value': float(aggregates.get('fytd_ansr') or 0.0),
-                'ssl_fytd_charged_hours': float(aggregates.get('fytd_hours') or 0.0),
-                'ssl_mtd_ansr_value': float(aggregates.get('mtd_ansr') or 0.0),
-                'ssl_mtd_charged_hours': float(aggregates.get('mtd_hours') or 0.0),
-            }
+            return {f'ssl_{value}': cards[value] for value in CARD_FIELDS}
 
         except Exception as e:
             logger.error(f"Error computing SSL cards for {ssl_name}: {e}")
             return self._empty_cards()
 
+    def get_all_ssl_cards(self, start_date=None, end_date=None):
+        """{SSL name: the four values of get_ssl_cards} for every sub service line of the period."""
+        batch = line_cards_batch(start_date, end_date)['sub_service_lines']
+        return {
+            cards['name']: {f'ssl_{value}': cards[value] for value in CARD_FIELDS}
+            for cards in batch.values()
+        }
+
     def _empty_cards(self):
         return {
             'ssl_fytd_ansr_value': 0.0,
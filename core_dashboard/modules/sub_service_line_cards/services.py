@@ -42,3 +42,23 @@ class SubServiceLineCardsService:
                     {'key': 'Horas_MTD', 'label': 'Horas Cargadas MTD', 'value': 0.0},
                 ]
             }
+
+    def get_all_cards(self, start_date=None, end_date=None):
+        """Cards of every sub service line of the period ({'ssl_name', 'cards'} list, by name)."""
+        try:
+            data = self.analytics.get_all_ssl_cards(start_date=start_date, end_date=end_date)
+        except Exception as e:
+            logger.error(f"Error in get_all_cards: {e}")
+            return []
+        return [
+            {
+                'ssl_name': name,
+                'cards': [
+                    {'key': 'ANSR_YTD', 'label': 'ANSR YTD', 'value': values['ssl_fytd_ansr_value']},
+                    {'key': 'Horas_YTD', 'label': 'Horas Cargadas YTD', 'value': values['ssl_fytd_charged_hours']},
+                    {'key': 'ANSR_MTD', 'label': 'ANSR MTD', 'value': values['ssl_mtd_ansr_value']},
+                    {'key': 'Horas_MTD', 'label': 'Horas Cargadas MTD', 'value': values['ssl_mtd_charged_hours']},
+                ],
+            }
+            for name, values in sorted(data.items())
+        ]
@@ -0,0 +1,39 @@
+"""
+Synthetic Data Module
+=====================
+
+Deterministic synthetic datasets for load testing at any scale: N partners,
+managers, clients and engagements over a number of weekly reports (or fiscal
+years), generated from a seed.
+
+- `SyntheticDataset.write_database` bulk-inserts the RevenueEntry history
+  (with its clients, contracts and service lines), one transaction per week
+- `SyntheticDataset.write_workbooks` writes the matching uploads of a week:
+  Engagement List ('DATA ENG LIST'), Diferencial ('DATA DIFERENCIAL'),
+  Revenue Days ('RevenueDays'), Cobranzas ('Cobranzas') and Facturacion
+  (the 'FYxx' sheet), with the real sheet names and headers
+
+`python manage.py generate_synthetic_data` drives both from the command line.
+"""
+
+from .services import (
+    ENGAGEMENT_COLUMNS,
+    ENGAGEMENT_SHEET,
+    DIF_COLUMNS,
+    DIF_SHEET,
+    REVENUE_DAYS_SHEET,
+    COBRANZAS_SHEET,
+    SERVICE_LINES,
+    SyntheticDataset,
+)
+
+__all__ = [
+    'COBRANZAS_SHEET',
+    'DIF_COLUMNS',
+    'DIF_SHEET',
+    'ENGAGEMENT_COLUMNS',
+    'ENGAGEMENT_SHEET',
+    'REVENUE_DAYS_SHEET',
+    'SERVICE_LINES',
+    'SyntheticDataset',
+]
@@ -0,0 +1,323 @@
+"""
+Deterministic synthetic data at configurable scale.
+
+`SyntheticDataset` draws a fixed roster (partners, managers, clients,
+engagements with their service lines and rates) from a seed and derives every
+weekly report from it, so the database rows and the workbooks of a week
+always agree and two runs with the same arguments are identical.
+"""
+import datetime
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from core_dashboard.utils import fiscal_year_label, get_fiscal_month_year, mock_managers, mock_partners, normalize_key
+
+logger = logging.getLogger(__name__)
+
+SERVICE_LINES = {
+    'Assurance': ['Audit', 'FSO Assurance', 'Forensics'],
+    'Consulting': ['Technology Consulting', 'Business Consulting', 'Risk'],
+    'Tax': ['Business Tax Services', 'Indirect Tax', 'People Advisory Services'],
+    'Strategy and Transactions': ['Transaction Diligence', 'Valuation'],
+}
+
+# Sheet names and headers of the real uploads
+ENGAGEMENT_SHEET = 'DATA ENG LIST'
+DIF_SHEET = 'DATA DIFERENCIAL'
+REVENUE_DAYS_SHEET = 'RevenueDays'
+COBRANZAS_SHEET = 'Cobranzas'
+ENGAGEMENT_COLUMNS = [
+    'EngagementID', 'Engagement', 'EngagementPartner', 'EngagementManager',
+    'Client', 'EngagementServiceLine', 'EngagementSubServiceLine',
+    'FYTD_ChargedHours', 'FYTD_DirectCostAmt', 'FYTD_ANSRAmt',
+    'MTD_ChargedHours', 'MTD_DirectCostAmt', 'MTD_ANSRAmt', 'CP_ANSRAmt',
+    'FYTD_ARCollectedAmt', 'FYTD_ARCollectedTaxAmt', 'FYTD_TotalBilledAmt',
+    'FYTD_ANSRAmt (Sintético)', 'Perdida Dif. Camb.',
+]
+DIF_COLUMNS = ['Socio', 'Gerente', 'Perdida al tipo de cambio Monitor', 'Fecha de Cobro', 'Engagement']
+# CP, MTD, FYTD and 52-week blocks repeat the same three headers, as in the real report
+REVENUE_DAYS_BLOCKS = ('CP', 'MTD', 'FYTD', '52WKS')
+REVENUE_DAYS_KINDS = ('Total Revenue Days', 'Billed Revenue Days', 'Unbilled Revenue Days')
+PAYMENT_COLUMNS = [
+    'Cliente',
+    'Fecha de Cobro',
+    'Tipo de Cambio del día del pago recibido en Cuenta Bancaria BCV',
+    'Monto en Bolívares de la Factura',
+    'Monto equivalente en USD de los VES Cobrados',
+    'Monto en Dólares de la Factura',
+]
+
+
+def fiscal_year_start(report_date):
+    """July 1st opening the fiscal year of report_date."""
+    return datetime.date(2000 + int(fiscal_year_label(report_date)[2:]) - 1, 7, 1)
+
+
+class SyntheticDataset:
+    """Weekly reports for a seeded roster, ending on the Friday on/before end_date."""
+
+    def __init__(self, partners=12, managers=40, clients=None, engagements=200, weeks=104,
+                 end_date=None, seed=42):
+        self.partners = mock_partners(max(1, partners))
+        self.managers = mock_managers(max(1, managers))
+        self.clients = [f'Client {i:04d}' for i in range(max(1, clients or engagements // 4))]
+        self.engagements = max(1, engagements)
+        self.seed = seed
+        end_date = end_date or datetime.date(2025, 9, 26)
+        end_date -= datetime.timedelta(days=(end_date.weekday() - 4) % 7)
+        self.report_dates = [end_date - datetime.timedelta(weeks=w) for w in reversed(range(max(1, weeks)))]
+        self.sub_service_lines = [(sl, ssl) for sl, ssls in SERVICE_LINES.items() for ssl in ssls]
+
+        # Round-robin roster: every partner, manager, client and sub service
+        # line owns engagements as soon as there are enough of them
+        n = self.engagements
+        idx = np.arange(n)
+        self.roster = pd.DataFrame({
+            'EngagementID': [f'E-{e:05d}' for e in idx],
+            'Engagement': [f'Engagement {e:05d}' for e in idx],
+            'EngagementPartner': [self.partners[e % len(self.partners)] for e in idx],
+            'EngagementManager': [self.managers[e % len(self.managers)] for e in idx],
+            'Client': [self.clients[e % len(self.clients)] for e in idx],
+            'EngagementServiceLine': [self.sub_service_lines[e % len(self.sub_service_lines)][0] for e in idx],
+            'EngagementSubServiceLine': [self.sub_service_lines[e % len(self.sub_service_lines)][1] for e in idx],
+        })
+        rng = np.random.default_rng(seed)
+        # Engagement economics: weekly ANSR, cost ratio, hourly rate, weekly FX differential
+        self.weekly_ansr = rng.lognormal(8.0, 1.0, n)
+        self.cost_ratio = rng.uniform(0.3, 0.7, n)
+        self.hourly_rate = rng.uniform(60, 250, n)
+        self.weekly_differential = rng.normal(60, 120, n)
+        self.collected_ratio = rng.uniform(0.5, 0.95, n)
+
+        # Weeks elapsed in the fiscal year / fiscal month at each report date
+        self._ytd_weeks, self._mtd_weeks = {}, {}
+        fiscal_year = fiscal_period = None
+        for report_date in self.report_dates:
+            if fiscal_year_label(report_date) != fiscal_year:
+                fiscal_year, ytd = fiscal_year_label(report_date), 0
+            if get_fiscal_month_year(report_date) != fiscal_period:
+                fiscal_period, mtd = get_fiscal_month_year(report_date), 0
+            ytd, mtd = ytd + 1, mtd + 1
+            self._ytd_weeks[report_date], self._mtd_weeks[report_date] = ytd, mtd
+
+    def _rng(self, report_date, stream):
+        return np.random.default_rng([self.seed, report_date.toordinal(), stream])
+
+    @property
+    def rows(self):
+        return self.engagements * len(self.report_dates)
+
+    def engagement_frame(self, report_date):
+        """The week's Engagement List (ENGAGEMENT_COLUMNS), one row per engagement."""
+        ytd, mtd = self._ytd_weeks[report_date], self._mtd_weeks[report_date]
+        noise = self._rng(report_date, 0).normal(1.0, 0.05, self.engagements)
+        week_ansr = self.weekly_ansr * noise
+        frame = self.roster.copy()
+        frame['FYTD_ANSRAmt'] = (week_ansr * ytd).round(2)
+        frame['MTD_ANSRAmt'] = (week_ansr * mtd).round(2)
+        frame['CP_ANSRAmt'] = week_ansr.round(2)
+        frame['FYTD_ChargedHours'] = (frame['FYTD_ANSRAmt'] / self.hourly_rate).round(1)
+        frame['MTD_ChargedHours'] = (frame['MTD_ANSRAmt'] / self.hourly_rate).round(1)
+        frame['FYTD_DirectCostAmt'] = (frame['FYTD_ANSRAmt'] * self.cost_ratio).round(2)
+        frame['MTD_DirectCostAmt'] = (frame['MTD_ANSRAmt'] * self.cost_ratio).round(2)
+        frame['FYTD_TotalBilledAmt'] = (frame['FYTD_ANSRAmt'] * 0.9).round(2)
+        frame['FYTD_ARCollectedAmt'] = (frame['FYTD_TotalBilledAmt'] * self.collected_ratio).round(2)
+        frame['FYTD_ARCollectedTaxAmt'] = (frame['FYTD_ARCollectedAmt'] * 0.16).round(2)
+        frame['FYTD_ANSRAmt (Sintético)'] = frame['FYTD_ANSRAmt']
+        frame['Perdida Dif. Camb.'] = (self.weekly_differential * ytd).round(2)
+        return frame[ENGAGEMENT_COLUMNS]
+
+    def revenue_days_frame(self, report_date):
+        """Revenue Days per employee: every partner and manager plus a few outside Venezuela."""
+        rng = self._rng(report_date, 1)
+        people = [(name, 'Partner') for name in self.partners]
+        people += [(name, 'Senior Manager' if i % 3 else 'Manager') for i, name in enumerate(self.managers)]
+        people += [(f'Foreign Manager {i}', 'Manager') for i in range(3)]
+        count = len(people)
+        columns = {
+            'Employee': [name for name, _ in people],
+            'Employee Country/Region': ['Venezuela'] * (count - 3) + ['Colombia'] * 3,
+            'Employee Rank': [rank for _, rank in people],
+        }
+        blocks = []
+        weeks = {'CP': 1, 'MTD': self._mtd_weeks[report_date], 'FYTD': self._ytd_weeks[report_date], '52WKS': 52}
+        for block in REVENUE_DAYS_BLOCKS:
+            total = (rng.uniform(1, 5, count) * weeks[block]).round(1)
+            billed = (total * rng.uniform(0.6, 1.0, count)).round(1)
+            blocks.append(pd.DataFrame([total, billed, (total - billed).round(1)], index=REVENUE_DAYS_KINDS).T)
+        frame = pd.concat([pd.DataFrame(columns)] + blocks, axis=1)
+        frame['25Billings FYTD'] = rng.uniform(1_000, 200_000, count).round(2)
+        return frame
+
+    def partner_revenue_days(self, report_date):
+        """{partner: CP Total Revenue Days} as the import maps it onto each engagement row."""
+        frame = self.revenue_days_frame(report_date)
+        cp_total = frame.iloc[:, 3]
+        return dict(zip(frame['Employee'], cp_total))
+
+    def write_database(self, batch_size=2000, report_dates=None, replace=True, progress=None):
+        """Insert the weekly RevenueEntry rows (and their dimensions) with bulk_create.
+
+        One transaction per week keeps memory flat at any scale; with replace
+        the rows already stored for those dates are deleted first. The
+        report-week registry is synced and every data generation bumped at
+        the end. Returns the number of rows written.
+        """
+        from core_dashboard.models import RevenueEntry
+        from core_dashboard.modules.data_cache import bump_all
+        from core_dashboard.modules.db_tuning import resolve_dimensions
+        from core_dashboard.modules.people import resolve_people
+        from core_dashboard.modules.report_weeks import sync_from_entries
+
+        dimensions = resolve_dimensions(
+            self.roster[['Client', 'EngagementServiceLine', 'EngagementSubServiceLine', 'Engagement']].itertuples(index=False),
+            self.report_dates[0],
+            batch_size=batch_size,
+        )
+        clients, sub_areas, contracts = dimensions['clients'], dimensions['sub_areas'], dimensions['contracts']
+        people = resolve_people(self.roster['EngagementPartner'], self.roster['EngagementManager'], batch_size=batch_size)
+        partners, managers = people['partners'], people['managers']
+        line_keys = {
+            name: normalize_key(name)
+            for name in pd.concat([self.roster['EngagementServiceLine'], self.roster['EngagementSubServiceLine']]).unique()
+        }
+
+        written = 0
+        dates = report_dates or self.report_dates
+        for i, report_date in enumerate(dates, start=1):
+            frame = self.engagement_frame(report_date)
+            revenue_days = self.partner_revenue_days(report_date)
+            fiscal_period = get_fiscal_month_year(report_date)
+            mtd_differential = self.weekly_differential * self._mtd_weeks[report_date]
+            with transaction.atomic():
+                if replace:
+                    RevenueEntry.objects.filter(date=report_date).delete()
+                entries = []
+                for row, mtd_diff in zip(frame.itertuples(index=False, name=None), mtd_differential):
+                    rec = dict(zip(ENGAGEMENT_COLUMNS, row))
+                    client = clients[rec['Client']]
+                    sub_area = sub_areas[(rec['EngagementServiceLine'], rec['EngagementSubServiceLine'])]
+                    entries.append(RevenueEntry(
+                        date=report_date,
+                        client=client,
+                        contract=contracts[(rec['Client'], rec['Engagement'])],
+                        area=sub_area.area,
+                        sub_area=sub_area,
+                        revenue=rec['FYTD_ANSRAmt'],
+                        engagement_partner=rec['EngagementPartner'],
+                        engagement_manager=rec['EngagementManager'],
+                        partner=partners[rec['EngagementPartner']],
+                        manager=managers[rec['EngagementManager']],
+                        engagement_id=rec['EngagementID'],
+                        engagement=rec['Engagement'],
+                        engagement_service_line=rec['EngagementServiceLine'],
+                        engagement_sub_service_line=rec['EngagementSubServiceLine'],
+                        service_line_key=line_keys[rec['EngagementServiceLine']],
+                        sub_service_line_key=line_keys[rec['EngagementSubServiceLine']],
+                        fytd_charged_hours=rec['FYTD_ChargedHours'],
+                        fytd_direct_cost_amt=rec['FYTD_DirectCostAmt'],
+                        fytd_ansr_amt=rec['FYTD_ANSRAmt'],
+                        mtd_charged_hours=rec['MTD_ChargedHours'],
+                        mtd_direct_cost_amt=rec['MTD_DirectCostAmt'],
+                        mtd_ansr_amt=rec['MTD_ANSRAmt'],
+                        cp_ansr_amt=rec['CP_ANSRAmt'],
+                        duplicate_engagement_id=0,
+                        original_week_string=report_date.strftime('%Y-%m-%d'),
+                        periodo_fiscal=fiscal_period,
+                        fytd_diferencial_final=rec['Perdida Dif. Camb.'],
+                        diferencial_mtd=round(float(mtd_diff), 2),
+                        fytd_ansr_sintetico=rec['FYTD_ANSRAmt (Sintético)'],
+                        total_revenue_days_p_cp=revenue_days.get(rec['EngagementPartner']),
+                        fytd_ar_collected_amt=rec['FYTD_ARCollectedAmt'],
+                        fytd_ar_collected_tax_amt=rec['FYTD_ARCollectedTaxAmt'],
+                        fytd_total_billed_amt=rec['FYTD_TotalBilledAmt'],
+                    ))
+                RevenueEntry.objects.bulk_create(entries, batch_size=batch_size)
+            written += len(entries)
+            if progress:
+                progress(i, len(dates), report_date)
+        sync_from_entries()
+        bump_all()
+        return written
+
+    def write_workbooks(self, directory, report_date=None):
+        """Write the five upload workbooks of one report week (default: the last) into directory.
+
+        Returns {'engagement_list', 'dif', 'revenue_days', 'cobranzas',
+        'facturacion': path}, named the way the upload view stores them.
+        """
+        report_date = report_date or self.report_dates[-1]
+        os.makedirs(directory, exist_ok=True)
+        stamp = report_date.strftime('%Y-%m-%d')
+        paths = {
+            'engagement_list': os.path.join(directory, f'Engagement_df_{stamp}.xlsx'),
+            'dif': os.path.join(directory, f'Dif_df_{stamp}.xlsx'),
+            'revenue_days': os.path.join(directory, f'Revenue_days_{stamp}.xlsx'),
+            'cobranzas': os.path.join(directory, f'Cobranzas_{stamp}.xlsx'),
+            'facturacion': os.path.join(directory, f'Facturacion_{stamp}.xlsx'),
+        }
+        engagements = self.engagement_frame(report_date)
+        _write_sheet(paths['engagement_list'], ENGAGEMENT_SHEET, engagements,
+                     preamble=['Engagement List', f'Week ending {stamp}'])
+        _write_sheet(paths['dif'], DIF_SHEET, self._dif_frame(report_date, engagements),
+                     preamble=['Acumulado Diferencia en Cambio'])
+        _write_sheet(paths['revenue_days'], REVENUE_DAYS_SHEET, self.revenue_days_frame(report_date),
+                     preamble=['Revenue Days Report', f'Week ending {stamp}', '', 'Detail', '', '', '', ''])
+        _write_sheet(paths['cobranzas'], COBRANZAS_SHEET, self._payments_frame(report_date))
+        _write_sheet(paths['facturacion'], fiscal_year_label(report_date), self._billing_frame(report_date))
+        return paths
+
+    def _dif_frame(self, report_date, engagements):
+        rng = self._rng(report_date, 2)
+        days_back = rng.integers(0, 120, self.engagements)
+        return pd.DataFrame({
+            'Socio': engagements['EngagementPartner'],
+            'Gerente': engagements['EngagementManager'],
+            'Perdida al tipo de cambio Monitor': engagements['Perdida Dif. Camb.'],
+            'Fecha de Cobro': [report_date - datetime.timedelta(days=int(d)) for d in days_back],
+            'Engagement': engagements['Engagement'],
+        })[DIF_COLUMNS]
+
+    def _payments_frame(self, report_date):
+        """Cobranzas payments spread over the fiscal year to date."""
+        rng = self._rng(report_date, 3)
+        start = fiscal_year_start(report_date)
+        days = max(1, (report_date - start).days + 1)
+        n = self.engagements * 2
+        bcv = rng.uniform(35, 160, n)
+        usd = rng.uniform(200, 20_000, n).round(2)
+        ves = (usd * bcv).round(2)
+        return pd.DataFrame({
+            'Cliente': [self.clients[i] for i in rng.integers(0, len(self.clients), n)],
+            'Fecha de Cobro': pd.to_datetime([start + datetime.timedelta(days=int(d)) for d in rng.integers(0, days, n)]),
+            PAYMENT_COLUMNS[2]: bcv.round(4),
+            'Monto en Bolívares de la Factura': ves,
+            'Monto equivalente en USD de los VES Cobrados': (ves / bcv).round(2),
+            'Monto en Dólares de la Factura': usd,
+        })[PAYMENT_COLUMNS]
+
+    def _billing_frame(self, report_date):
+        """Facturacion lines, one accounting cycle per report Friday of the fiscal year."""
+        rng = self._rng(report_date, 4)
+        start = fiscal_year_start(report_date)
+        fridays = [d for d in (report_date - datetime.timedelta(weeks=w) for w in range(53)) if d >= start] or [report_date]
+        n = self.engagements * 2
+        return pd.DataFrame({
+            'Engagement ID': [f'E-{i % self.engagements:05d}' for i in range(n)],
+            'Net Amount Local': rng.uniform(100, 30_000, n).round(2),
+            'Accounting Cycle Date': [fridays[int(i)].strftime('%Y-%m-%d') for i in rng.integers(0, len(fridays), n)],
+            'Fiscal Year': str(2000 + int(fiscal_year_label(report_date)[2:])),
+            'Engagement Country/Region': rng.choice(['Venezuela', 'Venezuela', 'Venezuela', 'Colombia'], n),
+        })
+
+
+def _write_sheet(path, sheet_name, frame, preamble=()):
+    """One-sheet workbook; preamble lines go above the header row like in the real exports."""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        if preamble:
+            pd.DataFrame([[line] for line in preamble]).to_excel(writer, index=False, header=False, sheet_name=sheet_name)
+        frame.to_excel(writer, index=False, sheet_name=sheet_name, startrow=len(preamble))
@@ -0,0 +1,88 @@
+import datetime
+import shutil
+import tempfile
+
+import pandas as pd
+from django.test import TestCase
+
+from core_dashboard.models import Client, ReportWeek, RevenueEntry
+from core_dashboard.modules.manager_revenue_days.utils import extract_revenue_days_sheet
+from core_dashboard.utils import fiscal_year_label
+from process_uploaded_data import _load_file
+
+from .services import DIF_COLUMNS, ENGAGEMENT_COLUMNS, SyntheticDataset
+
+
+class SyntheticDatasetTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.dataset = SyntheticDataset(partners=3, managers=5, clients=4, engagements=20, weeks=8, seed=7)
+
+    def test_same_seed_same_data(self):
+        again = SyntheticDataset(partners=3, managers=5, clients=4, engagements=20, weeks=8, seed=7)
+        other = SyntheticDataset(partners=3, managers=5, clients=4, engagements=20, weeks=8, seed=8)
+        last = self.dataset.report_dates[-1]
+        pd.testing.assert_frame_equal(self.dataset.engagement_frame(last), again.engagement_frame(last))
+        pd.testing.assert_frame_equal(self.dataset.revenue_days_frame(last), again.revenue_days_frame(last))
+        self.assertFalse(self.dataset.engagement_frame(last).equals(other.engagement_frame(last)))
+
+    def test_roster_scale(self):
+        frame = self.dataset.engagement_frame(self.dataset.report_dates[-1])
+        self.assertEqual(len(frame), 20)
+        self.assertEqual(frame['EngagementPartner'].nunique(), 3)
+        self.assertEqual(frame['EngagementManager'].nunique(), 5)
+        self.assertEqual(frame['Client'].nunique(), 4)
+        self.assertTrue(all(d.weekday() == 4 for d in self.dataset.report_dates))
+
+    def test_write_database(self):
+        rows = self.dataset.write_database(batch_size=50)
+        self.assertEqual(rows, 8 * 20)
+        self.assertEqual(RevenueEntry.objects.count(), 8 * 20)
+        self.assertEqual(ReportWeek.objects.count(), 8)
+        self.assertEqual(Client.objects.count(), 4)
+
+        # Rerunning replaces the weeks instead of duplicating them
+        self.dataset.write_database()
+        self.assertEqual(RevenueEntry.objects.count(), 8 * 20)
+
+        last = self.dataset.report_dates[-1]
+        frame = self.dataset.engagement_frame(last).set_index('EngagementID')
+        entry = RevenueEntry.objects.get(date=last, engagement_id='E-00004')
+        self.assertAlmostEqual(entry.fytd_ansr_amt, frame.loc['E-00004', 'FYTD_ANSRAmt'])
+        self.assertAlmostEqual(entry.fytd_diferencial_final, frame.loc['E-00004', 'Perdida Dif. Camb.'])
+        self.assertEqual(
+            entry.total_revenue_days_p_cp, self.dataset.partner_revenue_days(last)[entry.engagement_partner]
+        )
+
+    def test_workbooks_match_the_uploads(self):
+        last = self.dataset.report_dates[-1]
+        paths = self.dataset.write_workbooks(self.directory)
+        sheets = {role: pd.ExcelFile(path).sheet_names for role, path in paths.items()}
+        self.assertEqual(sheets, {
+            'engagement_list': ['DATA ENG LIST'],
+            'dif': ['DATA DIFERENCIAL'],
+            'revenue_days': ['RevenueDays'],
+            'cobranzas': ['Cobranzas'],
+            'facturacion': [fiscal_year_label(last)],
+        })
+
+        # The import script finds the header rows below the title preambles
+        engagements = _load_file(paths['engagement_list'], ENGAGEMENT_COLUMNS[:17], sheet_name='DATA ENG LIST')
+        self.assertEqual(list(engagements.columns), ENGAGEMENT_COLUMNS)
+        self.assertEqual(len(engagements), 20)
+        dif = _load_file(paths['dif'], DIF_COLUMNS, sheet_name='DATA DIFERENCIAL')
+        self.assertEqual(len(dif), 20)
+        revenue = _load_file(paths['revenue_days'], ['Employee Country/Region', 'Employee'], sheet_name='RevenueDays')
+        self.assertIn('Total Revenue Days.3', revenue.columns)
+        self.assertIn('25Billings FYTD', revenue.columns)
+
+        # ... and so does the Manager Revenue Days upload
+        with open(paths['revenue_days'], 'rb') as fh:
+            extracted = extract_revenue_days_sheet(fh)
+        self.assertEqual(len(extracted), 3 + 5 + 3)
+        self.assertIn('Total Revenue Days', extracted.columns)
+
+    def test_end_date_moves_back_to_friday(self):
+        dataset = SyntheticDataset(engagements=4, weeks=2, end_date=datetime.date(2025, 10, 1))
+        self.assertEqual(dataset.report_dates, [datetime.date(2025, 9, 19), datetime.date(2025, 9, 26)])
@@ -0,0 +1,32 @@
+"""
+Upload Registry Module
+======================
+
+Content-addressed store of uploaded source files (`UploadBlob`) and the
+record of the upload pipeline's stages (`StageRun`). Uploads are streamed to
+disk in chunks while their SHA-256 is computed and kept once per content; a
+stage (the revenue import, Manager Revenue Days, Cobranzas, Facturacion) is
+skipped when its latest successful run for the week had the same input
+hashes and code version and its data has not changed since, so re-uploading
+identical files after a validation failure is nearly free.
+"""
+
+from .services import (
+    STAGE_CODE,
+    STAGE_LABELS,
+    store_upload,
+    code_version,
+    stage_input_key,
+    find_reusable_run,
+    run_stage,
+)
+
+__all__ = [
+    'STAGE_CODE',
+    'STAGE_LABELS',
+    'store_upload',
+    'code_version',
+    'stage_input_key',
+    'find_reusable_run',
+    'run_stage',
+]
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.db.models import F
+
+from core_dashboard.models import StageRun, UploadBlob
+from core_dashboard.modules.data_cache import get_generations
+from core_dashboard.modules.shared.cache_utils import compute_files_hash
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = 'upload_blobs'  # under MEDIA_ROOT
+CHUNK_SIZE = 1024 * 1024
+
+# Stage -> source files (relative to BASE_DIR) whose contents make up its code version
+STAGE_CODE = {
+    'revenue_import': (
+        'process_uploaded_data.py',
+        'core_dashboard/modules/mtd_module.py',
+        'core_dashboard/modules/collection_module.py',
+        # How the rows are written: staging/merge, people, week registry, match keys
+        'core_dashboard/modules/db_tuning/staging.py',
+        'core_dashboard/modules/people/services.py',
+        'core_dashboard/modules/report_weeks/services.py',
+        'core_dashboard/utils.py',
+    ),
+    'manager_revenue_days': ('core_dashboard/modules/manager_revenue_days/services.py',),
+    'cobranzas': ('core_dashboard/modules/cobranzas/services.py',),
+    'facturacion': ('core_dashboard/modules/facturacion/services.py',),
+}
+STAGE_LABELS = {
+    'revenue_import': 'Engagement / Dif / Revenue Days import',
+    'manager_revenue_days': 'Manager Revenue Days',
+    'cobranzas': 'Cobranzas',
+    'facturacion': 'Facturacion',
+}
+
+
+def _hash_chunks(chunks, fh):
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        digest.update(chunk)
+        fh.write(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _place(blob_path, target):
+    """Point `target` at the blob: a hard link when the filesystem allows it, else a copy."""
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(blob_path, target)
+    except OSError:
+        shutil.copyfile(blob_path, target)
+
+
+def store_upload(uploaded_file, directory, filename):
+    """Stream an upload to disk in chunks while hashing it, and store it by content.
+
+    The bytes land once in MEDIA_ROOT/upload_blobs/<sha[:2]>/<sha><ext>; `filename`
+    inside `directory` (replaced if present) points at that blob. Returns
+    {'sha256', 'size', 'path', 'blob_path', 'reused'}, `reused` being True when the
+    same content had been uploaded before.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    blob_root = os.path.join(settings.MEDIA_ROOT, BLOB_DIR)
+    os.makedirs(blob_root, exist_ok=True)
+    os.makedirs(directory, exist_ok=True)
+
+    chunks = uploaded_file.chunks(CHUNK_SIZE) if hasattr(uploaded_file, 'chunks') else iter(
+        lambda: uploaded_file.read(CHUNK_SIZE), b''
+    )
+    fd, tmp_path = tempfile.mkstemp(dir=blob_root, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            sha256, size = _hash_chunks(chunks, fh)
+        rel_path = os.path.join(BLOB_DIR, sha256[:2], sha256 + ext)
+        blob_path = os.path.join(settings.MEDIA_ROOT, rel_path)
+        reused = os.path.exists(blob_path)
+        if reused:
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(tmp_path, blob_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    original_name = os.path.basename(getattr(uploaded_file, 'name', '') or filename)
+    updated = UploadBlob.objects.filter(sha256=sha256).update(upload_count=F('upload_count') + 1)
+    if not updated:
+        UploadBlob.objects.create(sha256=sha256, size=size, path=rel_path, original_name=original_name[:255])
+
+    target = os.path.join(directory, filename)
+    _place(blob_path, target)
+    if hasattr(uploaded_file, 'seek'):
+        # Stages that parse the upload object itself read it from the start again
+        uploaded_file.seek(0)
+    return {'sha256': sha256, 'size': size, 'path': target, 'blob_path': blob_path, 'reused': reused}
+
+
+def code_version(stage):
+    """Short hash of the source files implementing `stage` ('' when none is readable)."""
+    paths = [os.path.join(settings.BASE_DIR, p) for p in STAGE_CODE.get(stage, ())]
+    return compute_files_hash(paths)
+
+
+def stage_input_key(stage, inputs, version, params=None):
+    """Digest of everything a stage's output depends on: its input hashes, code and params."""
+    raw = json.dumps([stage, sorted((inputs or {}).items()), version, params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _jsonable(value):
+    return json.loads(json.dumps(value, default=str))
+
+
+def _succeeded(result):
+    return not (isinstance(result, dict) and result.get('success') is False)
+
+
+def find_reusable_run(stage, scope, input_key, guard_scopes=()):
+    """The latest successful run of `stage` for `scope` with the same input key, provided the
+    data generations of `guard_scopes` are still the ones it left behind; else None."""
+    run = StageRun.objects.filter(stage=stage, scope=scope).first()
+    if run is None or not run.succeeded or run.input_key != input_key:
+        return None
+    if guard_scopes:
+        if get_generations(guard_scopes) != {s: run.generations.get(s) for s in dict.fromkeys(guard_scopes)}:
+            # The data was replaced or purged since (another upload, a delete): run again
+            return None
+    return run
+
+
+def run_stage(stage, scope, inputs, func, guard_scopes=(), params=None, force=False):
+    """Run `func()` as pipeline stage `stage` for `scope`, unless an identical run can be reused.
+
+    `inputs` is {role: sha256} of the stage's files. The stage is skipped when its
+    latest successful run for the scope had the same inputs, code version and
+    params and none of `guard_scopes` has been bumped since (never with `force`,
+    which still records the run). `func` returns a
+    JSON-able result (a dict with success=False marks a failure); exceptions are
+    recorded as failures and re-raised.
+
+    Returns {'stage', 'result', 'reused'}.
+    """
+    version = code_version(stage)
+    input_key = stage_input_key(stage, inputs, version, params)
+    run = None if force else find_reusable_run(stage, scope, input_key, guard_scopes)
+    if run is not None:
+        StageRun.objects.filter(pk=run.pk).update(reuse_count=F('reuse_count') + 1)
+        logger.info(f"Stage {stage} for {scope}: inputs unchanged, reusing the run of {run.finished_at}")
+        return {'stage': stage, 'result': run.result, 'reused': True}
+
+    started = time.perf_counter()
+    defaults = {'input_key': input_key, 'code_version': version, 'inputs': inputs or {}, 'reuse_count': 0}
+    try:
+        result = func()
+    except Exception as e:
+        StageRun.objects.update_or_create(stage=stage, scope=scope, defaults={
+            **defaults, 'succeeded': False, 'result': {'success': False, 'error': str(e)},
+            'generations': {}, 'duration_seconds': time.perf_counter() - started,
+        })
+        raise
+    succeeded = _succeeded(result)
+    StageRun.objects.update_or_create(stage=stage, scope=scope, defaults={
+        **defaults, 'succeeded': succeeded, 'result': _jsonable(result) if result is not None else {},
+        'generations': get_generations(guard_scopes) if guard_scopes else {},
+        'duration_seconds': time.perf_counter() - started,
+    })
+    return {'stage': stage, 'result': result, 'reused': False}
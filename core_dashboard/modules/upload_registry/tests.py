@@ -0,0 +1,143 @@
+import datetime
+import os
+import shutil
+import subprocess
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core_dashboard.models import Area, Client, RevenueEntry, StageRun, UploadBlob
+from core_dashboard.modules.data_cache import bump_weeks, week_scope
+from core_dashboard.modules.report_weeks import sync_from_entries
+
+from .services import STAGE_CODE, code_version, run_stage, store_upload
+
+WEEK = datetime.date(2025, 8, 15)
+SCOPE = week_scope(WEEK)
+
+
+class UploadRegistryTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.calls = []
+
+    def stage(self, result=None):
+        def func():
+            self.calls.append(1)
+            return result if result is not None else {'success': True}
+        return func
+
+    def test_store_upload_keeps_one_blob_per_content(self):
+        directory = os.path.join(self.media_root, 'historico_de_final_database', '2025-08-15')
+        first = store_upload(SimpleUploadedFile('engagement.xlsb', b'x' * 3000), directory, 'Engagement_df_2025-08-15.xlsb')
+        again = store_upload(SimpleUploadedFile('copy.xlsb', b'x' * 3000), directory, 'Engagement_df_2025-08-15.xlsb')
+        other = store_upload(SimpleUploadedFile('dif.csv', b'a,b\n1,2\n'), directory, 'Dif_df_2025-08-15.csv')
+
+        self.assertFalse(first['reused'])
+        self.assertTrue(again['reused'])
+        self.assertEqual(first['sha256'], again['sha256'])
+        self.assertNotEqual(first['sha256'], other['sha256'])
+        self.assertEqual(first['size'], 3000)
+        # The dated name is replaced, not suffixed like FileSystemStorage.save() did
+        self.assertEqual(sorted(os.listdir(directory)), ['Dif_df_2025-08-15.csv', 'Engagement_df_2025-08-15.xlsb'])
+        with open(again['path'], 'rb') as fh:
+            self.assertEqual(fh.read(), b'x' * 3000)
+        self.assertEqual(UploadBlob.objects.get(sha256=first['sha256']).upload_count, 2)
+        self.assertEqual(UploadBlob.objects.count(), 2)
+
+    def test_identical_inputs_reuse_the_last_successful_run(self):
+        first = run_stage('revenue_import', SCOPE, {'engagement': 'a'}, self.stage(), guard_scopes=[SCOPE])
+        second = run_stage('revenue_import', SCOPE, {'engagement': 'a'}, self.stage(), guard_scopes=[SCOPE])
+        self.assertFalse(first['reused'])
+        self.assertTrue(second['reused'])
+        self.assertEqual(second['result'], {'success': True})
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(StageRun.objects.get(stage='revenue_import', scope=SCOPE).reuse_count, 1)
+
+        # Other inputs, another week or other params run again
+        run_stage('revenue_import', SCOPE, {'engagement': 'b'}, self.stage(), guard_scopes=[SCOPE])
+        run_stage('revenue_import', week_scope(WEEK + datetime.timedelta(days=7)), {'engagement': 'b'}, self.stage())
+        run_stage('revenue_import', SCOPE, {'engagement': 'b'}, self.stage(), guard_scopes=[SCOPE], params={'v': 2})
+        self.assertEqual(len(self.calls), 4)
+
+    def test_changed_data_or_code_runs_again(self):
+        run_stage('revenue_import', SCOPE, {'engagement': 'a'}, self.stage(), guard_scopes=[SCOPE])
+        bump_weeks([WEEK])  # e.g. another upload or a delete of the week since
+        self.assertFalse(run_stage('revenue_import', SCOPE, {'engagement': 'a'}, self.stage(), guard_scopes=[SCOPE])['reused'])
+
+        with patch('core_dashboard.modules.upload_registry.services.code_version', return_value='new'):
+            self.assertFalse(run_stage('revenue_import', SCOPE, {'engagement': 'a'}, self.stage(), guard_scopes=[SCOPE])['reused'])
+        self.assertEqual(len(self.calls), 3)
+
+    def test_code_version_covers_every_stage_file(self):
+        for stage, paths in STAGE_CODE.items():
+            for path in paths:
+                self.assertTrue(os.path.exists(os.path.join(settings.BASE_DIR, path)), f'{stage}: {path}')
+            self.assertTrue(code_version(stage))
+        self.assertIn('core_dashboard/modules/db_tuning/staging.py', STAGE_CODE['revenue_import'])
+
+    def test_failures_are_not_reused(self):
+        run_stage('cobranzas', SCOPE, {'cobranzas': 'a'}, self.stage({'success': False, 'error': 'bad sheet'}))
+        with self.assertRaises(ValueError):
+            run_stage('cobranzas', SCOPE, {'cobranzas': 'a'}, self.failing)
+        self.assertFalse(StageRun.objects.get(stage='cobranzas').succeeded)
+        self.assertFalse(run_stage('cobranzas', SCOPE, {'cobranzas': 'a'}, self.stage())['reused'])
+        self.assertEqual(len(self.calls), 2)
+
+    def failing(self):
+        raise ValueError('boom')
+
+    def test_reupload_skips_the_import(self):
+        def upload(engagement=b'engagement'):
+            return self.client.post(reverse('upload_file'), {
+                'upload_date': WEEK.isoformat(),
+                'engagement_df_file': SimpleUploadedFile('Engagement List.csv', engagement),
+                'dif_df_file': SimpleUploadedFile('Dif.csv', b'dif'),
+                'revenue_days_file': SimpleUploadedFile('Revenue Days.csv', b'days'),
+            })
+
+        done = subprocess.CompletedProcess([], 0, '', '')
+        with patch('core_dashboard.views.subprocess.run', return_value=done) as process:
+            first = upload()
+            second = upload()
+            self.assertEqual(process.call_count, 1)
+            upload(b'corrected engagement')
+            self.assertEqual(process.call_count, 2)
+
+        self.assertEqual(first.status_code, 302)
+        self.assertNotIn('reused', str(list(get_messages(first.wsgi_request))[0]))
+        self.assertIn('reused: Engagement / Dif / Revenue Days import', str(list(get_messages(second.wsgi_request))[-1]))
+        self.assertEqual(UploadBlob.objects.count(), 4)
+
+    def test_corrected_baseline_month_reimports_an_unchanged_week(self):
+        # Julio's last report is the MTD baseline of the Agosto week
+        july = datetime.date(2025, 8, 1)
+        RevenueEntry.objects.create(date=july, client=Client.objects.create(name='ACME'), area=Area.objects.create(name='Assurance'))
+        sync_from_entries([july])
+
+        def upload():
+            return self.client.post(reverse('upload_file'), {
+                'upload_date': WEEK.isoformat(),
+                'engagement_df_file': SimpleUploadedFile('Engagement List.csv', b'engagement'),
+                'dif_df_file': SimpleUploadedFile('Dif.csv', b'dif'),
+                'revenue_days_file': SimpleUploadedFile('Revenue Days.csv', b'days'),
+            })
+
+        done = subprocess.CompletedProcess([], 0, '', '')
+        with patch('core_dashboard.views.subprocess.run', return_value=done) as process:
+            upload()
+            upload()
+            self.assertEqual(process.call_count, 1)
+            bump_weeks([july])  # what a corrected re-import of Julio does
+            upload()
+            self.assertEqual(process.call_count, 2)
+            self.assertEqual(set(StageRun.objects.get(stage='revenue_import').generations), {SCOPE, week_scope(july)})
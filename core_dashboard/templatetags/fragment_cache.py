@@ -0,0 +1,74 @@
+"""
+{% fragment_cache %}: Django's {% cache %} with an on/off switch and timings.
+
+Usage (same arguments as {% cache %})::
+
+    {% load fragment_cache %}
+    {% fragment_cache fragment_cache_timeout dashboard_rankings fragment_keys.rankings %}
+        ...
+    {% endfragment_cache %}
+
+Set ``DASHBOARD_FRAGMENT_CACHE = False`` in settings to always render the
+fragments (e.g. while editing the template). Inside ``record_fragment_timings()``
+the wall time spent per fragment (hit or miss) is collected, which is what the
+``benchmark_dashboard_fragments`` command reports; on instrumented requests
+each fragment is also a `fragment.<name>` span.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django import template
+from django.conf import settings
+from django.templatetags.cache import CacheNode
+
+from core_dashboard.modules.perf import span
+
+register = template.Library()
+
+_timings = ContextVar('fragment_cache_timings', default=None)
+
+
+@contextmanager
+def record_fragment_timings():
+    """Collect {fragment_name: seconds} for every fragment rendered in the block."""
+    timings = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def fragment_cache_enabled():
+    return getattr(settings, 'DASHBOARD_FRAGMENT_CACHE', True)
+
+
+class FragmentCacheNode(CacheNode):
+    def render(self, context):
+        start = time.perf_counter()
+        with span(f'fragment.{self.fragment_name}'):
+            if fragment_cache_enabled():
+                output = super().render(context)
+            else:
+                output = self.nodelist.render(context)
+        timings = _timings.get()
+        if timings is not None:
+            timings[self.fragment_name] = timings.get(self.fragment_name, 0.0) + time.perf_counter() - start
+        return output
+
+
+@register.tag('fragment_cache')
+def do_fragment_cache(parser, token):
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError("'%r' tag requires at least 2 arguments." % tokens[0])
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],  # fragment_name can't be a variable.
+        [parser.compile_filter(t) for t in tokens[3:]],
+        None,
+    )
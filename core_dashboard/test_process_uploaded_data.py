@@ -5,7 +5,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from process_uploaded_data import build_merged_df
+from process_uploaded_data import build_merged_df, partner_revenue_days
 
 
 class TestProcessUploadedData(unittest.TestCase):
@@ -45,6 +45,17 @@ class TestProcessUploadedData(unittest.TestCase):
         self.assertIn('diferencial_final', merged.columns)
         self.assertEqual(merged.loc[0, 'diferencial_final'], -0.0)
 
+    def test_partner_revenue_days_by_column_name(self):
+        merged = pd.DataFrame({
+            'EngagementID': ['E1', 'E2', 'E3', 'E4', 'E5'],
+            'EngagementPartner': ['P1', 'P2', 'P1', None, ''],
+            'Total Revenue Days P CP': [10.0, float('nan'), 12.5, 3.0, 4.0],
+            'Total Revenue Days.1 P MTD': [1.0, 2.0, 3.0, 4.0, 5.0],
+        })
+        # The later row of a partner wins; rows without partner or days are ignored
+        self.assertEqual(partner_revenue_days(merged), {'P1': 12.5})
+        self.assertEqual(partner_revenue_days(merged.drop(columns=['Total Revenue Days P CP'])), {})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,107 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core_dashboard.models import Area, Client, RevenueEntry
+from core_dashboard.modules.dashboard_cards.services import EXCHANGE_POLL_KEY, exchange_workbook_path
+from core_dashboard.modules.data_cache import COBRANZAS_SCOPE, bump_generation
+from core_dashboard.modules.hooks import notify_data_invalidated
+from core_dashboard.modules.report_weeks import sync_from_entries
+
+
+class DashboardConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        client = Client.objects.create(name='ACME')
+        area = Area.objects.create(name='Assurance')
+        self.week = datetime.date(2025, 8, 15)
+        RevenueEntry.objects.create(
+            date=self.week, client=client, area=area, engagement_id='E1',
+            engagement_partner='Partner A', fytd_ansr_sintetico=10.0, total_revenue_days_p_cp=1.0,
+        )
+        sync_from_entries()
+
+    def test_unchanged_dashboard_answers_304_without_running_the_view(self):
+        first = self.client.get('/')
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+        self.assertIn('no-cache', first['Cache-Control'])
+        self.assertIn('private', first['Cache-Control'])
+
+        with self.assertNumQueries(1):  # the generation lookup
+            second = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], etag)
+
+    def test_etag_follows_filters_and_data_generation(self):
+        etag = self.client.get('/')['ETag']
+        self.assertNotEqual(self.client.get('/', {'partner': 'Partner A'})['ETag'], etag)
+
+        notify_data_invalidated(scope='weeks', weeks=[self.week])
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class ExchangeConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.base_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.base_dir, 'dolar excel'))
+        self.override = override_settings(BASE_DIR=self.base_dir)
+        self.override.enable()
+        self.rates = [(datetime.date(2025, 8, 14), 130.0, 180.0)]
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def poll(self, dry_run=False):
+        # What the mailbox fetcher does: rewrite the workbook with every rate so far
+        pd.DataFrame(self.rates, columns=['Fecha', 'Tasa Oficial (USD/VES)', 'Tasa binance (USD/VES)']).to_excel(
+            exchange_workbook_path(), index=False,
+        )
+
+    def test_poll_that_updates_the_workbook_changes_the_etag(self):
+        url = reverse('dashboard_cards:card', args=['exchange'])
+        with mock.patch('core_dashboard.modules.dashboard_cards.services.fetch_and_update', side_effect=self.poll) as fetch:
+            first = self.client.get(url)
+            self.assertEqual(first.json()['data']['latest_tasa_binance'], 180.0)
+            etag = first['ETag']
+            self.assertEqual(fetch.call_count, 1)  # once per poll interval, not again in the view
+
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            # The poll interval elapses and a new rate arrives by mail
+            cache.delete(EXCHANGE_POLL_KEY)
+            self.rates.append((datetime.date(2025, 8, 15), 131.0, 190.0))
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['data']['latest_tasa_binance'], 190.0)
+
+
+class CobranzasPreviewConditionalGetTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_preview_revalidates_against_cobranzas_generation(self):
+        url = reverse('cobranzas:preview')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        bump_generation(COBRANZAS_SCOPE)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,92 @@
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core_dashboard.models import Area, Client, Contract, RevenueEntry
+from core_dashboard.modules import ranking_module
+from core_dashboard.modules.olap import FrameEngine, Selection
+from core_dashboard.modules.report_weeks import sync_from_entries
+
+WEEK = datetime.date(2025, 8, 15)
+
+
+class RankingPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        area = Area.objects.create(name='Assurance')
+        client = Client.objects.create(name='ACME')
+        # Ties on revenue are ordered by label; the row without contract ranks as ''
+        revenues = [50.0, 40.0, 40.0, 40.0, 30.0, 20.0, 10.0, None]
+        for i, revenue in enumerate(revenues):
+            contract = Contract.objects.create(client=client, name=f'Engagement {i}', start_date=WEEK, end_date=WEEK)
+            RevenueEntry.objects.create(date=WEEK, client=client, area=area, contract=contract,
+                                        engagement_id=f'E{i}', fytd_ansr_sintetico=revenue)
+        RevenueEntry.objects.create(date=WEEK, client=client, area=area, engagement_id='X', fytd_ansr_sintetico=40.0)
+        sync_from_entries()
+
+    def setUp(self):
+        cache.clear()
+        FrameEngine.reset()
+
+    def expected(self):
+        return [
+            ('Engagement 0', 50.0), (None, 40.0), ('Engagement 1', 40.0), ('Engagement 2', 40.0),
+            ('Engagement 3', 40.0), ('Engagement 4', 30.0), ('Engagement 5', 20.0), ('Engagement 6', 10.0),
+            ('Engagement 7', 0.0),
+        ]
+
+    def walk(self, selection, limit):
+        rows, after, pages = [], None, 0
+        while True:
+            page = ranking_module.ranking_page(selection, 'contract__name', after=after, limit=limit)
+            rows += [(row['label'], row['total_revenue']) for row in page['results']]
+            pages += 1
+            after = page['next']
+            if after is None:
+                return rows, pages
+
+    def test_keyset_pages_cover_the_ranking_once(self):
+        selection = Selection({'date': WEEK})
+        for engine in ('orm', 'frame'):
+            with override_settings(DASHBOARD_OLAP_ENGINE=engine):
+                top5, full = ranking_module.compute_ranking(selection, 'contract__name')
+                self.assertEqual([(r['label'], r['total_revenue']) for r in full], self.expected(), engine)
+                self.assertEqual(top5, full[:5])
+                for limit in (1, 2, 4, 9, 50):
+                    rows, pages = self.walk(selection, limit)
+                    self.assertEqual(rows, self.expected(), f'{engine} limit={limit}')
+                    self.assertEqual(pages, max(1, -(-len(rows) // limit)))
+
+    def test_top_ranking_limits_in_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            top = ranking_module.top_ranking(Selection({'date': WEEK}), 'contract__name', n=3)
+        self.assertEqual([r['label'] for r in top], ['Engagement 0', None, 'Engagement 1'])
+        self.assertIn('LIMIT 3', queries.captured_queries[-1]['sql'])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            ranking_module.ranking_page(Selection({'date': WEEK}), 'contract__name', after='not-a-cursor')
+
+    def test_ranking_endpoint(self):
+        url = reverse('dashboard_cards:ranking', args=['engagements'])
+        first = self.client.get(url, {'week': WEEK.isoformat(), 'limit': 5}).json()
+        self.assertTrue(first['success'])
+        self.assertEqual(len(first['results']), 5)
+        second = self.client.get(url, {'week': WEEK.isoformat(), 'limit': 5, 'after': first['next']}).json()
+        self.assertEqual([r['label'] for r in second['results']],
+                         ['Engagement 4', 'Engagement 5', 'Engagement 6', 'Engagement 7'])
+        self.assertIsNone(second['next'])
+
+        self.assertEqual(self.client.get(url, {'after': 'bogus'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('dashboard_cards:ranking', args=['teams'])).status_code, 404)
+
+    def test_rankings_card_only_ships_the_top_rows(self):
+        payload = self.client.get(reverse('dashboard_cards:card', args=['rankings']), {'week': WEEK.isoformat()}).json()
+        self.assertEqual(len(payload['data']['top_engagements']), 5)
+        self.assertNotIn('all_engagements_ranked', payload['data'])
+        self.assertNotIn('Engagement 6', payload['html'])
+        self.assertIn(reverse('dashboard_cards:ranking', args=['engagements']) + '?week=2025-08-15', payload['html'])
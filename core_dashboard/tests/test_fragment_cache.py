@@ -0,0 +1,67 @@
+import datetime
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core_dashboard.models import Area, Client, Partner, RevenueEntry, SubArea
+from core_dashboard.modules.hooks import notify_data_invalidated
+from core_dashboard.modules.report_weeks import sync_from_entries
+from core_dashboard.templatetags.fragment_cache import record_fragment_timings
+
+FRAGMENT = Template(
+    '{% load fragment_cache %}{% fragment_cache 60 sample key %}{{ value }}{% endfragment_cache %}'
+)
+
+
+class FragmentCacheTagTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def render(self, **context):
+        return FRAGMENT.render(Context(context))
+
+    def test_fragment_is_reused_until_the_key_changes(self):
+        self.assertEqual(self.render(key='a', value=1), '1')
+        self.assertEqual(self.render(key='a', value=2), '1')
+        self.assertEqual(self.render(key='b', value=2), '2')
+
+    def test_switch_and_timings(self):
+        self.render(key='a', value=1)
+        with override_settings(DASHBOARD_FRAGMENT_CACHE=False):
+            self.assertEqual(self.render(key='a', value=2), '2')
+        with record_fragment_timings() as timings:
+            self.render(key='a', value=3)
+        self.assertIn('sample', timings)
+
+
+class DashboardFragmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        client = Client.objects.create(name='ACME')
+        area = Area.objects.create(name='Assurance')
+        sub_area = SubArea.objects.create(area=area, name='Audit')
+        self.week = datetime.date(2025, 8, 15)
+        for i in range(3):
+            RevenueEntry.objects.create(
+                date=self.week, client=client, area=area, sub_area=sub_area, engagement_id=f'E{i}',
+                engagement_partner='Partner Alpha', engagement_manager='Manager One',
+                fytd_ansr_sintetico=10.0 * (i + 1), fytd_charged_hours=5, total_revenue_days_p_cp=1.0,
+            )
+        sync_from_entries()
+
+    def test_sections_follow_the_data_generation(self):
+        self.assertContains(self.client.get('/', {'inline': '1'}), 'Partner Alpha')
+
+        # Without a generation bump the rendered sections are served from cache
+        RevenueEntry.objects.update(engagement_partner='Partner Beta', partner=Partner.for_name('Partner Beta'))
+        for url in ('/', '/cards/rankings/'):
+            response = self.client.get(url, {'inline': '1'})
+            self.assertContains(response, 'Partner Alpha')
+            self.assertNotContains(response, 'Partner Beta')
+
+        notify_data_invalidated(scope='weeks', weeks=[self.week])
+        for url in ('/', '/cards/rankings/'):
+            response = self.client.get(url, {'inline': '1'})
+            self.assertContains(response, 'Partner Beta')
+            self.assertNotContains(response, 'Partner Alpha')
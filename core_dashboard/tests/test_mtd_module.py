@@ -0,0 +1,90 @@
+import datetime
+from io import StringIO
+
+import pandas as pd
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from core_dashboard.models import Area, Client, RevenueEntry
+from core_dashboard.modules import mtd_module
+from core_dashboard.modules.dashboard_cards.services import DashboardFilters, build_macro
+from core_dashboard.modules.report_weeks import sync_from_entries
+
+
+class DiferencialMtdEngineTests(TestCase):
+    def setUp(self):
+        self.client_obj = Client.objects.create(name='ACME')
+        self.area = Area.objects.create(name='Assurance')
+        # Julio 25 (two reports), Agosto 25 (one report)
+        self.jul_1 = datetime.date(2025, 7, 25)
+        self.jul_2 = datetime.date(2025, 8, 1)  # day <= 7 -> still Julio
+        self.aug = datetime.date(2025, 8, 15)
+
+    def _entry(self, date, eng_id, final, mtd):
+        entry = RevenueEntry.objects.create(
+            date=date, client=self.client_obj, area=self.area, engagement_id=eng_id,
+            fytd_diferencial_final=final, diferencial_mtd=mtd,
+        )
+        sync_from_entries([date])
+        return entry
+
+    def test_previous_fiscal_baseline(self):
+        dates = [self.jul_1, self.jul_2, self.aug]
+        self.assertIsNone(mtd_module.previous_fiscal_baseline(self.jul_2, dates))
+        self.assertEqual(mtd_module.previous_fiscal_baseline(self.aug, dates), self.jul_2)
+        self.assertEqual(mtd_module.previous_fiscal_baseline(datetime.date(2025, 8, 22), dates), self.jul_2)
+
+    def test_recompute_fixes_first_and_later_months(self):
+        self._entry(self.jul_2, 'E1', 100.0, 90.0)    # Julio: should become 100
+        self._entry(self.jul_2, 'E2', None, 5.0)      # Julio without FYTD: should become 0
+        ok = self._entry(self.aug, 'E1', 150.0, 50.0)  # 150 - 100, already right
+        bad = self._entry(self.aug, 'E3', 30.0, 0.0)   # no baseline row -> 30
+
+        dry = mtd_module.recompute_diferencial_mtd(dry_run=True)
+        self.assertEqual(dry['total_fixes'], 3)
+        self.assertEqual(RevenueEntry.objects.get(pk=bad.pk).diferencial_mtd, 0.0)
+
+        summary = mtd_module.recompute_diferencial_mtd()
+        self.assertEqual(summary['total_fixes'], 3)
+        values = dict(RevenueEntry.objects.values_list('engagement_id', 'diferencial_mtd').filter(date=self.jul_2))
+        self.assertEqual(values, {'E1': 100.0, 'E2': 0.0})
+        self.assertEqual(RevenueEntry.objects.get(pk=ok.pk).diferencial_mtd, 50.0)
+        self.assertEqual(RevenueEntry.objects.get(pk=bad.pk).diferencial_mtd, 30.0)
+
+        aug = [d for d in summary['dates'] if d['date'] == self.aug][0]
+        self.assertEqual(aug['baseline_date'], self.jul_2)
+        self.assertEqual(mtd_module.recompute_diferencial_mtd()['total_fixes'], 0)
+
+    def test_range_limits_recompute(self):
+        self._entry(self.jul_2, 'E1', 100.0, 0.0)
+        self._entry(self.aug, 'E1', 150.0, 0.0)
+        summary = mtd_module.recompute_diferencial_mtd(start_date=self.aug, end_date=self.aug)
+        self.assertEqual([d['date'] for d in summary['dates']], [self.aug])
+        self.assertEqual(RevenueEntry.objects.get(date=self.aug).diferencial_mtd, 50.0)
+        self.assertEqual(RevenueEntry.objects.get(date=self.jul_2).diferencial_mtd, 0.0)
+
+    def test_recompute_invalidates_cached_macro_values(self):
+        cache.clear()
+        self._entry(self.jul_2, 'E1', 100.0, 100.0)
+        self._entry(self.aug, 'E1', 150.0, 0.0)
+        filters = lambda: DashboardFilters({'week': self.aug.isoformat()})
+        self.assertEqual(build_macro(filters())['macro_diferencial_mtd'], 0.0)
+
+        self.assertEqual(mtd_module.recompute_diferencial_mtd()['total_fixes'], 1)
+        self.assertEqual(build_macro(filters())['macro_diferencial_mtd'], 50.0)
+
+    def test_compute_frame_mtd(self):
+        frame = pd.DataFrame({'EngagementID': ['E1', 'E2'], 'diferencial_final': [150.0, 20.0]})
+        mtd = mtd_module.compute_frame_mtd(frame, self.aug, {'E1': 100.0, 'E9': 1.0})
+        self.assertEqual(mtd.tolist(), [50.0, 20.0])
+        first = mtd_module.compute_frame_mtd(frame, self.jul_1, {'E1': 100.0})
+        self.assertEqual(first.tolist(), [150.0, 20.0])
+
+    def test_command_output(self):
+        self._entry(self.aug, 'E1', 150.0, 0.0)
+        self._entry(self.jul_2, 'E1', 100.0, 100.0)
+        out = StringIO()
+        call_command('validate_diferencial_mtd', '--date', '2025-08-15', '--dry-run', stdout=out)
+        self.assertIn('Would have fixed 1 entries', out.getvalue())
+        self.assertEqual(RevenueEntry.objects.get(date=self.aug).diferencial_mtd, 0.0)
@@ -0,0 +1,85 @@
+import datetime
+import os
+import tempfile
+
+from django.test import TestCase
+
+from core_dashboard.models import Area, Client, ReportWeek, RevenueEntry
+from core_dashboard.modules import report_weeks
+
+
+class ReportWeekRegistryTests(TestCase):
+    def setUp(self):
+        self.client_obj = Client.objects.create(name='ACME')
+        self.area = Area.objects.create(name='Assurance')
+
+    def _entries(self, date, n=2):
+        for i in range(n):
+            RevenueEntry.objects.create(date=date, client=self.client_obj, area=self.area, engagement_id=f'E{i}')
+
+    def test_record_import_stores_metadata(self):
+        self._entries(datetime.date(2025, 8, 15), n=3)
+        with tempfile.NamedTemporaryFile(delete=False) as fh:
+            fh.write(b'engagement list')
+        try:
+            week = report_weeks.record_import(
+                datetime.date(2025, 8, 15), source_files={'engagement': fh.name, 'missing': '/nope.xlsx'},
+                duration_seconds=1.5,
+            )
+        finally:
+            os.remove(fh.name)
+        self.assertEqual(week.row_count, 3)
+        self.assertEqual(week.fiscal_period, 'Agosto 25')
+        self.assertEqual(week.week_start, datetime.date(2025, 8, 11))
+        self.assertEqual(list(week.source_hashes), ['engagement'])
+        self.assertEqual(week.import_duration_seconds, 1.5)
+
+    def test_available_weeks_and_latest_range(self):
+        # A Thursday report still shows up under the Friday of its week
+        for d in (datetime.date(2025, 8, 8), datetime.date(2025, 8, 14)):
+            self._entries(d)
+            report_weeks.record_import(d)
+        self.assertEqual(report_weeks.get_available_weeks(), ['2025-08-08', '2025-08-15'])
+        self.assertEqual(
+            report_weeks.get_week_range(), (datetime.date(2025, 8, 11), datetime.date(2025, 8, 17))
+        )
+        self.assertEqual(
+            report_weeks.get_week_range(datetime.date(2025, 8, 8)),
+            (datetime.date(2025, 8, 4), datetime.date(2025, 8, 10)),
+        )
+
+    def test_empty_registry(self):
+        self.assertEqual(report_weeks.get_available_weeks(), [])
+        self.assertEqual(report_weeks.get_week_range(), (None, None))
+
+    def test_sync_from_entries_adds_and_drops_weeks(self):
+        ReportWeek.objects.create(
+            week_ending=datetime.date(2024, 1, 5), week_start=datetime.date(2024, 1, 1), fiscal_period='Diciembre 23'
+        )
+        self._entries(datetime.date(2025, 8, 15), n=4)
+        self.assertEqual(report_weeks.sync_from_entries(), 1)
+        self.assertEqual(report_weeks.get_report_dates(), [datetime.date(2025, 8, 15)])
+        self.assertEqual(ReportWeek.objects.get().row_count, 4)
+
+    def test_dashboard_week_lookup_is_a_registry_read(self):
+        self._entries(datetime.date(2025, 8, 15))
+        report_weeks.record_import(datetime.date(2025, 8, 15))
+        with self.assertNumQueries(1):
+            self.assertEqual(report_weeks.get_available_weeks(), ['2025-08-15'])
+
+    def test_partner_revenue_days_recorded_with_the_week(self):
+        report_date = datetime.date(2025, 8, 15)
+        for i, (partner, days) in enumerate((('Partner Alpha', 4.0), ('Partner Beta', None), ('Partner Alpha', 5.0))):
+            RevenueEntry.objects.create(
+                date=report_date, client=self.client_obj, area=self.area, engagement_id=f'E{i}',
+                engagement_partner=partner, total_revenue_days_p_cp=days,
+            )
+        # Mapping rebuilt from the entries, or the one given by the import
+        self.assertEqual(report_weeks.record_import(report_date).partner_revenue_days, {'Partner Alpha': 5.0})
+        report_weeks.record_import(report_date, partner_revenue_days={'Partner Alpha': 6.0, 'Partner Beta': 2.0})
+
+        start = datetime.date(2025, 8, 11)
+        self.assertEqual(report_weeks.get_partner_revenue_days(start), {'partner alpha': 6.0, 'partner beta': 2.0})
+        with self.assertNumQueries(1):  # generation lookup only
+            report_weeks.get_partner_revenue_days(start)
+        self.assertEqual(report_weeks.get_partner_revenue_days(datetime.date(2025, 8, 4)), {})
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.dashboard_view, name='dashboard'),
+    path('async/', views.dashboard_async_view, name='dashboard_async'),
     path('upload/', views.upload_file_view, name='upload_file'),
     path('delete-data-cache/', views.delete_data_and_cache_view, name='delete_data_cache'),
     path('tables/', views.tables_view, name='tables'),
@@ -14,4 +15,8 @@ urlpatterns = [
     path('manager-revenue-days/', include('core_dashboard.modules.manager_revenue_days.urls')),
     path('cobranzas/', include('core_dashboard.modules.cobranzas.urls')),
     path('facturacion/', include('core_dashboard.modules.facturacion.urls')),
+    path('exports/', include('core_dashboard.modules.exports.urls')),
+    path('catalogue/', include('core_dashboard.modules.dimension_catalogue.urls')),
+    path('cards/', include('core_dashboard.modules.dashboard_cards.urls')),
+    path('perf/', include('core_dashboard.modules.perf.urls')),
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import datetime
+import unicodedata
 
 def generate_mock_data(num_days=500):
     """Genera un DataFrame con datos económicos simulados para Venezuela."""
@@ -64,4 +65,57 @@ def get_fiscal_month_year(report_date):
     # For fiscal year, use last two digits as per metas_SL.csv format (e.g., 'Julio 25')
     fiscal_year_short = fiscal_year % 100
 
-    return f"{fiscal_month_name} {fiscal_year_short}"
\ No newline at end of file
+    return f"{fiscal_month_name} {fiscal_year_short}"
+
+def normalize_key(value):
+    """Match key for a name: trimmed, inner whitespace collapsed, casefolded, accents stripped.
+
+    'José  Pérez ' and 'JOSE PEREZ' share the key 'jose perez'; blank values give ''.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    s = ''.join(ch for ch in unicodedata.normalize('NFD', str(value)) if unicodedata.category(ch) != 'Mn')
+    return ' '.join(s.casefold().split())
+
+
+def mock_partners(count=12):
+    return [f'Partner {i:02d}' for i in range(count)]
+
+
+def mock_managers(count=40):
+    return [f'Manager {i:02d}' for i in range(count)]
+
+
+def fiscal_year_label(report_date):
+    """'FY26' for report dates of the fiscal year July 2025 - June 2026 (same month rule as get_fiscal_month_year)."""
+    month_name, year_short = get_fiscal_month_year(report_date).split(' ')
+    first_half = month_name in ('Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre')
+    return f"FY{(int(year_short) + (1 if first_half else 0)) % 100:02d}"
+
+
+def generate_mock_revenue_entries(weeks=104, engagements=200, end_date=None, seed=42, partners=12, managers=40):
+    """Create a synthetic RevenueEntry history, one report per Friday ending at end_date.
+
+    Thin wrapper over synthetic_data.SyntheticDataset (bulk inserts, report-week
+    registry synced, data generations bumped). Returns the report dates, ascending.
+    """
+    from core_dashboard.modules.synthetic_data import SyntheticDataset
+
+    dataset = SyntheticDataset(partners=partners, managers=managers, engagements=engagements,
+                               weeks=weeks, end_date=end_date, seed=seed)
+    dataset.write_database()
+    return dataset.report_dates
+
+
+def generate_mock_workbooks(directory, report_date, engagements=200, seed=42, partners=12, managers=40):
+    """Write the upload workbooks of report_date into directory.
+
+    Returns {'engagement_list', 'dif', 'revenue_days', 'cobranzas',
+    'facturacion': path}; see synthetic_data.SyntheticDataset.write_workbooks.
+    """
+    from core_dashboard.modules.synthetic_data import SyntheticDataset
+
+    # A year of history so the FYTD/MTD figures of report_date match the database rows
+    dataset = SyntheticDataset(partners=partners, managers=managers, engagements=engagements,
+                               weeks=53, end_date=report_date, seed=seed)
+    return dataset.write_workbooks(directory)
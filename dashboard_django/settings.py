@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core_dashboard.modules.perf.middleware.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,13 +82,82 @@ WSGI_APPLICATION = 'dashboard_django.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Persistent connections (CONN_MAX_AGE) get WAL and the SQLITE_PRAGMAS once,
+# when opened (core_dashboard.modules.db_tuning). IMMEDIATE transactions take
+# the write lock up front and wait up to `timeout` seconds for it instead of
+# failing with "database is locked" on a lock upgrade. Tests use a file
+# database so WAL and concurrent connections behave as in production (the
+# rest of the test configuration is in dashboard_django.test_settings).
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'TEST': {
+            'NAME': os.path.join(tempfile.gettempdir(), f'eydeck_test_{os.getpid()}.sqlite3'),
+        },
     }
 }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,  # KiB: 64 MiB page cache
+    'mmap_size': 268435456,  # 256 MiB
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# Local file-backed cache shared by every process (runserver, the import
+# subprocess, management commands). Keys for derived data embed the current
+# data generation (see core_dashboard.modules.data_cache), so stale entries are
+# never read and simply age out.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.django_cache'),
+        'TIMEOUT': 7 * 24 * 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+# Threads shared by the async dashboard views for the file-bound card groups
+# (Cobranzas workbook, exchange-rate mailbox/workbook); DB-bound groups get a
+# worker thread each.
+DASHBOARD_CARD_FILE_WORKERS = 2
+
+# The exchange-rate mailbox is polled before the dashboard's ETag is computed,
+# at most once per this many seconds across requests.
+EXCHANGE_POLL_SECONDS = 60
+
+# Engine for the KPI/ranking/trend aggregations (core_dashboard.modules.olap):
+# 'orm' (SQL on RevenueEntry), 'frame' (in-process columnar snapshot, refreshed
+# week by week after imports) or 'duckdb' (the snapshot through DuckDB; needs
+# requirements-optional.txt).
+DASHBOARD_OLAP_ENGINE = 'orm'
+
+# Parsed-source cache of the import workbooks (core_dashboard.modules.source_cache):
+# entries unread for SOURCE_CACHE_MAX_AGE_DAYS are pruned, then the least recently
+# read ones until the cache fits in SOURCE_CACHE_MAX_BYTES. It lives in
+# MEDIA_ROOT/parsed_sources unless SOURCE_CACHE_DIR is set; None disables it.
+SOURCE_CACHE_MAX_AGE_DAYS = 30
+SOURCE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Request instrumentation (core_dashboard.modules.perf): Server-Timing headers
+# and the staff-only /perf/ panel. Spans cost nothing while this is off.
+DASHBOARD_PERF = DEBUG
+DASHBOARD_PERF_WINDOW = 500  # samples kept per view/metric
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
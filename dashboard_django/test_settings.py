@@ -0,0 +1,30 @@
+"""
+Settings for the test suite: the production settings plus test-only overrides.
+
+`manage.py test` selects this module; other runners should point
+DJANGO_SETTINGS_MODULE at dashboard_django.test_settings.
+"""
+
+import os
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+# Uploads and generated files of a run go to a private media folder, like the test database
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), f'eydeck_test_media_{os.getpid()}')
+
+# Worker threads of the test run must not keep the test database open past its teardown
+DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# A per-process in-memory cache so runs never share entries
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Tests never write parsed sources into a media folder unless they ask for it
+SOURCE_CACHE_DIR = None
+
+DASHBOARD_PERF = False
@@ -176,9 +176,6 @@ def get_alternative_data(fred_api_key):
 
     return results
 
-    print(f"DEBUG: get_alternative_data returning: {results}")
-    return results
-
 def get_economic_indicators(api_key_alpha, api_key_te):
     """
     Placeholder for fetching economic indicators (using more varied dummy data).
@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard_django.settings')
+    # The test command runs with the test settings unless told otherwise
+    default_settings = 'dashboard_django.test_settings' if sys.argv[1:2] == ['test'] else 'dashboard_django.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default_settings)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc: